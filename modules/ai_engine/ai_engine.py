@@ -7,46 +7,154 @@ import os
 import sys
 import json
 import time
-from typing import Dict, Any
+from functools import partial
+from typing import IO, Dict, Any, List, Optional, Tuple, Union
 
 import networkx as nx
+import pandas as pd
 
 _dir = os.path.dirname(os.path.abspath(__file__))
 if _dir not in sys.path:
     sys.path.insert(0, _dir)
 
 from utils.csv_loader import load_transactions
-from utils.graph_builder import build_transaction_graph
+from utils.graph_builder import TransactionGraph
+from utils.graph_stats import NetworkStats
+from utils.account_profiles import build_account_profiles
+from utils.cache import TransactionCache, source_sha256
+from utils.streaming import StreamedTransactions, stream_transactions
+from utils.deadline import NO_DEADLINE, Deadline
 from detectors.cycle_detector import CycleDetector
 from detectors.fan_detector import FanDetector
 from detectors.chain_detector import ChainDetector
 from detectors.scoring_engine import ScoringEngine
 from ring_assembler import RingAssembler
+from sharding import ShardPlan, detect_shard, merge_shards
+from pipeline_dag import Stage, begin_stage, resolve_mode, run_stages, stage_stats
 from config import (
     CYCLE_DETECTION_MIN_LENGTH,
     CYCLE_DETECTION_MAX_LENGTH,
     FAN_PATTERN_THRESHOLD,
+    LEGIT_LONG_WINDOW_DAYS,
     CHAIN_DETECTION_MIN_LENGTH,
+    CACHE_ENABLED,
+    CACHE_DIR,
+    CACHE_MAX_BYTES,
+    STREAM_MIN_BYTES,
+    STREAM_CHUNK_ROWS,
+    STREAM_SPILL_BUCKETS,
+    STREAM_SPILL_DIR,
+    PIPELINE_MODE,
+    PIPELINE_WORKERS,
+    PIPELINE_PARALLEL_MIN_EDGES,
+    PIPELINE_TRACE_MEMORY,
+    ANALYSIS_TIMEOUT_SECONDS,
+    MAX_ACCOUNTS_PER_ANALYSIS,
 )
+from utils.log import get_logger
+from utils.metrics import BYTES_BUCKETS, REGISTRY, SIZE_BUCKETS
+
+logger = get_logger(__name__)
+
+_STAGE_SECONDS = REGISTRY.histogram(
+    'nexa_stage_duration_seconds', 'Wall time of each pipeline stage', ('stage',))
+_STAGE_RSS = REGISTRY.histogram(
+    'nexa_stage_max_rss_bytes', 'Process RSS high-water mark after each stage', ('stage',),
+    BYTES_BUCKETS)
+_STAGE_TRACED = REGISTRY.histogram(
+    'nexa_stage_peak_traced_bytes', 'tracemalloc peak per stage (PIPELINE_TRACE_MEMORY)',
+    ('stage',), BYTES_BUCKETS)
+_ANALYSIS_SECONDS = REGISTRY.histogram(
+    'nexa_analysis_duration_seconds', 'End-to-end pipeline wall time')
+_INPUT_ROWS = REGISTRY.histogram(
+    'nexa_input_rows', 'Transactions per analysis', buckets=SIZE_BUCKETS)
+_GRAPH_NODES = REGISTRY.histogram(
+    'nexa_graph_nodes', 'Accounts in the transaction graph', buckets=SIZE_BUCKETS)
+_GRAPH_EDGES = REGISTRY.histogram(
+    'nexa_graph_edges', 'Edges in the transaction graph', buckets=SIZE_BUCKETS)
+_ANALYSES = REGISTRY.counter(
+    'nexa_analyses_total', 'Pipeline runs by outcome', ('status',))
+_DETECTIONS = REGISTRY.counter(
+    'nexa_detections_total', 'Detected patterns by kind', ('kind',))
+
+_cache: Optional[TransactionCache] = None
+
+
+def get_transaction_cache() -> Optional[TransactionCache]:
+    """Process-wide transaction cache, or None when disabled/unwritable."""
+    global _cache
+    if _cache is None and CACHE_ENABLED:
+        try:
+            _cache = TransactionCache(CACHE_DIR, CACHE_MAX_BYTES)
+        except OSError as e:
+            logger.warning(f"⚠️  Transaction cache disabled: {e}")
+            return None
+    return _cache
 
 
 class AIEngine:
     """Thin wrapper kept for backward-compat with backend."""
 
     def __init__(self):
-        self.G = None
+        self.tg = None
         self.df = None
+        self.profiles = None
+        self.cache_key: Optional[str] = None
+        self.stream: Optional[StreamedTransactions] = None
         self.results: Dict[str, Any] = {}
 
-    def load_data(self, csv_path: str) -> "AIEngine":
-        if not os.path.isabs(csv_path):
+    def load_data(self, csv_path: Union[str, IO, pd.DataFrame]) -> "AIEngine":
+        """csv_path may also be a file-like object or an already-parsed DataFrame."""
+        if isinstance(csv_path, str) and not os.path.isabs(csv_path):
             csv_path = os.path.join(_dir, csv_path)
-        print(f"📂 Loading: {csv_path}")
+        logger.info(f"📂 Loading: {csv_path if isinstance(csv_path, str) else type(csv_path).__name__}")
+        cache = get_transaction_cache()
+        if cache is not None and not isinstance(csv_path, pd.DataFrame):
+            self.cache_key = source_sha256(csv_path)
+        if self.cache_key is not None:
+            hit = cache.get(self.cache_key)
+            if hit is not None:
+                self.df, self.tg = hit
+                logger.info(f"⚡ Cache hit {self.cache_key[:12]}: {len(self.df)} transactions, "
+                            f"{self.tg.number_of_nodes()} accounts (parse + graph build skipped)")
+                return self
         self.df = load_transactions(csv_path)
         return self
 
+    def load_streaming(self, csv_path: str) -> "AIEngine":
+        """Out-of-core load: graph and profiles are built while reading; df stays None."""
+        if not os.path.isabs(csv_path):
+            csv_path = os.path.join(_dir, csv_path)
+        logger.info(f"📂 Streaming: {csv_path}")
+        self.stream = stream_transactions(
+            csv_path, STREAM_CHUNK_ROWS, STREAM_SPILL_BUCKETS, STREAM_SPILL_DIR,
+            min_occurrences=FAN_PATTERN_THRESHOLD, max_span_days=LEGIT_LONG_WINDOW_DAYS,
+        )
+        self.tg, self.profiles = self.stream.tg, self.stream.profiles
+        return self
+
+    @property
+    def G(self) -> Optional[nx.DiGraph]:
+        """networkx view of tg, built on first access; the pipeline itself runs on tg."""
+        return None if self.tg is None else self.tg.to_networkx()
+
+    @property
+    def transactions(self):
+        """Row-level source for detectors: the DataFrame, or the streamed spill."""
+        return self.df if self.df is not None else self.stream
+
+    def close(self) -> None:
+        if self.stream is not None:
+            self.stream.close()
+
     def build_graph(self) -> "AIEngine":
-        self.G = build_transaction_graph(self.df)
+        if self.tg is None:
+            self.tg = TransactionGraph.from_dataframe(self.df)
+            cache = get_transaction_cache()
+            if cache is not None and self.cache_key is not None:
+                cache.put(self.cache_key, self.df, self.tg)
+        if self.profiles is None:
+            self.profiles = build_account_profiles(self.df)
         return self
 
     def export_for_integration(self, output_path: str = "integration/data/") -> "AIEngine":
@@ -54,64 +162,229 @@ class AIEngine:
         out_file = os.path.join(output_path, "ai_engine_results.json")
         with open(out_file, "w") as f:
             json.dump(self.results, f, indent=2, default=str)
-        print(f"✅ Exported → {out_file}")
+        logger.info(f"✅ Exported → {out_file}")
         return self
 
     def get_results(self) -> Dict:
         return self.results
 
 
-def run_detection_pipeline(csv_path: str) -> Dict[str, Any]:
+def run_detection_pipeline(
+    csv_path: Union[str, IO, pd.DataFrame],
+    streaming: Optional[bool] = None,
+    deadline: Optional[Deadline] = None,
+) -> Dict[str, Any]:
+    """
+    csv_path: CSV path, file-like object (e.g. an in-memory upload) or DataFrame.
+    streaming: None picks out-of-core ingestion for files above STREAM_MIN_BYTES;
+    True/False forces either path. Only paths can be streamed.
+    deadline: time budget for the whole run (default ANALYSIS_TIMEOUT_SECONDS
+    from now). Detectors that run out of time return what they found; the
+    result then has partial=True, per-stage `completeness` and a warning.
+    """
     pipeline_start = time.time()
+    if deadline is None:
+        deadline = Deadline(ANALYSIS_TIMEOUT_SECONDS)
+    if not isinstance(csv_path, str):
+        streaming = False
+    if streaming is None:
+        path = csv_path if os.path.isabs(csv_path) else os.path.join(_dir, csv_path)
+        streaming = os.path.getsize(path) >= STREAM_MIN_BYTES
 
     # ── 1. Load & build graph ─────────────────────────────────────────────────
     t = time.time()
+    start = begin_stage(PIPELINE_TRACE_MEMORY)
     engine = AIEngine()
-    engine.load_data(csv_path).build_graph()
-    G, df = engine.G, engine.df
-    print(f"⏱️  Load + Graph: {time.time()-t:.1f}s | "
-          f"nodes={G.number_of_nodes()} edges={G.number_of_edges()}")
+    try:
+        if streaming:
+            engine.load_streaming(csv_path).build_graph()
+        else:
+            engine.load_data(csv_path).build_graph()
+        _observe_stage('load', stage_stats(start, PIPELINE_TRACE_MEMORY))
+        result = _run_detection(engine, pipeline_start, t, deadline)
+    except Exception:
+        _ANALYSES.inc(status='failed')
+        raise
+    finally:
+        engine.close()
+    _ANALYSES.inc(status='partial' if result['partial'] else 'ok')
+    return result
 
-    # ── 2. Cycle detection ────────────────────────────────────────────────────
-    t = time.time()
-    cycles = CycleDetector(
-        G, CYCLE_DETECTION_MIN_LENGTH, CYCLE_DETECTION_MAX_LENGTH
-    ).find_cycles_johnson()
-    print(f"⏱️  Cycles: {time.time()-t:.1f}s | found={len(cycles)}")
 
-    # ── 3. Fan / smurfing detection ───────────────────────────────────────────
-    t = time.time()
-    fans = FanDetector(G, df).detect_all_patterns(threshold=FAN_PATTERN_THRESHOLD)
-    print(f"⏱️  Fans: {time.time()-t:.1f}s | "
-          f"fan_out={len(fans['fan_out'])} "
-          f"fan_in={len(fans['fan_in'])} "
-          f"smurfs={len(fans['temporal_smurfing'])}")
+def _observe_stage(name: str, stats: Dict[str, float]) -> None:
+    """Record one stage's stats (see pipeline_dag.stage_stats) in the metrics registry."""
+    if name.startswith('shard_'):
+        name = 'shard'                  # one series for all component shards
+    _STAGE_SECONDS.observe(stats['seconds'], stage=name)
+    _STAGE_RSS.observe(stats['max_rss_bytes'], stage=name)
+    if 'traced_peak_bytes' in stats:
+        _STAGE_TRACED.observe(stats['traced_peak_bytes'], stage=name)
 
-    # ── 4. Shell chain detection ──────────────────────────────────────────────
+
+# Detector stages return (result, complete): complete is False when the
+# deadline stopped the detector early.
+
+def _detect_cycles(ctx: Dict[str, Any]) -> Tuple[List[List[str]], bool]:
     t = time.time()
-    chains = ChainDetector(G, df).detect_shell_chains(
-        min_length=CHAIN_DETECTION_MIN_LENGTH
+    detector = CycleDetector(
+        ctx['tg'], CYCLE_DETECTION_MIN_LENGTH, CYCLE_DETECTION_MAX_LENGTH,
+        deadline=ctx.get('deadline', NO_DEADLINE),
     )
-    print(f"⏱️  Chains: {time.time()-t:.1f}s | found={len(chains)}")
+    cycles = detector.find_cycles_johnson()
+    logger.info(f"⏱️  Cycles: {time.time()-t:.1f}s | found={len(cycles)}")
+    return cycles, detector.complete
+
+
+def _detect_fans(ctx: Dict[str, Any]) -> Tuple[Dict[str, List[Dict]], bool]:
+    t = time.time()
+    detector = FanDetector(ctx['tg'], ctx['df'], ctx['profiles'],
+                           deadline=ctx.get('deadline', NO_DEADLINE))
+    fans = detector.detect_all_patterns(threshold=FAN_PATTERN_THRESHOLD)
+    logger.info(f"⏱️  Fans: {time.time()-t:.1f}s | "
+                f"fan_out={len(fans['fan_out'])} "
+                f"fan_in={len(fans['fan_in'])} "
+                f"smurfs={len(fans['temporal_smurfing'])}")
+    return fans, detector.complete
+
 
-    # ── 5. Score accounts ─────────────────────────────────────────────────────
+def _detect_chains(ctx: Dict[str, Any]) -> Tuple[List[Dict], bool]:
     t = time.time()
-    detections = {
-        'cycles':            cycles,
+    detector = ChainDetector(ctx['tg'], ctx['df'], ctx['profiles'],
+                             deadline=ctx.get('deadline', NO_DEADLINE))
+    chains = detector.detect_shell_chains(min_length=CHAIN_DETECTION_MIN_LENGTH)
+    logger.info(f"⏱️  Chains: {time.time()-t:.1f}s | found={len(chains)}")
+    return chains, detector.complete
+
+
+def _detect_shard(b: int, ctx: Dict[str, Any]) -> Dict[str, Any]:
+    return detect_shard(ctx['plan'], b, ctx['tg'], ctx['df'], ctx['profiles'],
+                        ctx.get('deadline', NO_DEADLINE))
+
+
+def _merge_shards(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    return merge_shards([ctx[f'shard_{b}'] for b in range(len(ctx['plan']))])
+
+
+def _collect_detections(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    parts = ctx.get('shards', ctx)      # sharded runs merge into the same shape
+    fans = parts['fans'][0]
+    return {
+        'cycles':            parts['cycles'][0],
         'fan_out':           fans['fan_out'],
         'fan_in':            fans['fan_in'],
         'temporal_smurfing': fans['temporal_smurfing'],
-        'chains':            chains,
+        'chains':            parts['chains'][0],
     }
-    scored_accounts = ScoringEngine(G, df, detections).score_all_accounts()
-    print(f"⏱️  Scoring: {time.time()-t:.1f}s | scored={len(scored_accounts)}")
 
-    # ── 6. Assemble fraud rings ───────────────────────────────────────────────
+
+def _score_accounts(ctx: Dict[str, Any]) -> List[Dict]:
     t = time.time()
-    fraud_rings = RingAssembler(detections, scored_accounts).assemble()
-    print(f"⏱️  Rings: {time.time()-t:.1f}s | rings={len(fraud_rings)}")
+    scored = ScoringEngine(ctx['tg'], ctx['df'], ctx['detections'], ctx['profiles']).score_all_accounts()
+    logger.info(f"⏱️  Scoring: {time.time()-t:.1f}s | scored={len(scored)}")
+    return scored
+
+
+def _assemble_rings(ctx: Dict[str, Any]) -> List[Dict]:
+    t = time.time()
+    rings = RingAssembler(ctx['detections'], ctx['scores']).assemble()
+    logger.info(f"⏱️  Rings: {time.time()-t:.1f}s | rings={len(rings)}")
+    return rings
+
+
+# Detectors only read the shared inputs; scoring and rings need all of them
+PIPELINE_STAGES = [
+    Stage('cycles',     _detect_cycles),
+    Stage('fans',       _detect_fans),
+    Stage('chains',     _detect_chains),
+    Stage('detections', _collect_detections, deps=('cycles', 'fans', 'chains'), inline=True),
+    Stage('scores',     _score_accounts,     deps=('detections',),              inline=True),
+    Stage('rings',      _assemble_rings,     deps=('detections', 'scores'),     inline=True),
+]
+
+
+def sharded_stages(n_shards: int) -> List[Stage]:
+    """PIPELINE_STAGES with the detectors run once per component shard (see sharding.py)."""
+    names = [f'shard_{b}' for b in range(n_shards)]
+    return [Stage(name, partial(_detect_shard, b)) for b, name in enumerate(names)] + [
+        Stage('shards', _merge_shards, deps=names, inline=True),
+        Stage('detections', _collect_detections, deps=('shards',), inline=True),
+        *PIPELINE_STAGES[-2:],
+    ]
+
+
+def _shard_plan(engine: AIEngine) -> Optional[ShardPlan]:
+    """Component shards when the graph exceeds MAX_ACCOUNTS_PER_ANALYSIS, else None."""
+    if engine.stream is not None or engine.tg.number_of_nodes() <= MAX_ACCOUNTS_PER_ANALYSIS:
+        return None
+    plan = ShardPlan(engine.tg, engine.df, MAX_ACCOUNTS_PER_ANALYSIS)
+    if plan.oversized:
+        logger.warning(f"⚠️  {plan.oversized} connected component(s) exceed "
+                       f"{MAX_ACCOUNTS_PER_ANALYSIS} accounts and run as single shards")
+    return plan if len(plan) > 1 else None
+
+
+def _run_detection(engine: AIEngine, pipeline_start: float, t: float,
+                   deadline: Deadline = NO_DEADLINE) -> Dict[str, Any]:
+    tg, df, profiles = engine.tg, engine.transactions, engine.profiles
+    logger.info(f"⏱️  Load + Graph: {time.time()-t:.1f}s | "
+                f"nodes={tg.number_of_nodes()} edges={tg.number_of_edges()}")
+
+    # ── 2-6. Detectors (concurrent), scoring, fraud rings ─────────────────────
+    t = time.time()
+    mode = PIPELINE_MODE if tg.number_of_edges() >= PIPELINE_PARALLEL_MIN_EDGES else "serial"
+    mode, workers = resolve_mode(mode, PIPELINE_WORKERS)
+    plan = _shard_plan(engine)
+    results = run_stages(
+        PIPELINE_STAGES if plan is None else sharded_stages(len(plan)),
+        {'tg': tg, 'df': df, 'profiles': profiles, 'deadline': deadline, 'plan': plan},
+        mode, workers,
+        observe=_observe_stage, trace_memory=PIPELINE_TRACE_MEMORY,
+    )
+    logger.info(f"⏱️  Detection DAG: {time.time()-t:.1f}s | mode={mode} workers={workers} "
+                f"shards={1 if plan is None else len(plan)}")
 
     # ── 7. Build output ───────────────────────────────────────────────────────
+    start = begin_stage(PIPELINE_TRACE_MEMORY)
+    elapsed = round(time.time() - pipeline_start, 2)
+    logger.info(f"✅ Total pipeline: {elapsed}s")
+    total_amount = (float(df['amount'].sum()) if engine.stream is None
+                    else engine.stream.total_amount)
+    parts = results.get('shards', results)
+    completeness = {name: parts[name][1] for name in ('cycles', 'fans', 'chains')}
+    output = build_output(tg, results['detections'], results['scores'], results['rings'],
+                          len(df), total_amount, elapsed, completeness=completeness,
+                          deadline_seconds=deadline.seconds)
+    _observe_stage('output', stage_stats(start, PIPELINE_TRACE_MEMORY))
+
+    _ANALYSIS_SECONDS.observe(time.time() - pipeline_start)
+    _INPUT_ROWS.observe(len(df))
+    _GRAPH_NODES.observe(tg.number_of_nodes())
+    _GRAPH_EDGES.observe(tg.number_of_edges())
+    for kind, found in results['detections'].items():
+        _DETECTIONS.inc(len(found), kind=kind)
+    _DETECTIONS.inc(len(results['rings']), kind='fraud_rings')
+    return output
+
+
+def build_output(
+    G: Union[TransactionGraph, nx.DiGraph],
+    detections: Dict[str, Any],
+    scored_accounts: List[Dict],
+    fraud_rings: List[Dict],
+    n_transactions: int,
+    total_amount: float,
+    elapsed: float,
+    include_graph: bool = True,
+    completeness: Optional[Dict[str, bool]] = None,
+    deadline_seconds: Optional[float] = ANALYSIS_TIMEOUT_SECONDS,
+) -> Dict[str, Any]:
+    """
+    PS-format result dict. include_graph=False skips graph_data/network_stats (O(E)).
+    completeness: per-stage flags; any False marks the result partial with a warning
+    quoting deadline_seconds (the budget the run was given).
+    """
+    cycles, chains = detections['cycles'], detections['chains']
+    fans = {k: detections[k] for k in ('fan_out', 'fan_in', 'temporal_smurfing')}
     account_ring_map: Dict[str, str] = {}
     for ring in fraud_rings:
         for acct in ring['member_accounts']:
@@ -128,13 +401,10 @@ def run_detection_pipeline(csv_path: str) -> Dict[str, Any]:
         for s in scored_accounts
     ]
 
-    elapsed = round(time.time() - pipeline_start, 2)
-    print(f"✅ Total pipeline: {elapsed}s")
-
     summary = {
         'total_accounts_analyzed':     G.number_of_nodes(),
-        'total_transactions':          len(df),
-        'total_amount':                float(df['amount'].sum()),
+        'total_transactions':          n_transactions,
+        'total_amount':                total_amount,
         'suspicious_accounts_flagged': len(suspicious_accounts),
         'fraud_rings_detected':        len(fraud_rings),
         'cycles_found':                len(cycles),
@@ -153,48 +423,71 @@ def run_detection_pipeline(csv_path: str) -> Dict[str, Any]:
         'processing_time_seconds': elapsed,
     }
 
+    completeness = completeness or {}
+    unfinished = [name for name, done in completeness.items() if not done]
+    warnings = []
+    if unfinished:
+        warnings.append(
+            f"Analysis deadline of {deadline_seconds}s reached: "
+            f"{', '.join(unfinished)} detection stopped early; results are partial"
+        )
+        logger.warning(f"⚠️  {warnings[-1]}")
+
+    graph: Dict[str, Any] = {}
+    if include_graph:
+        tg = G if isinstance(G, TransactionGraph) else TransactionGraph.from_networkx(G)
+        graph = _graph_output(tg, suspicious_accounts, account_ring_map)
+
+    return {
+        # PS required
+        'suspicious_accounts': suspicious_accounts,
+        'fraud_rings':         fraud_rings,
+        'summary':             summary,
+        # frontend compat
+        **graph,
+        'cycles':              cycles,
+        'fan_patterns':        fans,
+        'chains':              chains[:20],
+        'risk_scores':         scored_accounts[:50],
+        # deadline status
+        'partial':             bool(unfinished),
+        'completeness':        completeness,
+        'warnings':            warnings,
+    }
+
+
+def _graph_output(tg: TransactionGraph, suspicious_accounts: List[Dict],
+                  account_ring_map: Dict[str, str]) -> Dict[str, Any]:
     suspicious_set = {s['account_id'] for s in suspicious_accounts}
+    ids = tg.account_ids.tolist()
     nodes = [
         {
             'id':        n,
             'suspicious': n in suspicious_set,
             'ring_id':   account_ring_map.get(n),
-            'in_degree': G.in_degree(n),
-            'out_degree':G.out_degree(n),
+            'in_degree': d_in,
+            'out_degree':d_out,
         }
-        for n in G.nodes()
+        for n, d_in, d_out in zip(ids, tg.in_degree.tolist(), tg.out_degree.tolist())
     ]
     links = [
         {
-            'source':    src,
-            'target':    dst,
-            'amount':    data.get('amount', 0),
-            'txn_count': data.get('txn_count', 1),
-            'suspicious': src in suspicious_set or dst in suspicious_set,
+            'source':    ids[u],
+            'target':    ids[v],
+            'amount':    amount,
+            'txn_count': count,
+            'suspicious': ids[u] in suspicious_set or ids[v] in suspicious_set,
         }
-        for src, dst, data in G.edges(data=True)
+        for u, v, amount, count in zip(tg.src.tolist(), tg.dst.tolist(),
+                                       tg.amount.tolist(), tg.txn_count.tolist())
     ]
 
-    network_stats = {
-        'density':        nx.density(G),
-        'avg_clustering': nx.average_clustering(G.to_undirected()),
-        'num_components': nx.number_weakly_connected_components(G),
-        'avg_in_degree':  sum(d for _, d in G.in_degree()) / max(G.number_of_nodes(), 1),
-        'avg_out_degree': sum(d for _, d in G.out_degree()) / max(G.number_of_nodes(), 1),
-    }
+    # O(E) counts only; avg_clustering is computed on request (/network-stats)
+    network_stats = NetworkStats(tg).as_dict(clustering=None)
 
     return {
-        # PS required
-        'suspicious_accounts': suspicious_accounts,
-        'fraud_rings':         fraud_rings,
-        'summary':             summary,
-        # frontend compat
-        'network_stats':       network_stats,
-        'graph_data':          {'nodes': nodes, 'links': links},
-        'cycles':              cycles,
-        'fan_patterns':        fans,
-        'chains':              chains[:20],
-        'risk_scores':         scored_accounts[:50],
+        'network_stats': network_stats,
+        'graph_data':    {'nodes': nodes, 'links': links},
     }
 
 
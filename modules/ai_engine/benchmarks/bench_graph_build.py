@@ -0,0 +1,94 @@
+"""
+Benchmark: graph construction, legacy iterrows loop vs. bulk TransactionGraph.
+
+Usage:
+    python benchmarks/bench_graph_build.py                 # 100K, 1M, 5M rows
+    python benchmarks/bench_graph_build.py 100000 1000000
+    python benchmarks/bench_graph_build.py --legacy-max 1000000
+
+The legacy path is the pre-TransactionGraph build_transaction_graph (groupby +
+iterrows + G.add_edge), kept here verbatim as the reference.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.graph_builder import TransactionGraph
+
+
+def make_transactions(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    n_accounts = max(n_rows // 10, 10)
+    ids = np.array([f"ACC_{i:07d}" for i in range(n_accounts)], dtype=object)
+    start = np.datetime64('2026-01-01T00:00:00', 'ns')
+    return pd.DataFrame({
+        'transaction_id': np.arange(n_rows),
+        'sender_id':      ids[rng.integers(0, n_accounts, n_rows)],
+        'receiver_id':    ids[rng.integers(0, n_accounts, n_rows)],
+        'amount':         rng.uniform(10, 5_000, n_rows).round(2),
+        'timestamp':      start + rng.integers(0, 30 * 86_400, n_rows).astype('timedelta64[s]'),
+    })
+
+
+def legacy_build(df: pd.DataFrame) -> nx.DiGraph:
+    G = nx.DiGraph()
+    grouped = (
+        df.groupby(['sender_id', 'receiver_id'])
+        .agg(
+            amount    =('amount', 'sum'),
+            txn_count =('amount', 'count'),
+            avg_amount=('amount', 'mean'),
+            first_txn =('timestamp', 'min'),
+            last_txn  =('timestamp', 'max'),
+        )
+        .reset_index()
+    )
+    grouped['duration_days'] = (
+        (grouped['last_txn'] - grouped['first_txn']).dt.total_seconds() / 86_400
+    ).clip(lower=0)
+    for _, row in grouped.iterrows():
+        G.add_edge(
+            row['sender_id'], row['receiver_id'],
+            amount=float(row['amount']), txn_count=int(row['txn_count']),
+            avg_amount=float(row['avg_amount']), first_txn=row['first_txn'],
+            last_txn=row['last_txn'], duration_days=float(row['duration_days']),
+        )
+    return G
+
+
+def _timed(fn, *args):
+    t = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t
+
+
+def run(sizes, legacy_max):
+    print(f"{'rows':>10} {'edges':>10} {'legacy':>9} {'csr':>9} {'csr+nx':>9} {'speedup':>8}")
+    for n in sizes:
+        df = make_transactions(n)
+        tg, t_csr = _timed(TransactionGraph.from_dataframe, df)
+        _, t_view = _timed(tg.to_networkx)
+        if n <= legacy_max:
+            G_old, t_old = _timed(legacy_build, df)
+            assert G_old.number_of_edges() == tg.number_of_edges()
+            legacy, speedup = f"{t_old:8.2f}s", f"{t_old / (t_csr + t_view):7.1f}x"
+        else:
+            legacy, speedup = f"{'skipped':>9}", f"{'-':>8}"
+        print(f"{n:>10,} {tg.number_of_edges():>10,} {legacy} {t_csr:8.2f}s "
+              f"{t_csr + t_view:8.2f}s {speedup}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('sizes', nargs='*', type=int, default=[100_000, 1_000_000, 5_000_000])
+    parser.add_argument('--legacy-max', type=int, default=5_000_000,
+                        help="skip the legacy loop above this many rows")
+    args = parser.parse_args()
+    run(args.sizes, args.legacy_max)
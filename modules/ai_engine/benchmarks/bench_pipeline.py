@@ -0,0 +1,177 @@
+"""
+Benchmark: every detection pipeline stage on synthetic data, with baselines.
+
+Usage:
+    python benchmarks/bench_pipeline.py                        # 10K, 100K, 1M, 5M rows
+    python benchmarks/bench_pipeline.py 10000 100000 --output run.json
+    python benchmarks/bench_pipeline.py 10000 --baseline base.json --tolerance 0.25
+    python benchmarks/bench_pipeline.py 100000 --trace-memory  # tracemalloc peaks (slow)
+
+Inputs come from benchmarks/synthetic.py and are written to --data-dir once
+per (rows, seed), so load times include real CSV parsing. Each stage records
+wall time, the process RSS high-water mark and how much the stage raised it
+(and the tracemalloc peak with --trace-memory), plus recall of the planted
+patterns. Results are written as JSON; with --baseline, any stage slower by
+more than --tolerance (and by at least --min-seconds) or using more than
+--tolerance extra memory is reported and the exit status is 1.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ai_engine import PIPELINE_STAGES
+from benchmarks.synthetic import generate_transactions, recall
+from pipeline_dag import begin_stage, run_stages, stage_stats
+from utils.account_profiles import build_account_profiles
+from utils.csv_loader import load_transactions
+from utils.graph_builder import TransactionGraph
+from utils.metrics import max_rss_bytes
+
+_here = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000, 5_000_000]
+
+
+def _dataset(n_rows: int, seed: int, data_dir: str):
+    """(csv path, planted truth); the CSV is generated on first use."""
+    path = os.path.join(data_dir, f"synthetic_{n_rows}_{seed}.csv")
+    df, planted = generate_transactions(n_rows, seed)
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        df.to_csv(path + ".tmp", index=False)
+        os.replace(path + ".tmp", path)
+    return path, planted
+
+
+def bench_size(n_rows: int, seed: int, data_dir: str, trace_memory: bool) -> Dict[str, Any]:
+    path, planted = _dataset(n_rows, seed, data_dir)
+    stages: Dict[str, Dict[str, float]] = {}
+    rss = [max_rss_bytes()]
+
+    def record(name: str, stats: Dict[str, float]) -> None:
+        stats['rss_growth_bytes'] = max(stats['max_rss_bytes'] - rss[0], 0.0)
+        rss[0] = stats['max_rss_bytes']
+        stages[name] = stats
+
+    def timed(name: str, fn, *args):
+        start = begin_stage(trace_memory)
+        out = fn(*args)
+        record(name, stage_stats(start, trace_memory))
+        return out
+
+    df = timed('load', load_transactions, path)
+    tg = timed('graph', TransactionGraph.from_dataframe, df)
+    profiles = timed('profiles', build_account_profiles, df)
+    results = run_stages(PIPELINE_STAGES, {'tg': tg, 'df': df, 'profiles': profiles},
+                         mode='serial', observe=record, trace_memory=trace_memory)
+    stages.pop('detections', None)          # bookkeeping, not a stage worth tracking
+
+    return {
+        'rows':     len(df),
+        'accounts': tg.number_of_nodes(),
+        'edges':    tg.number_of_edges(),
+        'seconds':  round(sum(s['seconds'] for s in stages.values()), 4),
+        'stages':   {k: {m: round(v, 4) for m, v in s.items()} for k, s in stages.items()},
+        'found':    {k: len(v) for k, v in results['detections'].items()},
+        'rings':    len(results['rings']),
+        'recall':   recall(planted, results['detections']),
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=_here,
+                              capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float, min_seconds: float) -> List[str]:
+    """Human-readable regressions of current against baseline (same sizes only)."""
+    regressions = []
+    for size, run in current['runs'].items():
+        base = baseline.get('runs', {}).get(size)
+        if base is None:
+            continue
+        for stage, stats in run['stages'].items():
+            old = base['stages'].get(stage)
+            if old is None:
+                continue
+            slower = stats['seconds'] - old['seconds']
+            if slower > min_seconds and stats['seconds'] > old['seconds'] * (1 + tolerance):
+                regressions.append(f"{size} rows / {stage}: {old['seconds']:.3f}s → "
+                                   f"{stats['seconds']:.3f}s")
+            for metric in ('traced_peak_bytes', 'rss_growth_bytes'):
+                if metric in stats and metric in old and old[metric] > 0 and \
+                        stats[metric] > old[metric] * (1 + tolerance) + 2 ** 20:
+                    regressions.append(f"{size} rows / {stage}: {metric} "
+                                       f"{old[metric] / 2**20:.1f} → {stats[metric] / 2**20:.1f} MiB")
+        for kind, value in base.get('recall', {}).items():
+            if run['recall'].get(kind, 0.0) < value:
+                regressions.append(f"{size} rows / recall[{kind}]: {value} → {run['recall'].get(kind)}")
+    return regressions
+
+
+def run(sizes, seed, data_dir, trace_memory) -> Dict[str, Any]:
+    report = {
+        'meta': {
+            'created':      datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit':       _git_commit(),
+            'python':       platform.python_version(),
+            'platform':     platform.platform(),
+            'cpus':         os.cpu_count(),
+            'seed':         seed,
+            'trace_memory': trace_memory,
+        },
+        'runs': {},
+    }
+    print(f"{'rows':>10} {'edges':>10} {'total':>9}  slowest stages")
+    for n in sizes:
+        result = bench_size(n, seed, data_dir, trace_memory)
+        report['runs'][str(n)] = result
+        slowest = sorted(result['stages'].items(), key=lambda kv: -kv[1]['seconds'])[:3]
+        print(f"{n:>10,} {result['edges']:>10,} {result['seconds']:8.2f}s  "
+              + "  ".join(f"{k}={s['seconds']:.2f}s" for k, s in slowest))
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('sizes', nargs='*', type=int, default=DEFAULT_SIZES)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--data-dir', default=os.path.join(_here, 'data'))
+    parser.add_argument('--output', default=os.path.join(_here, 'results', 'latest.json'))
+    parser.add_argument('--baseline', help="earlier --output file to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed relative slowdown / memory growth per stage")
+    parser.add_argument('--min-seconds', type=float, default=0.05,
+                        help="ignore slowdowns smaller than this (timer noise)")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="record tracemalloc peaks (several times slower)")
+    parser.add_argument('--verbose', action='store_true', help="keep pipeline progress logs")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.getLogger('nexa').setLevel(logging.WARNING)
+    report = run(args.sizes, args.seed, args.data_dir, args.trace_memory)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results → {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance, args.min_seconds)
+        for line in regressions:
+            print(f"❌ Regression: {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"✅ No regressions against {args.baseline}")
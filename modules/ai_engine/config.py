@@ -45,6 +45,9 @@ PERFORMANCE TARGETS (RIFT Requirement):
 - Typical performance: 2-3 seconds for real-world datasets
 """
 
+import os
+import tempfile
+
 # ────────────────────────────────────────────────────────────────────────────
 # 1. CYCLE DETECTION - Circular Fund Routing
 # ────────────────────────────────────────────────────────────────────────────
@@ -58,6 +61,13 @@ CYCLE_DETECTION_MAX_LENGTH = 5          # Maximum hop count: 5 (pentagon)
 MIN_CYCLE_AMOUNT = 1000                 # Cycles < $1,000 ignored (noise filter)
                                         # Rationale: Legitimate netting txns often < $100
                                         # Fraud patterns typically involve larger amounts
+CYCLE_DETECTION_MODE = "sparse"         # "sparse": 3/4-hop cycles via sparse matrix products,
+                                        #           path search only for 5-hop
+                                        # "path":   bounded path search for every length
+CYCLE_DETECTION_WORKERS = None          # Process pool size for SCC search (None = CPU budget)
+CYCLE_PARALLEL_MIN_NODES = 5_000        # Below this many SCC nodes, search in-process
+                                        # Rationale: pool start-up costs more than the
+                                        # search itself on small graphs
 
 # ────────────────────────────────────────────────────────────────────────────
 # 2. FAN / SMURFING DETECTION - Account Aggregation & Dispersion
@@ -94,6 +104,9 @@ SHELL_ACCOUNT_MAX_TRANSACTIONS = 3      # Shell account threshold: ≤3 total tx
 MAX_CHAIN_DEPTH = 5                     # Max search depth to prevent explosion
                                         # Rationale: Deeper chains have exponential
                                         # complexity; 5 hops = practical limit
+CHAIN_TOP_K = 200                       # Keep the K chains with the largest total_amount
+                                        # Rationale: bounded output, but ranked by
+                                        # importance rather than discovery order
 
 # ────────────────────────────────────────────────────────────────────────────
 # RISK SCORING METHODOLOGY - 7-Signal Weighted Model
@@ -139,6 +152,14 @@ RISK_WEIGHTS = {
 TOTAL_POSSIBLE_SCORE = sum(RISK_WEIGHTS.values())
 # If sum > 100, suspicious_score is capped at 100 (no over-scoring)
 
+# PageRank for the centrality signal (utils/pagerank.py, same iteration as nx)
+PAGERANK_ALPHA = 0.85                   # Damping factor
+PAGERANK_TOL = float(os.environ.get("NEXA_PAGERANK_TOL", "1e-6"))
+                                        # Stop when L1 change < N × tol
+                                        # Only pr / max(pr) ≥ 0.4 matters for the
+                                        # score, so 1e-4 is plenty on large graphs
+PAGERANK_MAX_ITER = 100                 # Give up (with a warning) after this many
+
 # ────────────────────────────────────────────────────────────────────────────
 # RISK LEVEL CLASSIFICATION - Customer Actionability
 # ────────────────────────────────────────────────────────────────────────────
@@ -183,6 +204,85 @@ LEGIT_LONG_WINDOW_DAYS = 30             # Merchant activity window: 30 days mini
                                         # Rationale: New accounts have erratic patterns
                                         # Old accounts = part of stable network
 
+# ────────────────────────────────────────────────────────────────────────────
+# TRANSACTION CACHE - Skip re-parsing identical uploads
+# ────────────────────────────────────────────────────────────────────────────
+# Parsed transactions and aggregated edge arrays are stored on local disk,
+# keyed by the SHA-256 of the input bytes. Re-running the same CSV (threshold
+# tweaks, /api/analyze/sample) skips parsing and graph building entirely.
+
+CACHE_ROOT = os.path.join(              # Default home of the cache and analysis store
+    os.environ.get("XDG_CACHE_HOME") or tempfile.gettempdir(), "nexa",
+)                                       # Rationale: never inside the (possibly
+                                        # read-only) source tree
+CACHE_ENABLED = os.environ.get("NEXA_CACHE_ENABLED", "1") != "0"
+CACHE_DIR = os.environ.get(             # One sub-directory of .npy columns per input
+    "NEXA_CACHE_DIR", os.path.join(CACHE_ROOT, "transactions"),
+)
+CACHE_MAX_BYTES = int(os.environ.get("NEXA_CACHE_MAX_BYTES", 2 * 1024**3))
+                                        # Least-recently-used entries evicted above this size
+
+# ────────────────────────────────────────────────────────────────────────────
+# STREAMING INGESTION - Inputs larger than memory
+# ────────────────────────────────────────────────────────────────────────────
+# Above STREAM_MIN_BYTES the CSV is read in chunks and aggregated into edges on
+# the fly; only temporal-smurfing occurrences are spilled to disk, hashed by
+# account into STREAM_SPILL_BUCKETS files under STREAM_SPILL_DIR.
+
+STREAM_MIN_BYTES = int(os.environ.get("NEXA_STREAM_MIN_BYTES", 1024**3))
+STREAM_CHUNK_ROWS = 1_000_000           # Rows per chunk (bounds per-chunk memory)
+STREAM_SPILL_BUCKETS = 64               # Spill files; detection loads one at a time
+STREAM_SPILL_DIR = os.environ.get("NEXA_SPILL_DIR")   # None = system temp dir
+
+# ────────────────────────────────────────────────────────────────────────────
+# INCREMENTAL MODE - Appended batches (incremental.IncrementalEngine)
+# ────────────────────────────────────────────────────────────────────────────
+# Detection re-runs only on the neighbourhood touched by each batch. PageRank is
+# the one global signal that cannot be localised, so it is refreshed lazily.
+
+INCREMENTAL_PAGERANK_REFRESH = 0.05     # Recompute PageRank after 5% edge growth
+                                        # (0 = after every batch that adds edges)
+INCREMENTAL_CHAIN_RESERVOIR = 2         # Chains kept = this × CHAIN_TOP_K
+                                        # Rationale: headroom so evictions rarely
+                                        # change the reported top-K
+
+# ────────────────────────────────────────────────────────────────────────────
+# PIPELINE EXECUTION - Stage DAG (pipeline_dag.run_stages)
+# ────────────────────────────────────────────────────────────────────────────
+# Cycle, fan and chain detection are independent and run concurrently;
+# scoring and ring assembly wait for all three.
+
+PIPELINE_MODE = os.environ.get("NEXA_PIPELINE_MODE", "auto")
+                                        # "auto": forked processes where available,
+                                        #         else threads
+                                        # "process" / "thread" / "serial": force one
+PIPELINE_WORKERS = None                 # Concurrent stages (None = CPU budget)
+PIPELINE_PARALLEL_MIN_EDGES = 50_000    # Below this many edges, run stages serially
+                                        # Rationale: forking costs more than the
+                                        # detectors on small graphs
+PIPELINE_TRACE_MEMORY = os.environ.get("NEXA_TRACE_MEMORY", "0") == "1"
+                                        # Per-stage tracemalloc peak in /api/metrics
+                                        # Off by default: tracing slows the
+                                        # pipeline several-fold
+
+# ────────────────────────────────────────────────────────────────────────────
+# NETWORK STATISTICS - avg_clustering served by /network-stats (utils/graph_stats.py)
+# ────────────────────────────────────────────────────────────────────────────
+
+NETWORK_STATS_CLUSTERING = os.environ.get("NEXA_NETWORK_STATS_CLUSTERING", "auto")
+                                        # "auto": exact up to the wedge limit below,
+                                        #         sampled beyond it
+                                        # "exact" / "sampled": force one
+                                        # "off": leave avg_clustering out
+NETWORK_STATS_EXACT_MAX_WEDGES = 5_000_000
+                                        # Neighbour pairs (Σ d(d-1)/2) an exact pass
+                                        # may touch; hub accounts push this quadratic
+NETWORK_STATS_CLUSTERING_EPSILON = float(os.environ.get("NEXA_CLUSTERING_EPSILON", "0.01"))
+                                        # Sampled mode: max absolute error...
+NETWORK_STATS_CLUSTERING_CONFIDENCE = 0.95
+                                        # ...with this probability (Hoeffding bound;
+                                        # 0.01 @ 95% ≈ 18.5K samples)
+
 # ────────────────────────────────────────────────────────────────────────────
 # API CONFIGURATION
 # ────────────────────────────────────────────────────────────────────────────
@@ -190,6 +290,21 @@ LEGIT_LONG_WINDOW_DAYS = 30             # Merchant activity window: 30 days mini
 API_PORT = 8000                          # FastAPI server port (standard)
 API_HOST = "0.0.0.0"                     # Listen on all interfaces for deployment
 DEBUG = False                            # Production mode (stricter error handling)
+ANALYSIS_WORKERS = None                  # Process pool size for analyses (None = CPU budget)
+                                        # Each job worker gets budget // workers cores
+                                        # for its stages and cycle search; the budget
+                                        # is NEXA_CPU_BUDGET, or all cores (utils/cpu.py)
+ANALYSIS_QUEUE_DEPTH = 16                # Queued + running analyses before HTTP 429
+                                        # Rationale: bounded backlog keeps latency
+                                        # predictable instead of piling up uploads
+JOB_HISTORY_LIMIT = 1_000                # Finished job records kept for status polling
+ANALYSIS_STORE_PATH = os.environ.get(    # SQLite file shared by all API workers
+    "NEXA_ANALYSIS_STORE", os.path.join(CACHE_ROOT, "analyses.sqlite3"),
+)
+ANALYSIS_STORE_MAX_ANALYSES = 500        # Results kept on disk; oldest deleted first
+ANALYSIS_MEMORY_ENTRIES = 32             # Results kept decoded in memory (LRU)
+ANALYSIS_MEMORY_TTL_SECONDS = 900        # Memory copies expire; disk copy remains
+RESPONSE_CACHE_MAX_BYTES = 256 * 1024**2 # Encoded (and gzip/br) response bodies kept for re-reads
 
 # ────────────────────────────────────────────────────────────────────────────
 # PERFORMANCE TARGETS & LIMITS
@@ -197,24 +312,31 @@ DEBUG = False                            # Production mode (stricter error handl
 # RIFT Requirement: "Upload to results display ≤ 30 seconds (10K transactions)"
 # Typical performance: 2-3 seconds on standard hardware
 
-MAX_ACCOUNTS_PER_ANALYSIS = 10_000       # Maximum unique accounts per analysis
+MAX_ACCOUNTS_PER_ANALYSIS = 10_000       # Maximum unique accounts per detection shard
                                         # Rationale: Testing target per RIFT spec
-                                        # Scaling: If > 10K, consider sharding
+                                        # Scaling: Larger graphs are split into
+                                        # weakly-connected-component shards that run
+                                        # as separate pipeline stages (sharding.py)
 
-ANALYSIS_TIMEOUT_SECONDS = 30            # Hard timeout for analysis pipeline
+ANALYSIS_TIMEOUT_SECONDS = float(os.environ.get("NEXA_ANALYSIS_TIMEOUT_SECONDS", "30")) or None
+                                        # Hard timeout for analysis pipeline
                                         # RIFT requirement: ≤ 30 seconds
                                         # If hit: Return partial results + warning
+                                        # (detectors stop cooperatively; 0 = no limit)
 
 # ────────────────────────────────────────────────────────────────────────────
 # LOGGING & DIAGNOSTICS
 # ────────────────────────────────────────────────────────────────────────────
 
-LOG_LEVEL = "INFO"                       # Logging verbosity
+LOG_LEVEL = os.environ.get("NEXA_LOG_LEVEL", "INFO")
+                                        # Logging verbosity
                                         # DEBUG: Verbose output (algorithm tracing)
                                         # INFO: Standard output (progress messages)
                                         # WARNING: Only issues
 
-LOG_FILE = "logs/ai_engine.log"          # Log file location
+LOG_FILE = os.environ.get("NEXA_LOG_FILE", "logs/ai_engine.log")
+                                        # Log file location (relative to this directory;
+                                        # empty string = console only)
                                         # Created automatically if missing
 
 # ────────────────────────────────────────────────────────────────────────────
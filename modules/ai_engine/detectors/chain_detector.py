@@ -1,81 +1,128 @@
 """
 Chain Detector - Shell account layering chains.
 PS Requirement: 3+ hops where intermediaries have ≤ 3 total transactions.
-Includes MAX_RESULTS cap to prevent explosion on dense graphs.
+Search runs only over shell accounts plus the non-shell accounts they touch,
+and keeps the CHAIN_TOP_K chains with the largest total_amount. An expired
+Deadline stops the search with the chains ranked so far (`complete` = False).
 """
 
+import heapq
 import networkx as nx
+import numpy as np
 import pandas as pd
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple, Union
 from config import (
     CHAIN_DETECTION_MIN_LENGTH,
     SHELL_ACCOUNT_MAX_TRANSACTIONS,
     MAX_CHAIN_DEPTH,
+    CHAIN_TOP_K,
 )
+from utils.account_profiles import build_account_profiles
+from utils.deadline import NO_DEADLINE, Deadline
+from utils.graph_builder import TransactionGraph
+from utils.log import get_logger
+
+logger = get_logger(__name__)
 
 
 class ChainDetector:
-    def __init__(self, G: nx.DiGraph, df: pd.DataFrame):
-        self.G = G
+    def __init__(
+        self,
+        G: Union[TransactionGraph, nx.DiGraph],
+        df: pd.DataFrame,
+        profiles: Optional[pd.DataFrame] = None,
+        deadline: Deadline = NO_DEADLINE,
+    ):
+        self.deadline = deadline
+        self.complete = True
+        self.tg = G if isinstance(G, TransactionGraph) else TransactionGraph.from_networkx(G)
         self.df = df
-        all_accounts = pd.concat([df['sender_id'], df['receiver_id']])
-        self.txn_count: Dict[str, int] = all_accounts.value_counts().to_dict()
-
-    def detect_shell_chains(self, min_length: int = CHAIN_DETECTION_MIN_LENGTH) -> List[Dict]:
-        shell_chains: List[Dict] = []
-        visited_chains: set = set()
-        MAX_RESULTS = 200  # cap to prevent explosion on dense graphs
-
-        # Only start DFS from non-shell, active nodes
-        source_nodes = [
-            n for n in self.G.nodes()
-            if not self._is_shell(n) and self.G.out_degree(n) > 0
-        ]
-
-        def dfs(path: List[str], depth: int):
-            # Early exits
-            if len(shell_chains) >= MAX_RESULTS:
-                return
-            if depth > MAX_CHAIN_DEPTH:
-                return
+        if profiles is None:
+            profiles = build_account_profiles(df)
+        self.txn_count: Dict[str, int] = profiles['txn_count'].to_dict()
+        counts = profiles['txn_count'].reindex(self.tg.account_ids, fill_value=0).to_numpy()
+        self._shell = counts <= SHELL_ACCOUNT_MAX_TRANSACTIONS
 
-            current = path[-1]
-            for neighbor in self.G.successors(current):
-                if neighbor in path:
-                    continue
+    def detect_shell_chains(
+        self,
+        min_length: int = CHAIN_DETECTION_MIN_LENGTH,
+        top_k: int = CHAIN_TOP_K,
+    ) -> List[Dict]:
+        """
+        Iterative DFS from every non-shell account that pays into a shell.
 
-                new_path = path + [neighbor]
-                intermediaries = new_path[1:-1]  # exclude source and destination
+        A path is only extended through shell accounts, so every prefix already
+        satisfies the "all intermediaries are shells" rule and nothing is
+        re-checked. Chains are ranked in a size-bounded min-heap on
+        total_amount; ties keep the chain found first.
+        """
+        tg, shell = self.tg, self._shell
+        max_nodes = MAX_CHAIN_DEPTH + 1
 
-                if len(new_path) >= min_length and intermediaries:
-                    if all(self._is_shell(n) for n in intermediaries):
-                        key = tuple(new_path)
-                        if key not in visited_chains:
-                            visited_chains.add(key)
-                            total_amount = sum(
-                                self.G.edges[new_path[i], new_path[i + 1]].get('amount', 0)
-                                for i in range(len(new_path) - 1)
-                            )
-                            shell_chains.append({
-                                'chain':                new_path,
-                                'length':               len(new_path),
-                                'total_amount':         total_amount,
-                                'shell_intermediaries': intermediaries,
-                                'hop_count':            len(new_path) - 1,
-                                'pattern':              f'shell_chain_{len(new_path)}hop',
-                            })
+        # Shell subgraph: out-edges of shells, plus non-shell → shell entry edges
+        into_shell = shell[tg.dst]
+        keep = shell[tg.src] | into_shell
+        succ: Dict[int, List[Tuple[int, float]]] = {}
+        for u, v, amt in zip(tg.src[keep].tolist(), tg.dst[keep].tolist(), tg.amount[keep].tolist()):
+            succ.setdefault(u, []).append((v, amt))
+        sources = np.unique(tg.src[into_shell & ~shell[tg.src]]).tolist()
 
-                # Only recurse if we haven't hit the cap
-                if len(shell_chains) < MAX_RESULTS:
-                    dfs(new_path, depth + 1)
-
-        for source in source_nodes:
-            if len(shell_chains) >= MAX_RESULTS:
+        heap: List[Tuple[float, int, Tuple[int, ...]]] = []
+        found = 0
+        expired = self.deadline.ticker()
+        self.complete = True
+        for source in sources:
+            if self.deadline.expired():
+                self.complete = False
+                break
+            path = [source]
+            on_path = {source}
+            sums = [0.0]
+            stack = [iter(succ[source])]
+            while stack:
+                if expired():
+                    self.complete = False
+                    break
+                for v, amt in stack[-1]:
+                    if v in on_path:
+                        continue
+                    total = sums[-1] + amt
+                    if len(path) >= 2 and len(path) + 1 >= min_length:
+                        item = (total, -found, tuple(path) + (v,))
+                        found += 1
+                        if len(heap) < top_k:
+                            heapq.heappush(heap, item)
+                        elif total > heap[0][0]:
+                            heapq.heapreplace(heap, item)
+                    if shell[v] and v in succ and len(path) + 1 < max_nodes:
+                        path.append(v)
+                        on_path.add(v)
+                        sums.append(total)
+                        stack.append(iter(succ[v]))
+                        break
+                else:
+                    stack.pop()
+                    sums.pop()
+                    on_path.discard(path.pop())
+            if not self.complete:
                 break
-            dfs([source], 1)
 
-        shell_chains.sort(key=lambda x: x['length'], reverse=True)
-        print(f"✅ Shell chains: {len(shell_chains)}")
+        ids = self.tg.account_ids
+        shell_chains: List[Dict] = []
+        for total, _, nodes in sorted(heap, key=lambda item: (-item[0], -item[1])):
+            chain = [ids[n] for n in nodes]
+            shell_chains.append({
+                'chain':                chain,
+                'length':               len(chain),
+                'total_amount':         total,
+                'shell_intermediaries': chain[1:-1],
+                'hop_count':            len(chain) - 1,
+                'pattern':              f'shell_chain_{len(chain)}hop',
+            })
+
+        if not self.complete:
+            logger.warning(f"⚠️  Chain search hit the deadline; keeping {len(shell_chains)} chains")
+        logger.info(f"✅ Shell chains: {len(shell_chains)} kept of {found} found")
         return shell_chains
 
     def get_chains_summary(self) -> Dict:
@@ -83,4 +130,4 @@ class ChainDetector:
         return {'total': len(chains), 'chains': chains[:10]}
 
     def _is_shell(self, node: str) -> bool:
-        return self.txn_count.get(node, 0) <= SHELL_ACCOUNT_MAX_TRANSACTIONS
\ No newline at end of file
+        return self.txn_count.get(node, 0) <= SHELL_ACCOUNT_MAX_TRANSACTIONS
@@ -1,63 +1,458 @@
 """
-Cycle Detector - Johnson's algorithm with false-positive filters.
+Cycle Detector - Length-bounded simple-cycle search with false-positive filters.
+Legit hubs are removed from the search graph up front and paths are never
+extended past max_length hops, so cost scales with the number of short cycles.
+Nodes that cannot lie on a cycle are trimmed, and the remaining strongly
+connected components are searched independently (in a process pool when large).
+In "sparse" mode 3- and 4-hop cycles come from sparse adjacency products
+instead of path search. Works on TransactionGraph arrays; a networkx graph is
+converted on the way in.
+
+With a Deadline the search stops once it expires, keeping the cycles found
+so far and clearing `complete`.
 """
 
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Hashable, Iterator, List, Optional, Set, Tuple, Union
+
 import networkx as nx
-from typing import List, Set
+import numpy as np
+from utils.cpu import cpu_budget
+from utils.deadline import NO_DEADLINE, Deadline, DeadlineExceeded
+from utils.graph_builder import TransactionGraph
 from config import (
     CYCLE_DETECTION_MIN_LENGTH,
     CYCLE_DETECTION_MAX_LENGTH,
     MIN_CYCLE_AMOUNT,
+    CYCLE_DETECTION_MODE,
+    CYCLE_DETECTION_WORKERS,
+    CYCLE_PARALLEL_MIN_NODES,
 )
+from utils.log import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    import scipy.sparse as sp
+    from scipy.sparse import csgraph
+except ImportError:  # sparse mode degrades to path search
+    sp = None
+
+Adjacency = Dict[Hashable, List[Hashable]]
+# (phase, node ints, sequence): sorts cycles into iter_cycles order
+CycleKey = Tuple[int, Tuple[int, ...], int]
+
+
+def bounded_simple_cycles(
+    succ: Adjacency,
+    pred: Adjacency,
+    order: List[Hashable],
+    min_length: int,
+    max_length: int,
+    deadline: Deadline = NO_DEADLINE,
+) -> Iterator[List[Hashable]]:
+    """
+    Lazily yield every simple cycle with min_length..max_length nodes, once.
+
+    Each cycle is rooted at its lowest-ranked node (position in `order`) and the
+    search from a root only visits higher-ranked nodes, so no rotation is seen
+    twice. A backward BFS from the root bounds how far a path may wander and
+    still close within max_length hops.
+
+    Raises:
+        DeadlineExceeded: Once `deadline` expires (cycles already yielded stand)
+    """
+    rank = {n: i for i, n in enumerate(order)}
+    expired = deadline.ticker()
+    for root in order:
+        deadline.check()
+        r = rank[root]
+
+        # dist[v] = hops needed to get from v back to root (higher ranks only)
+        dist = {root: 0}
+        frontier = [root]
+        for d in range(1, max_length):
+            nxt = []
+            for v in frontier:
+                for u in pred[v]:
+                    if u not in dist and rank[u] > r:
+                        dist[u] = d
+                        nxt.append(u)
+            frontier = nxt
+        if len(dist) < min_length:
+            continue
+
+        path = [root]
+        on_path = {root}
+        stack = [iter(succ[root])]
+        while stack:
+            if expired():
+                deadline.check()
+            for w in stack[-1]:
+                if w == root:
+                    if len(path) >= min_length:
+                        yield list(path)
+                    continue
+                if w in on_path or w not in dist:
+                    continue
+                if len(path) + dist[w] > max_length:
+                    continue
+                path.append(w)
+                on_path.add(w)
+                stack.append(iter(succ[w]))
+                break
+            else:
+                stack.pop()
+                on_path.discard(path.pop())
+
+
+def trim_acyclic_nodes(
+    src: np.ndarray, dst: np.ndarray, alive: np.ndarray, max_rounds: int = 64
+) -> np.ndarray:
+    """
+    Peel nodes with no live in- or out-edge until nothing changes.
+
+    Each round is one vectorised pass over the edges; long tails that need
+    more than max_rounds are left for the SCC split, which drops them anyway.
+    """
+    alive = alive.copy()
+    n = len(alive)
+    for _ in range(max_rounds):
+        live = alive[src] & alive[dst]
+        nxt = (
+            alive
+            & (np.bincount(src[live], minlength=n) > 0)
+            & (np.bincount(dst[live], minlength=n) > 0)
+        )
+        if nxt.sum() == alive.sum():
+            break
+        alive = nxt
+    return alive
+
+
+def _strong_component_labels(n: int, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    if sp is not None:
+        A = sp.csr_matrix((np.ones(len(src), dtype=np.int8), (src, dst)), shape=(n, n))
+        return csgraph.connected_components(A, directed=True, connection='strong')[1]
+    H = nx.DiGraph()
+    H.add_nodes_from(range(n))
+    H.add_edges_from(zip(src.tolist(), dst.tolist()))
+    labels = np.empty(n, dtype=np.int64)
+    for label, comp in enumerate(nx.strongly_connected_components(H)):
+        labels[list(comp)] = label
+    return labels
+
+
+def _search_components(
+    components: List[Tuple[List[Hashable], Adjacency, Adjacency, Dict[Tuple, float]]],
+    min_length: int,
+    max_length: int,
+    min_amount: float,
+    deadline: Deadline = NO_DEADLINE,
+) -> Tuple[List[List[List[Hashable]]], bool]:
+    """
+    Pool task: bounded search over a batch of components, one cycle list each.
+    Returns (cycle lists, complete); an expired deadline ends the batch early.
+    """
+    results = []
+    for order, succ, pred, amounts in components:
+        found = []
+        results.append(found)
+        try:
+            for cycle in bounded_simple_cycles(succ, pred, order, min_length, max_length, deadline):
+                total = sum(amounts[(cycle[i], cycle[(i + 1) % len(cycle)])]
+                            for i in range(len(cycle)))
+                if total >= min_amount:
+                    found.append(cycle)
+        except DeadlineExceeded:
+            return results, False
+    return results, True
+
+
+class _SparseShortCycles:
+    """
+    Vectorised 3- and 4-hop cycle finder over an integer-indexed edge list.
+
+    Nodes are numbered in rank order and every cycle is reported rooted at its
+    lowest index. Sparse products pick the (root, opposite-node) pairs that can
+    close a cycle; wedges through those pairs are then expanded and masked with
+    NumPy, so no Python loop runs per path.
+    """
+
+    def __init__(self, n: int, src: np.ndarray, dst: np.ndarray, amount: np.ndarray):
+        keep = src != dst
+        src, dst, amount = src[keep], dst[keep], amount[keep]
+        self.n = n
+        self.A = sp.csr_matrix(
+            (np.ones(len(src), dtype=np.int64), (src, dst)), shape=(n, n)
+        )
+        self.A.sum_duplicates()
+        self.A.sort_indices()
+        # Sorted edge keys let us look up any (u, v) amount with searchsorted
+        keys = src.astype(np.int64) * n + dst
+        order = np.argsort(keys, kind='stable')
+        self._keys = keys[order]
+        self._amount = amount[order].astype(np.float64)
+
+    def _edge_pos(self, u: np.ndarray, v: np.ndarray) -> np.ndarray:
+        """Position of edge u→v in the sorted key table, -1 if absent."""
+        keys = u.astype(np.int64) * self.n + v
+        pos = np.searchsorted(self._keys, keys)
+        pos[pos >= len(self._keys)] = len(self._keys) - 1
+        return np.where(self._keys[pos] == keys, pos, -1) if len(self._keys) else np.full(len(keys), -1)
+
+    def _wedges(self, a: np.ndarray, b: np.ndarray, floor: np.ndarray):
+        """All a→x→b with x > floor, as (pair index, x)."""
+        indptr, indices = self.A.indptr, self.A.indices
+        counts = indptr[a + 1] - indptr[a]
+        pair = np.repeat(np.arange(len(a)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        x = indices[np.repeat(indptr[a], counts) + offsets]
+        ok = (x > floor[pair]) & (x != b[pair]) & (self._edge_pos(x, b[pair]) >= 0)
+        return pair[ok], x[ok]
+
+    def _amounts(self, *legs: np.ndarray) -> np.ndarray:
+        total = np.zeros(len(legs[0]), dtype=np.float64)
+        for u, v in zip(legs, legs[1:] + legs[:1]):
+            total += self._amount[self._edge_pos(u, v)]
+        return total
+
+    def triangles(self, min_amount: float) -> np.ndarray:
+        """Rows (i, j, k) for i→j→k→i with i the smallest index."""
+        A = self.A
+        # T[i, k] > 0  ⇔  some i→j→k exists and k→i closes it
+        T = sp.triu((A @ A).multiply(A.T), k=1).tocoo()
+        pair, j = self._wedges(T.row, T.col, T.row)
+        i, k = T.row[pair], T.col[pair]
+        rows = np.column_stack([i, j, k])
+        return self._finish(rows, min_amount)
+
+    def squares(self, min_amount: float) -> np.ndarray:
+        """Rows (i, j, k, l) for i→j→k→l→i with i the smallest index."""
+        S = self.A @ self.A
+        # C[i, k] > 0  ⇔  2-paths exist both i⇝k and k⇝i
+        C = sp.triu(S.multiply(S.T), k=1).tocoo()
+        i_, k_ = C.row, C.col
+        p1, j = self._wedges(i_, k_, i_)
+        p2, l = self._wedges(k_, i_, i_)
+
+        # Cartesian product of the two wedge sets within each pair
+        o1, o2 = np.argsort(p1, kind='stable'), np.argsort(p2, kind='stable')
+        p1, j, p2, l = p1[o1], j[o1], p2[o2], l[o2]
+        c2 = np.bincount(p2, minlength=len(i_))
+        start2 = np.cumsum(c2) - c2
+        rep = c2[p1]
+        left = np.repeat(np.arange(len(p1)), rep)
+        within = np.arange(rep.sum()) - np.repeat(np.cumsum(rep) - rep, rep)
+        right = np.repeat(start2[p1], rep) + within
+
+        pair, j, l = p1[left], j[left], l[right]
+        ok = j != l
+        rows = np.column_stack([i_[pair[ok]], j[ok], k_[pair[ok]], l[ok]])
+        return self._finish(rows, min_amount)
+
+    def _finish(self, rows: np.ndarray, min_amount: float) -> np.ndarray:
+        if len(rows) == 0:
+            return rows
+        rows = rows[self._amounts(*rows.T) >= min_amount]
+        return rows[np.lexsort(rows.T[::-1])]
 
 
 class CycleDetector:
     def __init__(
         self,
-        G: nx.DiGraph,
+        G: Union[TransactionGraph, nx.DiGraph],
         min_length: int = CYCLE_DETECTION_MIN_LENGTH,
         max_length: int = CYCLE_DETECTION_MAX_LENGTH,
         min_cycle_amount: float = MIN_CYCLE_AMOUNT,
+        workers: Optional[int] = CYCLE_DETECTION_WORKERS,
+        mode: str = CYCLE_DETECTION_MODE,
+        deadline: Deadline = NO_DEADLINE,
     ):
-        self.G = G
+        self.tg = G if isinstance(G, TransactionGraph) else TransactionGraph.from_networkx(G)
         self.min_len = min_length
         self.max_len = max_length
         self.min_cycle_amount = min_cycle_amount
+        self.workers = workers or cpu_budget()
+        self.mode = mode if sp is not None else 'path'
+        self.deadline = deadline
         self.cycles: List[List[str]] = []
+        self.cycle_keys: List[CycleKey] = []
+        self.complete = True
 
         # Nodes with very high in AND out degree → likely merchant/payroll
-        self._legit_hubs: Set[str] = {
-            n for n in G.nodes()
-            if G.in_degree(n) > 10 and G.out_degree(n) > 10
-        }
+        self._hub_mask = (self.tg.in_degree > 10) & (self.tg.out_degree > 10)
+        self._legit_hubs: Set[str] = set(self.tg.account_ids[self._hub_mask].tolist())
+
+    def iter_cycles(self) -> Iterator[List[str]]:
+        """
+        Yield suspicious cycles, hubs never entering the search.
+
+        Order is deterministic: components by their lowest node index, then
+        roots by index, however the pool scheduled them.
+
+        Raises:
+            DeadlineExceeded: When the deadline expires mid-search
+        """
+        for _, cycle in self.iter_keyed_cycles():
+            yield cycle
+
+    def iter_keyed_cycles(self) -> Iterator[Tuple[CycleKey, List[str]]]:
+        """
+        (key, cycle) pairs in iter_cycles order, keys ascending.
+
+        Keys only hold node ints and a per-component sequence, so cycles found
+        on subgraphs whose nodes keep their relative order (sharding.py) merge
+        back into the whole-graph order by sorting on the remapped keys.
+        """
+        labels, src, dst, amount = self._cyclic_core()
+        if len(src) == 0:
+            return
+        ids = self.tg.account_ids
+
+        if self.mode == 'sparse':
+            self.deadline.check()
+            for row in self._sparse_short_cycles(src, dst, amount):
+                yield (len(row) - 3, tuple(row), 0), [ids[i] for i in row]
+            path_min = max(self.min_len, 5)
+            if path_min > self.max_len:
+                return
+        else:
+            path_min = self.min_len
+
+        for seq, (first, cycle) in enumerate(self._path_cycles(labels, src, dst, amount, path_min)):
+            yield (2, (first,), seq), [ids[i] for i in cycle]
+
+    def _cyclic_core(self):
+        """
+        Hub-free, trimmed intra-SCC edges of components that can hold a
+        min_len cycle. Returns (component label per node, src, dst, amount).
+        """
+        tg = self.tg
+        n = tg.number_of_nodes()
+        keep = ~self._hub_mask[tg.src] & ~self._hub_mask[tg.dst] & (tg.src != tg.dst)
+        alive = trim_acyclic_nodes(tg.src[keep], tg.dst[keep], ~self._hub_mask)
+        keep &= alive[tg.src] & alive[tg.dst]
+        src, dst, amount = tg.src[keep], tg.dst[keep], tg.amount[keep]
+
+        labels = _strong_component_labels(n, src, dst)
+        sizes = np.bincount(labels)
+        intra = (labels[src] == labels[dst]) & (sizes[labels[src]] >= self.min_len)
+        return labels, src[intra], dst[intra], amount[intra]
+
+    def _path_cycles(
+        self, labels: np.ndarray, src: np.ndarray, dst: np.ndarray,
+        amount: np.ndarray, min_len: int,
+    ) -> Iterator[Tuple[int, List[int]]]:
+        """(lowest node of the cycle's component, cycle) by component, then root."""
+        comp_nodes: Dict[int, List[int]] = {}
+        for node in np.unique(src).tolist():
+            comp_nodes.setdefault(int(labels[node]), []).append(node)
+        components = sorted(
+            (nodes for nodes in comp_nodes.values() if len(nodes) >= min_len),
+            key=lambda nodes: nodes[0],
+        )
+        if not components:
+            return
+        payloads = self._component_payloads(components, labels, src, dst, amount)
+        n_nodes = sum(len(c) for c in components)
+
+        if self.workers > 1 and len(components) > 1 and n_nodes >= CYCLE_PARALLEL_MIN_NODES:
+            per_component: List[List[List[int]]] = [[] for _ in components]
+            complete = True
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                futures = {
+                    pool.submit(_search_components, [payloads[i] for i in batch],
+                                min_len, self.max_len, self.min_cycle_amount,
+                                self.deadline): batch
+                    for batch in self._batches(components)
+                }
+                for future, batch in futures.items():
+                    found_lists, done = future.result()
+                    complete &= done
+                    for i, found in zip(batch, found_lists):
+                        per_component[i] = found
+            for nodes, found in zip(components, per_component):
+                for cycle in found:
+                    yield nodes[0], cycle
+            if not complete:
+                raise DeadlineExceeded("cycle search stopped at the deadline")
+            return
+
+        for nodes, payload in zip(components, payloads):
+            found_lists, done = _search_components([payload], min_len, self.max_len,
+                                                   self.min_cycle_amount, self.deadline)
+            for cycle in found_lists[0]:
+                yield nodes[0], cycle
+            if not done:
+                raise DeadlineExceeded("cycle search stopped at the deadline")
+
+    def _component_payloads(self, components, labels, src, dst, amount):
+        """Per-component (order, succ, pred, amounts) with plain-int nodes."""
+        index = {int(labels[c[0]]): i for i, c in enumerate(components)}
+        payloads = [(c, {n: [] for n in c}, {n: [] for n in c}, {}) for c in components]
+        for u, v, amt, label in zip(src.tolist(), dst.tolist(), amount.tolist(),
+                                    labels[src].tolist()):
+            i = index.get(label)
+            if i is None:
+                continue
+            _, succ, pred, amounts = payloads[i]
+            succ[u].append(v)
+            pred[v].append(u)
+            amounts[(u, v)] = amt
+        return payloads
+
+    def _batches(self, components: List[List[int]]) -> List[List[int]]:
+        """Greedy size-balanced bins of component indices, a few per worker."""
+        n_bins = min(len(components), self.workers * 4)
+        bins: List[List[int]] = [[] for _ in range(n_bins)]
+        loads = [0] * n_bins
+        for idx in sorted(range(len(components)), key=lambda i: len(components[i]), reverse=True):
+            b = loads.index(min(loads))
+            bins[b].append(idx)
+            loads[b] += len(components[idx])
+        return [b for b in bins if b]
+
+    def _sparse_short_cycles(
+        self, src: np.ndarray, dst: np.ndarray, amount: np.ndarray
+    ) -> Iterator[List[int]]:
+        """3- and 4-hop cycles of the cyclic core via sparse matrix products."""
+        lengths = [L for L in (3, 4) if self.min_len <= L <= self.max_len]
+        if not lengths:
+            return
+        finder = _SparseShortCycles(self.tg.number_of_nodes(), src, dst, amount)
+        for L in lengths:
+            self.deadline.check()
+            rows = finder.triangles(self.min_cycle_amount) if L == 3 \
+                else finder.squares(self.min_cycle_amount)
+            yield from rows.tolist()
 
     def find_cycles_johnson(self) -> List[List[str]]:
+        """
+        Run the search into self.cycles / self.cycle_keys.
+
+        Raises:
+            Exception: Anything other than the deadline (a broken process pool,
+                a pickling error) propagates rather than passing as "no cycles"
+        """
+        self.cycles, self.cycle_keys, self.complete = [], [], True
         try:
-            raw = list(nx.simple_cycles(self.G))
-            self.cycles = [c for c in raw if self._is_suspicious(c)]
-            print(f"✅ Cycles: {len(raw)} raw → {len(self.cycles)} suspicious")
-            return self.cycles
+            for key, cycle in self.iter_keyed_cycles():
+                self.cycle_keys.append(key)
+                self.cycles.append(cycle)
+        except DeadlineExceeded:
+            self.complete = False
+            logger.warning(f"⚠️  Cycle search hit the deadline; keeping {len(self.cycles)} found")
         except Exception as exc:
-            print(f"❌ Cycle error: {exc}")
-            return []
+            self.cycles, self.cycle_keys, self.complete = [], [], False
+            logger.error(f"❌ Cycle error: {exc}")
+            raise
+        logger.info(f"✅ Cycles: {len(self.cycles)} suspicious "
+                    f"({len(self._legit_hubs)} hubs excluded, max_len={self.max_len})")
+        return self.cycles
 
     def flag_accounts_in_cycles(self) -> Set[str]:
         flagged: Set[str] = set()
         for cycle in self.cycles:
             flagged.update(cycle)
         return flagged
-
-    def _is_suspicious(self, cycle: List[str]) -> bool:
-        if not (self.min_len <= len(cycle) <= self.max_len):
-            return False
-        if any(n in self._legit_hubs for n in cycle):
-            return False
-        total = 0.0
-        for i in range(len(cycle)):
-            src = cycle[i]
-            dst = cycle[(i + 1) % len(cycle)]
-            edge = self.G.edges.get((src, dst))
-            if edge is None:
-                return False
-            total += edge.get('amount', 0)
-        return total >= self.min_cycle_amount
\ No newline at end of file
@@ -4,125 +4,241 @@ PS Requirements:
   - Threshold: 10+ unique counterparties
   - Temporal smurfing: 10+ transactions within 72-hour sliding window
   - Must NOT flag legitimate merchants or payroll accounts
+An expired Deadline ends each scan early with what it found (`complete` = False).
 """
 
+import numpy as np
 import pandas as pd
 import networkx as nx
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from config import FAN_PATTERN_THRESHOLD, TEMPORAL_WINDOW_HOURS, LEGIT_LONG_WINDOW_DAYS
+from utils.account_profiles import build_account_profiles
+from utils.csv_loader import account_codes
+from utils.deadline import NO_DEADLINE, Deadline
+from utils.graph_builder import TransactionGraph
+from utils.log import get_logger
+
+logger = get_logger(__name__)
+
+SMURF_SWEEP_ACCOUNTS = 4096     # accounts per temporal-smurfing sweep between deadline checks
 
 
 class FanDetector:
-    def __init__(self, G: nx.DiGraph, df: pd.DataFrame):
+    def __init__(self, G: Optional[Union[TransactionGraph, nx.DiGraph]], df: pd.DataFrame,
+                 profiles: Optional[pd.DataFrame] = None, deadline: Deadline = NO_DEADLINE):
+        """G: a TransactionGraph (degrees and amounts from its arrays) or a
+        networkx graph; None when only temporal smurfing is run."""
+        self.deadline = deadline
+        self.complete = True
         self.G = G
         self.df = df
+        if profiles is None:
+            profiles = build_account_profiles(df)
+        self._span_days: Dict[str, float] = profiles['span_days'].to_dict()
 
     def detect_all_patterns(self, threshold: int = FAN_PATTERN_THRESHOLD) -> Dict:
-        return {
+        self.complete = True
+        patterns = {
             'fan_out':           self.detect_fan_out(threshold),
             'fan_in':            self.detect_fan_in(threshold),
             'temporal_smurfing': self.detect_temporal_smurfing(threshold),
         }
+        if not self.complete:
+            logger.warning("⚠️  Fan detection hit the deadline; patterns are partial")
+        return patterns
 
-    def detect_fan_out(self, threshold: int = FAN_PATTERN_THRESHOLD) -> List[Dict]:
+    def detect_fan_out(self, threshold: int = FAN_PATTERN_THRESHOLD,
+                      nodes: Optional[Iterable[str]] = None) -> List[Dict]:
+        """nodes: restrict the check to these accounts (default: every node in G)."""
         results = []
-        for node in self.G.nodes():
-            recipients = list(self.G.successors(node))
-            if len(recipients) >= threshold and not self._is_legit_merchant(node):
-                total_sent = sum(
-                    self.G.edges[node, r].get('amount', 0) for r in recipients
-                )
+        expired = self.deadline.ticker()
+        for node, recipients, total_sent in self._fans(threshold, nodes, out=True):
+            if expired():
+                self.complete = False
+                break
+            if not self._is_legit_merchant(node):
                 results.append({
                     'account':         node,
-                    'recipient_count': len(recipients),
+                    'recipient_count': recipients,
                     'total_amount':    total_sent,
                     'pattern':         'fan_out',
                 })
-        print(f"✅ Fan-out: {len(results)}")
+        logger.info(f"✅ Fan-out: {len(results)}")
         return results
 
-    def detect_fan_in(self, threshold: int = FAN_PATTERN_THRESHOLD) -> List[Dict]:
+    def detect_fan_in(self, threshold: int = FAN_PATTERN_THRESHOLD,
+                     nodes: Optional[Iterable[str]] = None) -> List[Dict]:
+        """nodes: restrict the check to these accounts (default: every node in G)."""
         results = []
-        for node in self.G.nodes():
-            senders = list(self.G.predecessors(node))
-            if len(senders) >= threshold and not self._is_legit_merchant(node):
-                total_received = sum(
-                    self.G.edges[s, node].get('amount', 0) for s in senders
-                )
+        expired = self.deadline.ticker()
+        for node, senders, total_received in self._fans(threshold, nodes, out=False):
+            if expired():
+                self.complete = False
+                break
+            if not self._is_legit_merchant(node):
                 results.append({
                     'account':      node,
-                    'sender_count': len(senders),
+                    'sender_count': senders,
                     'total_amount': total_received,
                     'pattern':      'fan_in',
                 })
-        print(f"✅ Fan-in: {len(results)}")
+        logger.info(f"✅ Fan-in: {len(results)}")
         return results
 
+    def _fans(self, threshold: int, nodes: Optional[Iterable[str]],
+              out: bool) -> Iterator[Tuple[str, int, float]]:
+        """(account, counterparties, total amount) of accounts with ≥ threshold
+        counterparties on one side, in node order."""
+        G = self.G
+        if not isinstance(G, TransactionGraph):
+            neighbours = G.successors if out else G.predecessors
+            for node in (G.nodes() if nodes is None else nodes):
+                peers = list(neighbours(node))
+                if len(peers) >= threshold:
+                    yield node, len(peers), sum(
+                        (G.edges[node, p] if out else G.edges[p, node]).get('amount', 0)
+                        for p in peers
+                    )
+            return
+        # (src, dst)-sorted edges add up in networkx's adjacency order, so the
+        # bincount totals are the same float sums
+        degree = G.out_degree if out else G.in_degree
+        totals = np.bincount(G.src if out else G.dst, weights=G.amount,
+                             minlength=G.number_of_nodes())
+        if nodes is None:
+            candidates = np.flatnonzero(degree >= threshold)
+        else:
+            index = G.index
+            candidates = [index[n] for n in nodes if degree[index[n]] >= threshold]
+        for i in candidates:
+            yield G.account_ids[i], int(degree[i]), float(totals[i])
+
     def detect_temporal_smurfing(self, threshold: int = FAN_PATTERN_THRESHOLD) -> List[Dict]:
         """
-        Two-pointer sliding window — O(n) per account instead of O(n²).
-        Finds accounts with 10+ unique counterparties within any 72-hour window.
-        """
-        smurfs = []
-        window_td = pd.Timedelta(hours=TEMPORAL_WINDOW_HOURS)
-
-        df = self.df[['sender_id', 'receiver_id', 'timestamp']].copy()
-        all_accounts = pd.concat([df['sender_id'], df['receiver_id']]).unique()
-
-        for account in all_accounts:
-            mask = (df['sender_id'] == account) | (df['receiver_id'] == account)
-            involved = df[mask].sort_values('timestamp').reset_index(drop=True)
-
-            if len(involved) < threshold or self._is_legit_merchant(account):
-                continue
-
-            timestamps = involved['timestamp'].values
-            senders    = involved['sender_id'].values
-            receivers  = involved['receiver_id'].values
-
-            max_count = 0
-            best_start = None
-            left = 0
-            counterparties: Dict[str, int] = {}
-
-            for right in range(len(timestamps)):
-                # Add incoming counterparty
-                cp = receivers[right] if senders[right] == account else senders[right]
-                counterparties[cp] = counterparties.get(cp, 0) + 1
-
-                # Shrink window from left until within 72h
-                while (timestamps[right] - timestamps[left]) > window_td.value:
-                    cp_left = receivers[left] if senders[left] == account else senders[left]
-                    counterparties[cp_left] -= 1
-                    if counterparties[cp_left] == 0:
-                        del counterparties[cp_left]
-                    left += 1
-
-                unique_count = len(counterparties)
-                if unique_count >= threshold and unique_count > max_count:
-                    max_count = unique_count
-                    best_start = timestamps[left]
-
-            if max_count >= threshold:
-                smurfs.append({
-                    'account':            account,
-                    'max_counterparties': max_count,
-                    'window_start':       str(best_start),
-                    'window_hours':       TEMPORAL_WINDOW_HOURS,
-                    'pattern':            'temporal_smurfing',
-                })
+        Finds accounts with 10+ unique counterparties within any 72-hour window,
+        for all accounts in one vectorised pass per occurrence batch.
 
-        print(f"✅ Temporal smurfs: {len(smurfs)}")
+        `df` may be a DataFrame or a streamed source (utils.streaming) that
+        yields its (account, counterparty, timestamp) rows in account-disjoint
+        batches spilled to disk.
+        """
+        source = self.df if hasattr(self.df, 'occurrence_batches') else _FrameOccurrences(self.df)
+        found = []
+        for acct, cp, t in source.occurrence_batches():
+            if self.deadline.expired():
+                self.complete = False
+            if not self.complete:
+                break
+            found.extend(self._smurf_windows(acct, cp, t, source.accounts, threshold))
+
+        # Report in the legacy order: first appearance as sender, then receiver
+        found.sort(key=lambda f: source.appearance[f[0]])
+        smurfs = [
+            {
+                'account':            source.accounts[a],
+                'max_counterparties': best,
+                'window_start':       str(np.datetime64(start, 'ns').astype(source.ts_unit)),
+                'window_hours':       TEMPORAL_WINDOW_HOURS,
+                'pattern':            'temporal_smurfing',
+            }
+            for a, best, start in found
+        ]
+        logger.info(f"✅ Temporal smurfs: {len(smurfs)}")
         return smurfs
 
+    def _smurf_windows(self, acct, cp, t, accounts, threshold) -> List[Tuple[int, int, int]]:
+        """
+        (account code, peak unique counterparties, window start ns) for every
+        account in this batch that reaches `threshold`. The sweep runs over
+        SMURF_SWEEP_ACCOUNTS accounts at a time, checking the deadline between
+        slices (the in-memory source is one batch holding every account).
+
+        Every (account, counterparty) occurrence at time s keeps that
+        counterparty "in the window" for window ends t in [s, s + 72h]. Runs of
+        occurrences per pair merge into intervals, and a single sorted sweep of
+        +1/-1 interval events gives the windowed unique-counterparty count for
+        every account at every transaction time.
+        """
+        window = pd.Timedelta(hours=TEMPORAL_WINDOW_HOURS).value
+
+        # Eligibility: enough transactions and not a long-standing merchant
+        codes, per_code = np.unique(acct, return_counts=True)
+        eligible = np.zeros(len(accounts), dtype=bool)
+        for code in codes[per_code >= threshold]:
+            eligible[code] = not self._is_legit_merchant(accounts[code])
+        keep = eligible[acct]
+        acct, cp, t = acct[keep], cp[keep], t[keep]
+        if len(acct) == 0:
+            return []
+
+        order = np.lexsort((t, cp, acct))
+        acct, cp, t = acct[order], cp[order], t[order]
+        account_first = np.flatnonzero(np.r_[True, acct[1:] != acct[:-1]])
+        bounds = np.r_[account_first[::SMURF_SWEEP_ACCOUNTS], len(acct)]
+        found = []
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            if self.deadline.expired():
+                self.complete = False
+                break
+            found.extend(self._sweep(acct[lo:hi], cp[lo:hi], t[lo:hi], window, threshold))
+        return found
+
+    @staticmethod
+    def _sweep(acct, cp, t, window, threshold) -> List[Tuple[int, int, int]]:
+        """_smurf_windows for occurrences sorted by (account, counterparty, time)."""
+        # ── Merge each pair's occurrences into presence intervals ─────────────
+        new_pair = np.r_[True, (acct[1:] != acct[:-1]) | (cp[1:] != cp[:-1])]
+        run_start = new_pair | np.r_[True, np.diff(t) > window]
+        starts = t[run_start]
+        ends = np.maximum.reduceat(t, np.flatnonzero(run_start)) + window + 1
+        run_acct = acct[run_start]
+
+        # ── Sweep: -1 before +1 at equal times, count read after each +1 ──────
+        # Every account's events net to zero, so one global cumsum suffices.
+        ev_acct = np.concatenate([run_acct, run_acct])
+        ev_time = np.concatenate([starts, ends])
+        ev_delta = np.concatenate([np.ones(len(starts), np.int64), -np.ones(len(ends), np.int64)])
+        order = np.lexsort((ev_delta, ev_time, ev_acct))
+        ev_acct, ev_time, ev_delta = ev_acct[order], ev_time[order], ev_delta[order]
+        group_first = np.flatnonzero(np.r_[True, ev_acct[1:] != ev_acct[:-1]])
+        running = np.cumsum(ev_delta)
+        last_at_time = np.r_[(ev_acct[1:] != ev_acct[:-1]) | (ev_time[1:] != ev_time[:-1]), True]
+        counts = np.where(last_at_time & (ev_delta > 0), running, 0)
+
+        best = np.maximum.reduceat(counts, group_first)
+        group_end = np.r_[group_first[1:], len(counts)]
+        found = []
+        for g in np.flatnonzero(best >= threshold):
+            lo, hi = group_first[g], group_end[g]
+            peak_time = ev_time[lo + int(np.argmax(counts[lo:hi] == best[g]))]
+            a = ev_acct[lo]
+            own = t[np.searchsorted(acct, a):np.searchsorted(acct, a, side='right')]
+            window_start = own[(own >= peak_time - window) & (own <= peak_time)].min()
+            found.append((int(a), int(best[g]), int(window_start)))
+        return found
+
     def _is_legit_merchant(self, account: str) -> bool:
         """Transactions spread over >30 days = likely merchant/payroll, skip."""
-        acct_txns = self.df[
-            (self.df['sender_id'] == account) | (self.df['receiver_id'] == account)
-        ]
-        if acct_txns.empty:
-            return False
-        span_days = (
-            acct_txns['timestamp'].max() - acct_txns['timestamp'].min()
-        ).total_seconds() / 86_400
-        return span_days > LEGIT_LONG_WINDOW_DAYS
\ No newline at end of file
+        return self._span_days.get(account, 0.0) > LEGIT_LONG_WINDOW_DAYS
+
+
+class _FrameOccurrences:
+    """In-memory occurrence source: the whole DataFrame as a single batch."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        snd, rcv, self.accounts = account_codes(df)
+        self._snd, self._rcv = snd, rcv
+        self.ts_unit = df['timestamp'].to_numpy().dtype
+        self.appearance = np.empty(len(self.accounts), dtype=np.int64)
+        self.appearance[pd.unique(np.concatenate([snd, rcv]))] = np.arange(len(self.accounts))
+
+    def occurrence_batches(self):
+        if len(self.df) == 0:
+            return
+        snd, rcv = self._snd, self._rcv
+        ts = self.df['timestamp'].to_numpy().astype('datetime64[ns]').astype(np.int64)
+        inbound = snd != rcv                      # a self-transfer counts once
+        yield (np.concatenate([snd, rcv[inbound]]),
+               np.concatenate([rcv, snd[inbound]]),
+               np.concatenate([ts, ts[inbound]]))
@@ -5,20 +5,52 @@ Constructor signature changed: now takes (G, df, detections) — not just detect
 
 import networkx as nx
 import pandas as pd
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Union
 from config import RISK_WEIGHTS, RISK_THRESHOLDS
+from utils.account_profiles import build_account_profiles
+from utils.graph_builder import TransactionGraph
+from utils.pagerank import pagerank as sparse_pagerank
 
 
 class ScoringEngine:
-    def __init__(self, G: nx.DiGraph, df: pd.DataFrame, detections: Dict[str, Any]):
+    def __init__(
+        self,
+        G: Union[TransactionGraph, nx.DiGraph],
+        df: pd.DataFrame,
+        detections: Dict[str, Any],
+        profiles: Optional[pd.DataFrame] = None,
+        pagerank: Optional[Dict[str, float]] = None,
+        velocity: Optional[Dict[str, float]] = None,
+        pagerank_start: Optional[Dict[str, float]] = None,
+    ):
+        """G: TransactionGraph, or a networkx graph (anything with its nodes(),
+        out_degree() and in_degree(), as incremental mode passes).
+        pagerank / velocity: precomputed values (incremental mode) instead of
+        recomputing them over the whole graph.
+        pagerank_start: previous PageRank to warm-start the power iteration."""
         self.G = G
+        if isinstance(G, TransactionGraph):
+            self._accounts = G.account_ids.tolist()
+            index = G.index
+            self._out_degree = lambda a: int(G.out_degree[index[a]])
+            self._in_degree = lambda a: int(G.in_degree[index[a]])
+        else:
+            self._accounts = G.nodes()
+            self._out_degree, self._in_degree = G.out_degree, G.in_degree
         self.df = df
         self.detections = detections
+        if profiles is None and velocity is None:
+            profiles = build_account_profiles(df)
+        self.profiles = profiles
 
         # Pre-compute once
-        self._pagerank: Dict[str, float] = nx.pagerank(G, alpha=0.85) if G.number_of_edges() > 0 else {}
+        if pagerank is None:
+            tg = G if isinstance(G, TransactionGraph) else TransactionGraph.from_networkx(G)
+            pagerank = (sparse_pagerank(tg, nstart=pagerank_start)
+                        if tg.number_of_edges() > 0 else {})
+        self._pagerank: Dict[str, float] = pagerank
         self._pr_max = max(self._pagerank.values(), default=1.0)
-        self._velocity = self._compute_velocity()
+        self._velocity = velocity if velocity is not None else self._compute_velocity()
 
         # Index detections for O(1) lookup
         self._cycle_accounts: set = set()
@@ -35,7 +67,7 @@ class ScoringEngine:
 
     def score_all_accounts(self) -> List[Dict]:
         results = []
-        for account in self.G.nodes():
+        for account in self._accounts:
             result = self.score_account_risk(account)
             if result['risk_score'] > 0:
                 results.append(result)
@@ -51,12 +83,12 @@ class ScoringEngine:
             factors.append('cycle_participant')
 
         if account in self._fan_out_accounts:
-            out_deg = self.G.out_degree(account)
+            out_deg = self._out_degree(account)
             scores['fan_out'] = min(RISK_WEIGHTS['fan_out'], RISK_WEIGHTS['fan_out'] * (out_deg / 20))
             factors.append('fan_out_structuring')
 
         if account in self._fan_in_accounts:
-            in_deg = self.G.in_degree(account)
+            in_deg = self._in_degree(account)
             scores['fan_in'] = min(RISK_WEIGHTS['fan_in'], RISK_WEIGHTS['fan_in'] * (in_deg / 20))
             factors.append('fan_in_aggregation')
 
@@ -90,13 +122,12 @@ class ScoringEngine:
         }
 
     def _compute_velocity(self) -> Dict[str, float]:
-        if self.df.empty:
+        if self.profiles.empty:
             return {}
         total_days = max(
-            (self.df['timestamp'].max() - self.df['timestamp'].min()).days, 1
+            (self.profiles['last_ts'].max() - self.profiles['first_ts'].min()).days, 1
         )
-        counts = pd.concat([self.df['sender_id'], self.df['receiver_id']]).value_counts()
-        return {acc: count / total_days for acc, count in counts.items()}
+        return (self.profiles['txn_count'] / total_days).to_dict()
 
     def _get_risk_level(self, score: float) -> str:
         if score >= RISK_THRESHOLDS['critical']: return 'critical'
@@ -0,0 +1,602 @@
+"""
+NEXA AI Engine - Incremental mode
+Keeps the graph, account activity and detections in memory and accepts
+appended transaction batches. Each batch re-runs detection only on the
+neighbourhood its new edges can influence:
+
+  cycles    - undirected ball of radius max_len // 2 around touched accounts
+              (every account on a cycle of length ≤ L through a touched account
+              is within L // 2 hops of it), hubs excluded as in CycleDetector
+  chains    - accounts reachable from touched accounts through shells only,
+              up to MAX_CHAIN_DEPTH hops (chain intermediaries are all shells)
+  fans      - the touched accounts themselves (degree / span changed)
+  smurfing  - the touched accounts' own occurrence history
+  scoring   - touched accounts plus members of added/removed cycles & chains
+
+Detections that touch a dirty account are dropped and replaced by the local
+re-run; everything else is provably unchanged. Two global signals are
+refreshed lazily instead: PageRank once the edge count has grown by
+INCREMENTAL_PAGERANK_REFRESH since the last refresh (warm-started from the
+previous vector), and velocity whenever the overall day span changes (both
+re-score every account). Shell chains keep a reservoir of
+INCREMENTAL_CHAIN_RESERVOIR × CHAIN_TOP_K by amount, so the reported top-K is
+approximate once chains that were evicted earlier would re-enter it: an
+evicted chain is only found again when a later batch touches one of its
+accounts, so if the chains above it later dissolve, the reported top-K is
+short of it where a full recompute would report it. Every reported chain is
+still a genuine chain of the full graph.
+
+The graph itself is kept as arrays, not networkx: edge columns in
+capacity-doubling arrays indexed by edge id, a sorted key index over the
+edges up to the last compaction, and a delta map of the edges added since.
+"""
+
+import os
+import sys
+import time
+from itertools import chain as _chain
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+_dir = os.path.dirname(os.path.abspath(__file__))
+if _dir not in sys.path:
+    sys.path.insert(0, _dir)
+
+from ai_engine import build_output
+from utils.account_profiles import PROFILE_COLUMNS
+from utils.csv_loader import account_codes, load_transactions
+from utils.graph_builder import TransactionGraph, _to_int64_ns
+from utils.pagerank import pagerank_vector
+from detectors.cycle_detector import CycleDetector
+from detectors.fan_detector import FanDetector
+from detectors.chain_detector import ChainDetector
+from detectors.scoring_engine import ScoringEngine
+from ring_assembler import RingAssembler
+from config import (
+    CYCLE_DETECTION_MIN_LENGTH,
+    CYCLE_DETECTION_MAX_LENGTH,
+    FAN_PATTERN_THRESHOLD,
+    CHAIN_DETECTION_MIN_LENGTH,
+    SHELL_ACCOUNT_MAX_TRANSACTIONS,
+    MAX_CHAIN_DEPTH,
+    CHAIN_TOP_K,
+    INCREMENTAL_PAGERANK_REFRESH,
+    INCREMENTAL_CHAIN_RESERVOIR,
+)
+from utils.log import get_logger
+
+logger = get_logger(__name__)
+
+_NS_PER_DAY = 86_400 * 10**9
+
+
+def _grown(a: np.ndarray, n: int, fill) -> np.ndarray:
+    """`a` with capacity for at least n entries (doubling), new slots set to fill."""
+    if n <= len(a):
+        return a
+    return np.r_[a, np.full(max(n, 2 * len(a)) - len(a), fill, dtype=a.dtype)]
+
+
+class _EdgeStore:
+    """
+    Appendable aggregated edge table over account codes.
+
+    Edge e has columns src/dst/amount/txn_count/first_ts/last_ts[e]. Edges up
+    to the last compaction are found through sorted (src << 32 | dst) keys and
+    their dst-major twins, so successors and predecessors are a searchsorted
+    range; newer edges sit in a delta map plus per-account delta lists. The
+    delta is folded into the sorted index once it outgrows a quarter of it.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.src = np.empty(0, np.int64)
+        self.dst = np.empty(0, np.int64)
+        self.amount = np.empty(0, np.float64)
+        self.txn_count = np.empty(0, np.int64)
+        self.first_ts = np.empty(0, np.int64)
+        self.last_ts = np.empty(0, np.int64)
+        self.out_degree = np.empty(0, np.int64)     # per account code
+        self.in_degree = np.empty(0, np.int64)
+        self._keys = self._key_eid = np.empty(0, np.int64)
+        self._rkeys = self._rkey_eid = np.empty(0, np.int64)
+        self._delta: Dict[int, int] = {}
+        self._delta_out: Dict[int, List[int]] = {}
+        self._delta_in: Dict[int, List[int]] = {}
+
+    def grow_nodes(self, n: int) -> None:
+        self.out_degree = _grown(self.out_degree, n, 0)
+        self.in_degree = _grown(self.in_degree, n, 0)
+
+    def add(self, src, dst, amount, txn_count, first_ts, last_ts) -> int:
+        """Merge (src, dst)-unique edge aggregates in; returns how many edges are new."""
+        keys = (src << 32) | dst
+        eid = np.full(len(keys), -1, dtype=np.int64)
+        if len(self._keys):
+            pos = np.minimum(np.searchsorted(self._keys, keys), len(self._keys) - 1)
+            hit = self._keys[pos] == keys
+            eid[hit] = self._key_eid[pos[hit]]
+        fresh = []
+        for i in np.flatnonzero(eid < 0).tolist():
+            e = self._delta.get(int(keys[i]))
+            if e is None:
+                e = self._delta[int(keys[i])] = self.n + len(fresh)
+                fresh.append(i)
+            eid[i] = e
+
+        if fresh:
+            fresh = np.array(fresh, dtype=np.int64)
+            end = self.n + len(fresh)
+            for name, fill in (('src', 0), ('dst', 0), ('amount', 0.0), ('txn_count', 0),
+                               ('first_ts', np.iinfo(np.int64).max),
+                               ('last_ts', np.iinfo(np.int64).min)):
+                setattr(self, name, _grown(getattr(self, name), end, fill))
+            new_ids = np.arange(self.n, end)
+            self.src[new_ids], self.dst[new_ids] = src[fresh], dst[fresh]
+            np.add.at(self.out_degree, src[fresh], 1)
+            np.add.at(self.in_degree, dst[fresh], 1)
+            for e, u, v in zip(new_ids.tolist(), src[fresh].tolist(), dst[fresh].tolist()):
+                self._delta_out.setdefault(u, []).append(e)
+                self._delta_in.setdefault(v, []).append(e)
+            self.n = end
+
+        self.amount[eid] += amount
+        self.txn_count[eid] += txn_count
+        self.first_ts[eid] = np.minimum(self.first_ts[eid], first_ts)
+        self.last_ts[eid] = np.maximum(self.last_ts[eid], last_ts)
+        if len(self._delta) > max(1024, len(self._keys) // 4):
+            self._compact()
+        return len(fresh)
+
+    def _compact(self) -> None:
+        src, dst = self.src[:self.n], self.dst[:self.n]
+        keys, rkeys = (src << 32) | dst, (dst << 32) | src
+        self._key_eid = np.argsort(keys, kind='stable')
+        self._rkey_eid = np.argsort(rkeys, kind='stable')
+        self._keys, self._rkeys = keys[self._key_eid], rkeys[self._rkey_eid]
+        self._delta.clear()
+        self._delta_out.clear()
+        self._delta_in.clear()
+
+    def _range(self, keys: np.ndarray, eids: np.ndarray, delta: Dict[int, List[int]],
+               u: int) -> np.ndarray:
+        lo, hi = np.searchsorted(keys, [u << 32, (u + 1) << 32])
+        extra = delta.get(u)
+        return eids[lo:hi] if not extra else np.r_[eids[lo:hi], extra]
+
+    def out_edges(self, u: int) -> np.ndarray:
+        return self._range(self._keys, self._key_eid, self._delta_out, u)
+
+    def in_edges(self, v: int) -> np.ndarray:
+        return self._range(self._rkeys, self._rkey_eid, self._delta_in, v)
+
+    def subgraph(self, ids: List[str], codes: np.ndarray, eids: np.ndarray) -> TransactionGraph:
+        """TransactionGraph on accounts `codes` (named `ids`) with edges `eids`."""
+        local = dict(zip(codes.tolist(), range(len(codes))))
+        to_local = np.vectorize(local.__getitem__, otypes=[np.int64])
+        src, dst = (to_local(a[eids]) if len(eids) else np.empty(0, np.int64)
+                    for a in (self.src, self.dst))
+        return TransactionGraph(np.array(ids, dtype=object), src, dst, self.amount[eids],
+                                self.txn_count[eids], self.first_ts[eids], self.last_ts[eids])
+
+
+class _Degrees:
+    """The part of the networkx graph API ScoringEngine reads, over an _EdgeStore."""
+
+    def __init__(self, engine: "IncrementalEngine"):
+        self._engine = engine
+
+    def nodes(self) -> List[str]:
+        return self._engine._ids
+
+    def number_of_nodes(self) -> int:
+        return len(self._engine._ids)
+
+    def out_degree(self, a: str) -> int:
+        return int(self._engine.edges.out_degree[self._engine._code[a]])
+
+    def in_degree(self, a: str) -> int:
+        return int(self._engine.edges.in_degree[self._engine._code[a]])
+
+
+class _NodeIndexed:
+    """Detections keyed by a hashable id, with a reverse index account → ids."""
+
+    def __init__(self):
+        self.items: Dict[Hashable, Any] = {}
+        self._nodes: Dict[Hashable, List[str]] = {}
+        self._by_node: Dict[str, Set[Hashable]] = {}
+
+    def add(self, key: Hashable, nodes: List[str], item: Any) -> None:
+        if key in self.items:
+            self.discard(key)
+        self.items[key] = item
+        self._nodes[key] = nodes
+        for n in nodes:
+            self._by_node.setdefault(n, set()).add(key)
+
+    def discard(self, key: Hashable) -> List[str]:
+        self.items.pop(key, None)
+        nodes = self._nodes.pop(key, [])
+        for n in nodes:
+            keys = self._by_node.get(n)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_node[n]
+        return nodes
+
+    def remove_touching(self, accounts: Iterable[str]) -> Set[str]:
+        """Drop every item containing one of `accounts`; return their members."""
+        members: Set[str] = set()
+        for a in accounts:
+            for key in list(self._by_node.get(a, ())):
+                members.update(self.discard(key))
+        return members
+
+
+class _AccountOccurrences:
+    """Occurrence source (see FanDetector.detect_temporal_smurfing) for a set of accounts."""
+
+    def __init__(self, engine: "IncrementalEngine", codes: List[int]):
+        self.accounts = engine._ids
+        self.appearance = range(len(engine._ids))   # first-seen order
+        self.ts_unit = engine._ts_unit
+        self._engine = engine
+        self._codes = codes
+
+    def occurrence_batches(self):
+        occ = self._engine._occ
+        parts = []
+        for c in self._codes:
+            if len(occ[c]) > 1:
+                occ[c] = [np.concatenate(occ[c])]
+            parts.append(occ[c][0])
+        if not parts:
+            return
+        lens = [len(p) for p in parts]
+        rows = np.concatenate(parts)
+        yield np.repeat(np.asarray(self._codes, dtype=np.int64), lens), rows[:, 0], rows[:, 1]
+
+
+class IncrementalEngine:
+    """
+    Usage:
+        engine = IncrementalEngine.from_csv("history.csv")
+        engine.append(new_batch_df)          # loader-normalised DataFrame
+        result = engine.results()            # PS-format dict (no graph_data)
+    """
+
+    def __init__(self):
+        self.edges = _EdgeStore()
+        self.n_rows = 0
+        self.total_amount = 0.0
+        self._code: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._ts_unit = None
+        # Per-account activity, indexed by code
+        self._first = np.empty(0, np.int64)
+        self._last = np.empty(0, np.int64)
+        self._out_cnt = np.empty(0, np.int64)
+        self._in_cnt = np.empty(0, np.int64)
+        self._out_vol = np.empty(0, np.float64)
+        self._in_vol = np.empty(0, np.float64)
+        self._occ: List[List[np.ndarray]] = []      # per code: [(cp, ts_ns), ...] blocks
+
+        self.cycles = _NodeIndexed()
+        self.chains = _NodeIndexed()
+        self.fan_out: Dict[str, Dict] = {}
+        self.fan_in: Dict[str, Dict] = {}
+        self.smurfs: Dict[str, Dict] = {}
+        self.scores: Dict[str, Dict] = {}
+        self._chain_seq = 0
+
+        self._pagerank: Dict[str, float] = {}
+        self._pagerank_x: Optional[np.ndarray] = None    # by code; warm start
+        self._pagerank_edges = 0
+        self._total_days = 1
+
+    @property
+    def n_edges(self) -> int:
+        return self.edges.n
+
+    @classmethod
+    def from_csv(cls, csv_path: str) -> "IncrementalEngine":
+        engine = cls()
+        engine.append(load_transactions(csv_path))
+        return engine
+
+    # ── Ingestion ─────────────────────────────────────────────────────────────
+    def append(self, batch: pd.DataFrame) -> Set[str]:
+        """
+        Add a batch of transactions (columns as produced by load_transactions)
+        and update every detection it can affect. Returns the touched accounts.
+        """
+        t = time.time()
+        if len(batch) == 0:
+            return set()
+        if self._ts_unit is None:
+            self._ts_unit = batch['timestamp'].to_numpy().dtype
+
+        reported = self._reported_chains()
+        dirty = self._ingest(batch)
+        affected = set(dirty)
+        affected |= self._update_cycles(dirty)
+        affected |= self._update_chains(dirty)
+        # Chains entering or leaving the top-K because others changed rank
+        for chain in reported.symmetric_difference(self._reported_chains()):
+            affected.update(chain)
+        self._update_fans(dirty)
+        self._update_smurfing(dirty)
+        self._rescore(affected)
+
+        logger.info(f"⏱️  Incremental batch: {len(batch)} rows | dirty={len(dirty)} "
+                    f"affected={len(affected)} | {time.time()-t:.2f}s")
+        return dirty
+
+    def _ingest(self, batch: pd.DataFrame) -> Set[str]:
+        snd, rcv, ids = account_codes(batch)
+        local = np.empty(len(ids), dtype=np.int64)
+        for i, a in enumerate(ids.tolist()):
+            code = self._code.get(a)
+            if code is None:
+                code = self._code[a] = len(self._ids)
+                self._ids.append(a)
+                self._occ.append([])
+            local[i] = code
+        self._grow(len(self._ids))
+        snd, rcv = local[snd], local[rcv]
+        ts = _to_int64_ns(batch['timestamp'])
+        amount = batch['amount'].to_numpy(np.float64)
+
+        # Account activity
+        for ends in (snd, rcv):
+            np.minimum.at(self._first, ends, ts)
+            np.maximum.at(self._last, ends, ts)
+        np.add.at(self._out_cnt, snd, 1)
+        np.add.at(self._in_cnt, rcv, 1)
+        np.add.at(self._out_vol, snd, amount)
+        np.add.at(self._in_vol, rcv, amount)
+        self.n_rows += len(batch)
+        self.total_amount += float(amount.sum())
+
+        # Occurrences for temporal smurfing (a self-transfer counts once)
+        inbound = snd != rcv
+        acct = np.concatenate([snd, rcv[inbound]])
+        occ = np.column_stack([np.concatenate([rcv, snd[inbound]]), np.concatenate([ts, ts[inbound]])])
+        order = np.argsort(acct, kind='stable')
+        acct, occ = acct[order], occ[order]
+        bounds = np.flatnonzero(np.r_[True, acct[1:] != acct[:-1], True])
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            self._occ[acct[lo]].append(occ[lo:hi])
+
+        # Aggregated edges (the batch graph's node ints follow `ids`, i.e. `local`)
+        tg = TransactionGraph.from_dataframe(batch)
+        self.edges.add(local[tg.src], local[tg.dst], tg.amount, tg.txn_count,
+                       tg.first_ts, tg.last_ts)
+        return set(ids.tolist())
+
+    def _grow(self, n: int) -> None:
+        cap = len(self._first)
+        if n <= cap:
+            return
+        extra = max(n, 2 * cap) - cap
+        self._first = np.r_[self._first, np.full(extra, np.iinfo(np.int64).max)]
+        self._last = np.r_[self._last, np.full(extra, np.iinfo(np.int64).min)]
+        self._out_cnt = np.r_[self._out_cnt, np.zeros(extra, np.int64)]
+        self._in_cnt = np.r_[self._in_cnt, np.zeros(extra, np.int64)]
+        self._out_vol = np.r_[self._out_vol, np.zeros(extra)]
+        self._in_vol = np.r_[self._in_vol, np.zeros(extra)]
+        self.edges.grow_nodes(len(self._first))
+
+    # ── Neighbourhoods ────────────────────────────────────────────────────────
+    def _is_hub(self, a: str) -> bool:
+        c = self._code[a]
+        return self.edges.in_degree[c] > 10 and self.edges.out_degree[c] > 10
+
+    def _is_shell(self, a: str) -> bool:
+        c = self._code[a]
+        return self._out_cnt[c] + self._in_cnt[c] <= SHELL_ACCOUNT_MAX_TRANSACTIONS
+
+    def _neighbourhood(
+        self,
+        seeds: Iterable[str],
+        radius: int,
+        member: Callable[[str], bool],
+        expand: Callable[[str], bool],
+    ) -> Set[str]:
+        """Undirected BFS: only `member` accounts join, only `expand` ones grow."""
+        edges, code, ids = self.edges, self._code, self._ids
+        frontier = [s for s in seeds if member(s)]
+        seen = set(frontier)
+        for _ in range(radius):
+            nxt = []
+            for u in frontier:
+                if not expand(u):
+                    continue
+                c = code[u]
+                peers = _chain(edges.dst[edges.out_edges(c)].tolist(),
+                               edges.src[edges.in_edges(c)].tolist())
+                for v in map(ids.__getitem__, peers):
+                    if v not in seen and member(v):
+                        seen.add(v)
+                        nxt.append(v)
+            frontier = nxt
+        return seen
+
+    def _region_graph(self, region: Set[str]) -> TransactionGraph:
+        """Induced subgraph as a TransactionGraph."""
+        ids = sorted(region)
+        codes = np.array([self._code[a] for a in ids], dtype=np.int64)
+        eids = np.concatenate([self.edges.out_edges(c) for c in codes.tolist()] or
+                              [np.empty(0, np.int64)])
+        inside = np.zeros(len(self._ids), dtype=bool)
+        inside[codes] = True
+        return self.edges.subgraph(ids, codes, eids[inside[self.edges.dst[eids]]])
+
+    def _incident_graph(self, accounts: Iterable[str]) -> TransactionGraph:
+        """Every edge into or out of `accounts`, with both endpoints."""
+        edges = self.edges
+        eids = np.unique(np.concatenate(
+            [e for a in accounts for e in (edges.out_edges(self._code[a]), edges.in_edges(self._code[a]))]
+            or [np.empty(0, np.int64)]
+        ))
+        ends = np.unique(np.r_[edges.src[eids], edges.dst[eids]])
+        ids = sorted(self._ids[c] for c in ends.tolist())
+        codes = np.array([self._code[a] for a in ids], dtype=np.int64)
+        return edges.subgraph(ids, codes, eids)
+
+    def profiles_for(self, accounts: Iterable[str]) -> pd.DataFrame:
+        """Account profiles (same columns as build_account_profiles) for a subset."""
+        accounts = list(accounts)
+        codes = np.array([self._code[a] for a in accounts], dtype=np.int64)
+        out_cnt, in_cnt = self._out_cnt[codes], self._in_cnt[codes]
+        profiles = pd.DataFrame({
+            'first_ts':           pd.to_datetime(self._first[codes]),
+            'last_ts':            pd.to_datetime(self._last[codes]),
+            'txn_count':          out_cnt + in_cnt,
+            'out_txn_count':      out_cnt,
+            'in_txn_count':       in_cnt,
+            'out_counterparties': self.edges.out_degree[codes],
+            'in_counterparties':  self.edges.in_degree[codes],
+            'out_volume':         self._out_vol[codes],
+            'in_volume':          self._in_vol[codes],
+        }, index=pd.Index(accounts, name='account_id'))
+        profiles['span_days'] = (
+            (profiles['last_ts'] - profiles['first_ts']).dt.total_seconds() / 86_400
+        )
+        return profiles[PROFILE_COLUMNS]
+
+    # ── Detectors on the dirty neighbourhood ──────────────────────────────────
+    def _update_cycles(self, dirty: Set[str]) -> Set[str]:
+        changed = self.cycles.remove_touching(dirty)
+        not_hub = lambda a: not self._is_hub(a)
+        region = self._neighbourhood(dirty, CYCLE_DETECTION_MAX_LENGTH // 2, not_hub, not_hub)
+        if len(region) < CYCLE_DETECTION_MIN_LENGTH:
+            return changed
+        for cycle in CycleDetector(
+            self._region_graph(region), CYCLE_DETECTION_MIN_LENGTH, CYCLE_DETECTION_MAX_LENGTH
+        ).find_cycles_johnson():
+            if dirty.intersection(cycle):
+                i = cycle.index(min(cycle))
+                self.cycles.add(tuple(cycle[i:] + cycle[:i]), cycle, cycle)
+                changed.update(cycle)
+        return changed
+
+    def _update_chains(self, dirty: Set[str]) -> Set[str]:
+        changed = self.chains.remove_touching(dirty)
+        region = self._neighbourhood(
+            dirty, MAX_CHAIN_DEPTH, lambda a: True,
+            lambda a: a in dirty or self._is_shell(a),
+        )
+        found = ChainDetector(self._region_graph(region), None, self.profiles_for(region)).detect_shell_chains(
+            min_length=CHAIN_DETECTION_MIN_LENGTH
+        )
+        for chain in found:
+            if dirty.intersection(chain['chain']):
+                self._chain_seq += 1
+                self.chains.add(tuple(chain['chain']), chain['chain'], (self._chain_seq, chain))
+                changed.update(chain['chain'])
+
+        # Bounded reservoir: evict the smallest chains beyond it
+        cap = INCREMENTAL_CHAIN_RESERVOIR * CHAIN_TOP_K
+        if len(self.chains.items) > cap:
+            ranked = sorted(self.chains.items.items(),
+                            key=lambda kv: (-kv[1][1]['total_amount'], kv[1][0]))
+            for key, _ in ranked[cap:]:
+                changed.update(self.chains.discard(key))
+        return changed
+
+    def _update_fans(self, dirty: Set[str]) -> None:
+        nodes = sorted(dirty)
+        detector = FanDetector(self._incident_graph(nodes), None, self.profiles_for(nodes))
+        for store, found in ((self.fan_out, detector.detect_fan_out(FAN_PATTERN_THRESHOLD, nodes)),
+                             (self.fan_in, detector.detect_fan_in(FAN_PATTERN_THRESHOLD, nodes))):
+            for a in nodes:
+                store.pop(a, None)
+            for item in found:
+                store[item['account']] = item
+
+    def _update_smurfing(self, dirty: Set[str]) -> None:
+        nodes = sorted(dirty, key=self._code.__getitem__)
+        source = _AccountOccurrences(self, [self._code[a] for a in nodes])
+        found = FanDetector(None, source, self.profiles_for(nodes)).detect_temporal_smurfing(
+            FAN_PATTERN_THRESHOLD
+        )
+        for a in nodes:
+            self.smurfs.pop(a, None)
+        for item in found:
+            self.smurfs[item['account']] = item
+
+    # ── Scoring ───────────────────────────────────────────────────────────────
+    def _top_chains(self) -> List[Dict]:
+        """The reported chains: the reservoir's top CHAIN_TOP_K by amount."""
+        ranked = sorted(self.chains.items.values(),
+                        key=lambda sc: (-sc[1]['total_amount'], sc[0]))
+        return [c for _, c in ranked[:CHAIN_TOP_K]]
+
+    def _reported_chains(self) -> Set[Tuple[str, ...]]:
+        return {tuple(c['chain']) for c in self._top_chains()}
+
+    def detections(self) -> Dict[str, Any]:
+        return {
+            'cycles':            list(self.cycles.items.values()),
+            'fan_out':           list(self.fan_out.values()),
+            'fan_in':            list(self.fan_in.values()),
+            'temporal_smurfing': list(self.smurfs.values()),
+            'chains':            self._top_chains(),
+        }
+
+    def _rescore(self, affected: Set[str]) -> None:
+        n = len(self._ids)
+        span = (int(self._last[:n].max()) - int(self._first[:n].min())) // _NS_PER_DAY
+        total_days = max(span, 1)
+        if total_days != self._total_days:
+            self._total_days = total_days
+            affected = set(self._ids)
+
+        edges = self.n_edges
+        if edges > self._pagerank_edges * (1 + INCREMENTAL_PAGERANK_REFRESH):
+            x, iters = pagerank_vector(n, self.edges.src[:edges], self.edges.dst[:edges],
+                                       x0=self._pagerank_x)
+            logger.debug(f"PageRank refresh: {iters} iterations "
+                         f"({'warm' if self._pagerank_x is not None else 'cold'} start)")
+            self._pagerank_x = x
+            self._pagerank = dict(zip(self._ids, x.tolist()))
+            self._pagerank_edges = edges
+            affected = set(self._ids)
+
+        codes = np.array([self._code[a] for a in affected], dtype=np.int64)
+        txns = (self._out_cnt[codes] + self._in_cnt[codes]) / total_days
+        velocity = dict(zip(affected, txns.tolist()))
+        scorer = ScoringEngine(_Degrees(self), None, self.detections(),
+                               pagerank=self._pagerank, velocity=velocity)
+        for a in affected:
+            result = scorer.score_account_risk(a)
+            if result['risk_score'] > 0:
+                self.scores[a] = result
+            else:
+                self.scores.pop(a, None)
+
+    # ── Output ────────────────────────────────────────────────────────────────
+    def results(self, include_graph: bool = False) -> Dict[str, Any]:
+        """Current PS-format result; rings are re-assembled from live detections."""
+        t = time.time()
+        detections = self.detections()
+        scored = sorted(self.scores.values(), key=lambda s: s['risk_score'], reverse=True)
+        rings = RingAssembler(detections, scored).assemble()
+        graph = self.transaction_graph() if include_graph else _Degrees(self)
+        return build_output(graph, detections, scored, rings, self.n_rows,
+                            self.total_amount, round(time.time() - t, 2), include_graph)
+
+    def transaction_graph(self) -> TransactionGraph:
+        """Snapshot of the whole graph, nodes in account-ID order like the batch pipeline."""
+        order = np.argsort(np.array(self._ids, dtype=object), kind='stable')
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        e, m = self.edges, self.edges.n
+        return TransactionGraph(np.array(self._ids, dtype=object)[order],
+                                rank[e.src[:m]], rank[e.dst[:m]], e.amount[:m],
+                                e.txn_count[:m], e.first_ts[:m], e.last_ts[:m])
@@ -0,0 +1,196 @@
+"""
+Pipeline DAG - Concurrent execution of independent pipeline stages.
+
+A stage declares the stages it depends on; every stage whose dependencies
+are complete runs at once. Cycle, fan and chain detection only read the
+shared graph and transactions, so they run side by side and the detection
+wall time approaches the slowest detector instead of the sum.
+
+Pool stages run in forked worker processes (true parallelism past the GIL).
+The shared inputs are not pickled: they are registered before the fork and
+each child reads its copy-on-write copy. Only dependency results and stage
+outputs cross process boundaries. Where fork is unavailable the same DAG runs
+on threads; with one worker it runs serially in declaration order. Inline
+stages (cheap, or consuming large results) always run in the calling process.
+Workers default to the process's CPU budget (utils.cpu), and each forked
+stage process gets an equal share of it for any pool it starts itself.
+
+Every stage is timed where it runs and its stats (seconds, process RSS
+high-water mark, optionally the tracemalloc peak) are passed to `observe`
+in the calling process.
+"""
+
+import itertools
+import multiprocessing as mp
+import time
+import tracemalloc
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from utils.cpu import cpu_budget, set_cpu_budget, share
+from utils.metrics import max_rss_bytes
+
+StageStats = Dict[str, float]
+
+# run id → (stages by name, shared inputs, trace_memory); inherited by forked workers
+_RUNS: Dict[int, Tuple[Dict[str, "Stage"], Dict[str, Any], bool]] = {}
+_run_ids = itertools.count()
+
+
+class Stage:
+    """
+    One node of the pipeline DAG.
+
+    fn receives a dict of the shared inputs plus the results of `deps`
+    (keyed by stage name) and returns the stage result.
+    """
+
+    def __init__(self, name: str, fn: Callable[[Dict[str, Any]], Any],
+                 deps: Sequence[str] = (), inline: bool = False):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.inline = inline
+
+
+def _context(stage: Stage, inputs: Dict[str, Any], results: Dict[str, Any]) -> Dict[str, Any]:
+    return {**inputs, **{d: results[d] for d in stage.deps}}
+
+
+def begin_stage(trace_memory: bool = False) -> float:
+    """Start measuring a stage; pass the returned start time to stage_stats()."""
+    if trace_memory:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+    return time.perf_counter()
+
+
+def stage_stats(start: float, trace_memory: bool = False) -> StageStats:
+    """Seconds since begin_stage(), RSS high-water mark and tracemalloc peak."""
+    stats = {'seconds': time.perf_counter() - start, 'max_rss_bytes': max_rss_bytes()}
+    if trace_memory:
+        stats['traced_peak_bytes'] = tracemalloc.get_traced_memory()[1]
+    return stats
+
+
+def _execute(stage: Stage, ctx: Dict[str, Any], trace_memory: bool) -> Tuple[Any, StageStats]:
+    start = begin_stage(trace_memory)
+    value = stage.fn(ctx)
+    return value, stage_stats(start, trace_memory)
+
+
+def _run_forked(run_id: int, name: str, dep_results: Dict[str, Any]) -> Tuple[Any, StageStats]:
+    """Pool task: run a stage against the inputs inherited at fork time."""
+    stages, inputs, trace_memory = _RUNS[run_id]
+    return _execute(stages[name], {**inputs, **dep_results}, trace_memory)
+
+
+def _check(stages: List[Stage]) -> None:
+    names = [s.name for s in stages]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate stage names in {names}")
+    seen = set()
+    for s in stages:
+        unknown = [d for d in s.deps if d not in names]
+        if unknown:
+            raise ValueError(f"Stage '{s.name}' depends on unknown stage(s) {unknown}")
+    # Kahn: every stage must become ready eventually
+    remaining = list(stages)
+    while remaining:
+        ready = [s for s in remaining if all(d in seen for d in s.deps)]
+        if not ready:
+            raise ValueError(f"Dependency cycle among {[s.name for s in remaining]}")
+        seen.update(s.name for s in ready)
+        remaining = [s for s in remaining if s.name not in seen]
+
+
+def resolve_mode(mode: str = "auto", workers: Optional[int] = None) -> Tuple[str, int]:
+    """(mode, workers) actually used: 'process', 'thread' or 'serial'."""
+    workers = workers or cpu_budget()
+    if mode not in ("auto", "process", "thread", "serial"):
+        raise ValueError(f"Unknown pipeline mode '{mode}'")
+    if mode == "serial" or workers <= 1:
+        return "serial", 1
+    if mode in ("auto", "process"):
+        return ("process" if "fork" in mp.get_all_start_methods() else "thread"), workers
+    return mode, workers
+
+
+def run_stages(
+    stages: List[Stage],
+    inputs: Dict[str, Any],
+    mode: str = "auto",
+    workers: Optional[int] = None,
+    observe: Optional[Callable[[str, StageStats], None]] = None,
+    trace_memory: bool = False,
+) -> Dict[str, Any]:
+    """
+    Execute the DAG and return every stage's result by name.
+
+    observe(stage_name, stats) is called as each stage finishes. With
+    trace_memory, stats include the tracemalloc peak (threads running
+    concurrently share one tracer, so their peaks overlap).
+
+    Raises:
+        ValueError: If the stages do not form a DAG
+        Exception: The first exception raised by a stage
+    """
+    _check(stages)
+    mode, workers = resolve_mode(mode, workers)
+    results: Dict[str, Any] = {}
+
+    def finish(name: str, outcome: Tuple[Any, StageStats]) -> None:
+        results[name], stats = outcome
+        if observe is not None:
+            observe(name, stats)
+
+    if mode == "serial":
+        pending = list(stages)
+        while pending:
+            stage = next(s for s in pending if all(d in results for d in s.deps))
+            finish(stage.name, _execute(stage, _context(stage, inputs, results), trace_memory))
+            pending.remove(stage)
+        return results
+
+    pooled = [s for s in stages if not s.inline]
+    run_id = next(_run_ids)
+    executor: Executor
+    if mode == "process":
+        _RUNS[run_id] = ({s.name: s for s in stages}, inputs, trace_memory)
+        size = min(workers, max(len(pooled), 1))
+        executor = ProcessPoolExecutor(
+            max_workers=size, mp_context=mp.get_context("fork"),
+            initializer=set_cpu_budget, initargs=(share(size),),
+        )
+    else:
+        executor = ThreadPoolExecutor(max_workers=min(workers, max(len(pooled), 1)))
+
+    pending = list(stages)
+    running: Dict[Any, str] = {}
+    try:
+        while pending or running:
+            ready = [s for s in pending if all(d in results for d in s.deps)]
+            for stage in ready:
+                pending.remove(stage)
+                if stage.inline:
+                    continue
+                if mode == "process":
+                    fut = executor.submit(_run_forked, run_id, stage.name,
+                                          {d: results[d] for d in stage.deps})
+                else:
+                    fut = executor.submit(_execute, stage, _context(stage, inputs, results), trace_memory)
+                running[fut] = stage.name
+            # Inline stages run here while the pool works on the others
+            inline = [s for s in ready if s.inline]
+            for stage in inline:
+                finish(stage.name, _execute(stage, _context(stage, inputs, results), trace_memory))
+            if inline or not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                finish(running.pop(fut), fut.result())
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        _RUNS.pop(run_id, None)
+    return results
@@ -4,6 +4,9 @@ Uses Union-Find to cluster accounts that share detection events.
 """
 
 from typing import Dict, List, Any
+from utils.log import get_logger
+
+logger = get_logger(__name__)
 
 
 class UnionFind:
@@ -85,7 +88,7 @@ class RingAssembler:
         for i, ring in enumerate(rings, 1):
             ring['ring_id'] = f"RING_{i:03d}"
 
-        print(f"✅ Fraud rings: {len(rings)}")
+        logger.info(f"✅ Fraud rings: {len(rings)}")
         return rings
 
     def _dominant_pattern(self, members: List[str]) -> str:
@@ -0,0 +1,172 @@
+"""
+Sharding - Split large graphs into weakly-connected-component shards.
+
+Cycles, shell chains, fan patterns and smurfing windows never cross a weakly
+connected component, so detection on each component is exact. Components are
+bin-packed (largest first) into shards of at most `max_accounts` accounts; a
+component larger than that becomes a shard of its own.
+
+A shard keeps its accounts in global (sorted ID) order and its rows in file
+order, so every detector's output order maps back onto the whole-graph order:
+detect_shard() returns each finding with a global sort key and merge_shards()
+reproduces the unsharded detections exactly, CHAIN_TOP_K cut included.
+Scoring (PageRank) and ring assembly run once on the merged detections over
+the full graph, so normalisation and ring numbering are unchanged.
+"""
+
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import (
+    CYCLE_DETECTION_MIN_LENGTH,
+    CYCLE_DETECTION_MAX_LENGTH,
+    FAN_PATTERN_THRESHOLD,
+    CHAIN_DETECTION_MIN_LENGTH,
+    CHAIN_TOP_K,
+)
+from detectors.chain_detector import ChainDetector
+from detectors.cycle_detector import CycleDetector
+from detectors.fan_detector import FanDetector
+from utils.csv_loader import account_codes
+from utils.deadline import NO_DEADLINE, Deadline
+from utils.graph_builder import TransactionGraph
+from utils.graph_stats import weak_component_labels
+from utils.log import get_logger
+
+logger = get_logger(__name__)
+
+Keyed = List[Tuple[tuple, Any]]
+
+
+class ShardPlan:
+    """
+    Component shards of one analysis.
+
+    nodes[b] are shard b's global node ints (ascending); rows(b) are the
+    positions of its transactions in the DataFrame (ascending).
+    """
+
+    def __init__(self, tg: TransactionGraph, df: pd.DataFrame, max_accounts: int):
+        labels = weak_component_labels(tg)
+        sizes = np.bincount(labels)
+        # First-fit decreasing; ties by label keep the plan deterministic
+        bins: List[List[int]] = []
+        loads: List[int] = []
+        for label in sorted(range(len(sizes)), key=lambda c: (-sizes[c], c)):
+            size = int(sizes[label])
+            b = next((i for i, load in enumerate(loads) if load + size <= max_accounts), None)
+            if b is None:
+                bins.append([])
+                loads.append(0)
+                b = len(bins) - 1
+            bins[b].append(label)
+            loads[b] += size
+        shard_of_label = np.empty(len(sizes), dtype=np.int64)
+        for b, members in enumerate(bins):
+            shard_of_label[members] = b
+
+        shard_of_node = shard_of_label[labels]
+        self.nodes = [np.flatnonzero(shard_of_node == b) for b in range(len(bins))]
+        self.oversized = int((sizes > max_accounts).sum())
+
+        # Rows grouped by shard, file order kept inside each shard
+        snd, _, _ = account_codes(df)
+        row_shard = shard_of_node[snd]
+        self._order = np.argsort(row_shard, kind='stable')
+        self._bounds = np.searchsorted(row_shard[self._order], np.arange(len(bins) + 1))
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def rows(self, b: int) -> np.ndarray:
+        return self._order[self._bounds[b]:self._bounds[b + 1]]
+
+
+def shard_graph(tg: TransactionGraph, nodes: np.ndarray) -> TransactionGraph:
+    """Subgraph on `nodes` (which must be closed under edges), renumbered 0..k-1."""
+    local = np.full(tg.number_of_nodes(), -1, dtype=np.int64)
+    local[nodes] = np.arange(len(nodes))
+    keep = local[tg.src] >= 0
+    return TransactionGraph(
+        tg.account_ids[nodes], local[tg.src[keep]], local[tg.dst[keep]], tg.amount[keep],
+        tg.txn_count[keep], tg.first_ts[keep], tg.last_ts[keep],
+    )
+
+
+def _appearance_keys(df: pd.DataFrame) -> Dict[str, Tuple[int, int]]:
+    """Account → (0, first row as sender) or (1, first row as receiver), by row label."""
+    snd, rcv, ids = account_codes(df)
+    pos = df.index.to_numpy()
+    keys: Dict[str, Tuple[int, int]] = {}
+    for side, codes in ((1, rcv), (0, snd)):
+        present, first = np.unique(codes, return_index=True)
+        keys.update(zip(ids[present].tolist(), ((side, p) for p in pos[first].tolist())))
+    return keys
+
+
+def detect_shard(
+    plan: ShardPlan,
+    b: int,
+    tg: TransactionGraph,
+    df: pd.DataFrame,
+    profiles: pd.DataFrame,
+    deadline: Deadline = NO_DEADLINE,
+) -> Dict[str, Tuple[Keyed, bool]]:
+    """Cycles, fan patterns and chains of shard b, each finding with its global sort key."""
+    nodes = plan.nodes[b]
+    sub = shard_graph(tg, nodes)
+    rows = df.iloc[plan.rows(b)]
+    prof = profiles.loc[sub.account_ids]
+    index = sub.index
+
+    cycles = CycleDetector(sub, CYCLE_DETECTION_MIN_LENGTH, CYCLE_DETECTION_MAX_LENGTH,
+                           workers=1, deadline=deadline)
+    found = cycles.find_cycles_johnson()
+    keyed_cycles = [((phase, tuple(nodes[list(ns)].tolist()), seq), c)
+                    for (phase, ns, seq), c in zip(cycles.cycle_keys, found)]
+
+    fans = FanDetector(sub, rows, prof, deadline=deadline)
+    patterns = fans.detect_all_patterns(threshold=FAN_PATTERN_THRESHOLD)
+    appearance = _appearance_keys(rows) if patterns['temporal_smurfing'] else {}
+    keyed_fans = {
+        'fan_out': [((int(nodes[index[f['account']]]),), f) for f in patterns['fan_out']],
+        'fan_in':  [((int(nodes[index[f['account']]]),), f) for f in patterns['fan_in']],
+        'temporal_smurfing': [(appearance[f['account']], f) for f in patterns['temporal_smurfing']],
+    }
+
+    chains = ChainDetector(sub, rows, prof, deadline=deadline)
+    keyed_chains = [((-c['total_amount'], int(nodes[index[c['chain'][0]]]), i), c)
+                    for i, c in enumerate(chains.detect_shell_chains(
+                        min_length=CHAIN_DETECTION_MIN_LENGTH, top_k=CHAIN_TOP_K))]
+
+    return {
+        'cycles': (keyed_cycles, cycles.complete),
+        'fans':   (keyed_fans, fans.complete),
+        'chains': (keyed_chains, chains.complete),
+    }
+
+
+def _ordered(keyed: Keyed) -> List[Any]:
+    return [item for _, item in sorted(keyed, key=lambda kv: kv[0])]
+
+
+def merge_shards(parts: List[Dict[str, Tuple[Any, bool]]],
+                 top_k: int = CHAIN_TOP_K) -> Dict[str, Tuple[Any, bool]]:
+    """Per-shard detections → the (result, complete) pairs of the unsharded stages."""
+    def complete(name: str) -> bool:
+        return all(p[name][1] for p in parts)
+
+    fans = {kind: _ordered([kv for p in parts for kv in p['fans'][0][kind]])
+            for kind in ('fan_out', 'fan_in', 'temporal_smurfing')}
+    chains = _ordered([kv for p in parts for kv in p['chains'][0]])[:top_k]
+    cycles = _ordered([kv for p in parts for kv in p['cycles'][0]])
+    logger.info(f"✅ Merged {len(parts)} shards: cycles={len(cycles)} chains={len(chains)} "
+                f"fan_out={len(fans['fan_out'])} fan_in={len(fans['fan_in'])} "
+                f"smurfs={len(fans['temporal_smurfing'])}")
+    return {
+        'cycles': (cycles, complete('cycles')),
+        'fans':   (fans, complete('fans')),
+        'chains': (chains, complete('chains')),
+    }
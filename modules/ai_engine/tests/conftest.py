@@ -0,0 +1,14 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+import ai_engine
+
+
+@pytest.fixture(autouse=True)
+def transaction_cache_dir(tmp_path, monkeypatch):
+    """Every test gets its own transaction cache under tmp_path."""
+    monkeypatch.setattr(ai_engine, 'CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(ai_engine, '_cache', None)
+    return tmp_path / 'cache'
@@ -1,16 +1,20 @@
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from ai_engine import AIEngine
+from ai_engine import AIEngine, run_detection_pipeline
+
 
 def test():
     print("🔍 Testing AI Engine...\n")
     engine = AIEngine()
-    engine.load_data('sample_data/transactions.csv').build_graph().detect_cycles().export_for_integration()
-    
-    results = engine.get_results()
-    print(f"\n📊 Results: {results}")
+    engine.load_data('sample_data/transactions.csv').build_graph()
+    assert engine.tg.number_of_edges() > 0
+
+    results = run_detection_pipeline('sample_data/transactions.csv')
+    print(f"\n📊 Results: {results['summary']}")
+    assert results['summary']['total_accounts_analyzed'] == engine.tg.number_of_nodes()
+    assert results['fraud_rings']
     print("\n✅ Test passed!")
 
 if __name__ == "__main__":
-    test()
\ No newline at end of file
+    test()
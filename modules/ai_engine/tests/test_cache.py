@@ -0,0 +1,85 @@
+import sys
+import os
+import io
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from utils.cache import TransactionCache, file_sha256, source_sha256
+from utils.csv_loader import load_transactions
+from utils.graph_builder import TransactionGraph
+
+SAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      'sample_data', 'transactions.csv')
+
+
+def test_round_trip_matches_fresh_parse(tmp_path):
+    cache = TransactionCache(str(tmp_path), max_bytes=1 << 30)
+    key = file_sha256(SAMPLE)
+    assert cache.get(key) is None
+
+    df = load_transactions(SAMPLE)
+    tg = TransactionGraph.from_dataframe(df)
+    cache.put(key, df, tg)
+    cached_df, cached_tg = cache.get(key)
+
+    pd.testing.assert_frame_equal(cached_df, df)
+    for attr in ('account_ids', 'src', 'dst', 'amount', 'txn_count', 'first_ts',
+                 'last_ts', 'indptr', 'rindptr', 'rindices'):
+        assert np.array_equal(getattr(cached_tg, attr), getattr(tg, attr))
+
+
+def test_evicts_least_recently_used(tmp_path):
+    df = load_transactions(SAMPLE)
+    tg = TransactionGraph.from_dataframe(df)
+    cache = TransactionCache(str(tmp_path), max_bytes=1 << 30)
+    for key in ('a', 'b', 'c'):
+        cache.put(key, df, tg)
+        os.utime(cache._entry(key), (0, {'a': 1, 'b': 2, 'c': 3}[key]))
+    cache.get('a')                      # 'a' becomes most recent
+
+    entry_size = sum(f.stat().st_size for f in (tmp_path / 'v1' / 'a').iterdir())
+    cache.max_bytes = 2 * entry_size
+    cache.evict()
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+
+
+def test_entry_evicted_during_read_is_a_miss(tmp_path, monkeypatch):
+    df = load_transactions(SAMPLE)
+    cache = TransactionCache(str(tmp_path), max_bytes=1 << 30)
+    cache.put('a', df, TransactionGraph.from_dataframe(df))
+
+    def evicted(path, *args):
+        raise FileNotFoundError(path)   # another process removed it after the load
+
+    monkeypatch.setattr(os, 'utime', evicted)
+    assert cache.get('a') is None
+
+
+def test_in_memory_upload_parses_like_file():
+    with open(SAMPLE, 'rb') as f:
+        contents = f.read()
+    buffer = io.BytesIO(contents)
+    assert source_sha256(buffer) == file_sha256(SAMPLE)
+
+    expected = load_transactions(SAMPLE)
+    pd.testing.assert_frame_equal(load_transactions(buffer), expected)
+    pd.testing.assert_frame_equal(
+        load_transactions(pd.read_csv(io.BytesIO(contents))), expected, check_dtype=False
+    )
+
+
+def test_default_locations_are_outside_the_source_tree():
+    import config
+    source = os.path.dirname(os.path.abspath(config.__file__))
+    for path, env in ((config.CACHE_DIR, 'NEXA_CACHE_DIR'),
+                      (config.ANALYSIS_STORE_PATH, 'NEXA_ANALYSIS_STORE')):
+        if env not in os.environ:
+            assert os.path.commonpath([path, source]) != source
+
+
+def test_pipeline_cache_lands_in_tmp_path(transaction_cache_dir):
+    from ai_engine import AIEngine
+    AIEngine().load_data(SAMPLE).build_graph()
+    assert any(transaction_cache_dir.rglob('*.npy'))
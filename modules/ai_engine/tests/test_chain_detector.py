@@ -0,0 +1,68 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from detectors.chain_detector import ChainDetector
+from utils.graph_builder import TransactionGraph
+from config import MAX_CHAIN_DEPTH
+
+
+def _random_frame(seed, n_accounts=60, n_rows=150):
+    rng = np.random.default_rng(seed)
+    ids = np.array([f"A{i:02d}" for i in range(n_accounts)], dtype=object)
+    df = pd.DataFrame({
+        'transaction_id': np.arange(n_rows),
+        'sender_id':      ids[rng.integers(0, n_accounts, n_rows)],
+        'receiver_id':    ids[rng.integers(0, n_accounts, n_rows)],
+        'amount':         rng.integers(1, 50, n_rows) * 100.0,
+        'timestamp':      pd.Timestamp('2026-02-01'),
+    })
+    return df[df['sender_id'] != df['receiver_id']].reset_index(drop=True)
+
+
+def _reference_chains(G, detector, min_length=3):
+    """Exhaustive version of the original recursive DFS, without the result cap."""
+    chains = {}
+
+    def dfs(path, depth):
+        if depth > MAX_CHAIN_DEPTH:
+            return
+        for nb in G.successors(path[-1]):
+            if nb in path:
+                continue
+            new_path = path + [nb]
+            mids = new_path[1:-1]
+            if len(new_path) >= min_length and mids and all(detector._is_shell(n) for n in mids):
+                chains[tuple(new_path)] = sum(
+                    G.edges[new_path[i], new_path[i + 1]]['amount'] for i in range(len(new_path) - 1)
+                )
+            dfs(new_path, depth + 1)
+
+    for src in G.nodes():
+        if not detector._is_shell(src) and G.out_degree(src) > 0:
+            dfs([src], 1)
+    return chains
+
+
+def test_shell_subgraph_search_matches_exhaustive_dfs():
+    for seed in range(4):
+        df = _random_frame(seed)
+        tg = TransactionGraph.from_dataframe(df)
+        detector = ChainDetector(tg, df)
+        expected = _reference_chains(tg.to_networkx(), detector)
+        found = detector.detect_shell_chains(top_k=10**6)
+        assert expected and {tuple(c['chain']): c['total_amount'] for c in found} == expected
+
+
+def test_top_k_keeps_largest_chains_in_amount_order():
+    df = _random_frame(1)
+    tg = TransactionGraph.from_dataframe(df)
+    detector = ChainDetector(tg, df)
+    everything = detector.detect_shell_chains(top_k=10**6)
+    top = detector.detect_shell_chains(top_k=5)
+    assert [c['total_amount'] for c in top] == sorted(
+        (c['total_amount'] for c in everything), reverse=True
+    )[:5]
+    assert top == everything[:5]
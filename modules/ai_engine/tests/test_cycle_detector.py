@@ -0,0 +1,108 @@
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import networkx as nx
+import numpy as np
+import pytest
+from detectors import cycle_detector
+from detectors.cycle_detector import CycleDetector, trim_acyclic_nodes
+
+
+def _random_graph(seed, n=40, m=160):
+    rng = random.Random(seed)
+    G = nx.DiGraph()
+    for _ in range(m):
+        u, v = rng.randrange(n), rng.randrange(n)
+        if u != v:
+            G.add_edge(f"ACC_{u}", f"ACC_{v}", amount=rng.choice([200, 500, 1500]))
+    return G
+
+
+def _canonical(cycle):
+    i = cycle.index(min(cycle))
+    return tuple(cycle[i:] + cycle[:i])
+
+
+def _reference_suspicious(G, detector, cycle):
+    """The length / hub / amount rules, checked on the networkx graph."""
+    if not (detector.min_len <= len(cycle) <= detector.max_len):
+        return False
+    if any(n in detector._legit_hubs for n in cycle):
+        return False
+    amount = sum(G[cycle[i]][cycle[(i + 1) % len(cycle)]]['amount'] for i in range(len(cycle)))
+    return amount >= detector.min_cycle_amount
+
+
+def test_bounded_search_matches_reference_filter():
+    for seed in range(5):
+        G = _random_graph(seed)
+        detector = CycleDetector(G)
+        expected = {
+            _canonical(c) for c in nx.simple_cycles(G, length_bound=8)
+            if _reference_suspicious(G, detector, c)
+        }
+        found = [_canonical(c) for c in detector.find_cycles_johnson()]
+        assert len(found) == len(set(found))
+        assert set(found) == expected
+
+
+def test_legit_hubs_never_enter_search():
+    G = nx.DiGraph()
+    G.add_edge('A', 'HUB', amount=1000)
+    G.add_edge('HUB', 'B', amount=1000)
+    G.add_edge('B', 'A', amount=1000)
+    for i in range(11):
+        G.add_edge('HUB', f"OUT_{i}", amount=10)
+        G.add_edge(f"IN_{i}", 'HUB', amount=10)
+    assert CycleDetector(G).find_cycles_johnson() == []
+
+
+def test_sample_cycle_detected():
+    G = nx.DiGraph()
+    for src, dst in [('A', 'B'), ('B', 'C'), ('C', 'A'), ('C', 'D')]:
+        G.add_edge(src, dst, amount=1000)
+    assert [_canonical(c) for c in CycleDetector(G).find_cycles_johnson()] == [('A', 'B', 'C')]
+
+
+def test_trim_drops_sources_and_sinks():
+    # S → A ⇄ B → T, plus a source chain X → Y → S
+    src = np.array([0, 1, 2, 2, 4, 5])
+    dst = np.array([1, 2, 1, 3, 5, 0])
+    alive = trim_acyclic_nodes(src, dst, np.ones(6, dtype=bool))
+    assert alive.tolist() == [False, True, True, False, False, False]
+
+
+def test_process_pool_matches_serial_order(monkeypatch):
+    G = nx.disjoint_union_all([_random_graph(seed, n=15, m=60) for seed in range(4)])
+    nx.set_edge_attributes(G, 1500, 'amount')
+    serial = CycleDetector(G, workers=1).find_cycles_johnson()
+    monkeypatch.setattr(cycle_detector, 'CYCLE_PARALLEL_MIN_NODES', 0)
+    parallel = CycleDetector(G, workers=2).find_cycles_johnson()
+    assert serial and parallel == serial
+
+
+def test_sparse_mode_matches_path_search():
+    for seed in range(5):
+        G = _random_graph(seed)
+        sparse = [_canonical(c) for c in CycleDetector(G, mode='sparse').find_cycles_johnson()]
+        path = [_canonical(c) for c in CycleDetector(G, mode='path').find_cycles_johnson()]
+        assert len(sparse) == len(set(sparse))
+        assert set(sparse) == set(path)
+
+
+def test_search_errors_propagate_instead_of_reading_as_no_cycles(monkeypatch):
+    G = nx.DiGraph()
+    for src, dst in [('A', 'B'), ('B', 'C'), ('C', 'A')]:
+        G.add_edge(src, dst, amount=1000)
+    detector = CycleDetector(G)
+
+    def broken():
+        yield 'A', ['A', 'B', 'C']
+        raise RuntimeError("worker died")
+
+    monkeypatch.setattr(detector, 'iter_keyed_cycles', broken)
+    with pytest.raises(RuntimeError):
+        detector.find_cycles_johnson()
+    assert detector.cycles == [] and detector.cycle_keys == [] and not detector.complete
@@ -0,0 +1,77 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_engine import AIEngine, run_detection_pipeline
+from benchmarks.synthetic import generate_transactions
+from detectors.chain_detector import ChainDetector
+from detectors.cycle_detector import CycleDetector
+import detectors.fan_detector as fan_detector
+from detectors.fan_detector import FanDetector
+from utils.deadline import Deadline
+
+
+class _Countdown(Deadline):
+    """Expires after `checks` probes, whatever the clock says."""
+
+    def __init__(self, checks):
+        super().__init__(3600)
+        self.checks = checks
+
+    def expired(self):
+        self.checks -= 1
+        return self.checks < 0
+
+    def ticker(self, every=1):
+        return self.expired
+
+
+def _engine():
+    df, _ = generate_transactions(4_000, seed=5)
+    return AIEngine().load_data(df).build_graph()
+
+
+def test_detectors_keep_partial_results_at_deadline():
+    e = _engine()
+    full = CycleDetector(e.tg, mode='path', workers=1).find_cycles_johnson()
+    cut = CycleDetector(e.tg, mode='path', workers=1, deadline=_Countdown(50))
+    partial = cut.find_cycles_johnson()
+    assert not cut.complete and len(partial) < len(full)
+    assert partial == full[:len(partial)]
+
+    chains = ChainDetector(e.tg, e.df, e.profiles, deadline=_Countdown(3))
+    assert chains.detect_shell_chains() is not None and not chains.complete
+
+    fans = FanDetector(e.tg, e.df, e.profiles, deadline=_Countdown(0))
+    assert fans.detect_all_patterns()['fan_out'] == [] and not fans.complete
+
+
+def test_unlimited_deadline_is_complete():
+    e = _engine()
+    detector = CycleDetector(e.tg, deadline=Deadline(None))
+    assert detector.find_cycles_johnson() == CycleDetector(e.tg).find_cycles_johnson()
+    assert detector.complete
+
+
+def test_pipeline_reports_partial_results():
+    df, _ = generate_transactions(4_000, seed=5)
+    done = run_detection_pipeline(df, deadline=Deadline(None))
+    assert done['partial'] is False and done['warnings'] == []
+    assert done['completeness'] == {'cycles': True, 'fans': True, 'chains': True}
+
+    late = run_detection_pipeline(df, deadline=Deadline(0))
+    assert late['partial'] is True and late['warnings']
+    assert late['warnings'][0].startswith('Analysis deadline of 0s reached')
+    assert not any(late['completeness'].values())
+    assert late['summary']['total_transactions'] == done['summary']['total_transactions']
+
+
+def test_smurfing_sweep_checks_deadline_between_account_slices(monkeypatch):
+    e = _engine()
+    monkeypatch.setattr(fan_detector, 'SMURF_SWEEP_ACCOUNTS', 5)
+    full = FanDetector(e.tg, e.df, e.profiles).detect_temporal_smurfing(threshold=3)
+    # One check before the single in-memory batch, then one per slice
+    cut = FanDetector(e.tg, e.df, e.profiles, deadline=_Countdown(3))
+    partial = cut.detect_temporal_smurfing(threshold=3)
+    assert not cut.complete and 0 < len(partial) < len(full)
+    assert {s['account'] for s in partial} < {s['account'] for s in full}
@@ -0,0 +1,88 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from detectors.fan_detector import FanDetector
+from utils.account_profiles import build_account_profiles
+from utils.graph_builder import TransactionGraph
+
+
+def _fan_in_frame(hub, n_senders, spacing_hours):
+    start = pd.Timestamp('2026-02-01')
+    return pd.DataFrame({
+        'transaction_id': [f"T{i}" for i in range(n_senders)],
+        'sender_id':      [f"S_{i}" for i in range(n_senders)],
+        'receiver_id':    [hub] * n_senders,
+        'amount':         [900.0] * n_senders,
+        'timestamp':      [start + pd.Timedelta(hours=spacing_hours * i) for i in range(n_senders)],
+    })
+
+
+def test_account_profiles_columns():
+    df = _fan_in_frame('HUB', 12, 1)
+    profiles = build_account_profiles(df)
+    hub = profiles.loc['HUB']
+    assert hub['txn_count'] == 12 and hub['in_txn_count'] == 12 and hub['out_txn_count'] == 0
+    assert hub['in_counterparties'] == 12 and hub['in_volume'] == 12 * 900.0
+    assert abs(hub['span_days'] - 11 / 24) < 1e-9
+    assert profiles.loc['S_0', 'out_counterparties'] == 1
+
+
+def test_merchant_guard_uses_activity_span():
+    burst = _fan_in_frame('MULE', 12, 1)
+    merchant = _fan_in_frame('SHOP', 12, 24 * 4)  # 44 days of steady receipts
+    df = pd.concat([burst, merchant], ignore_index=True)
+    G = TransactionGraph.from_dataframe(df).to_networkx()
+    fans = FanDetector(G, df, build_account_profiles(df)).detect_all_patterns()
+    assert [f['account'] for f in fans['fan_in']] == ['MULE']
+    assert [s['account'] for s in fans['temporal_smurfing']] == ['MULE']
+
+
+def _reference_smurfing(df, threshold, window_hours):
+    """The original per-account two-pointer loop, kept as the oracle."""
+    window = pd.Timedelta(hours=window_hours).value
+    out = []
+    for account in pd.concat([df['sender_id'], df['receiver_id']]).unique():
+        involved = df[(df['sender_id'] == account) | (df['receiver_id'] == account)]
+        involved = involved.sort_values('timestamp', kind='stable')
+        if len(involved) < threshold:
+            continue
+        ts = involved['timestamp'].values.astype('datetime64[ns]').astype('int64')
+        cps = [r if s == account else s
+               for s, r in zip(involved['sender_id'], involved['receiver_id'])]
+        seen, left, best, start = {}, 0, 0, None
+        for right in range(len(ts)):
+            seen[cps[right]] = seen.get(cps[right], 0) + 1
+            while ts[right] - ts[left] > window:
+                seen[cps[left]] -= 1
+                if not seen[cps[left]]:
+                    del seen[cps[left]]
+                left += 1
+            if len(seen) >= threshold and len(seen) > best:
+                best, start = len(seen), ts[left]
+        if best >= threshold:
+            out.append((account, best, start))
+    return out
+
+
+def test_vectorised_smurfing_matches_two_pointer_reference():
+    import numpy as np
+    rng = np.random.default_rng(7)
+    n = 600
+    accounts = np.array([f"A{i}" for i in range(25)], dtype=object)
+    df = pd.DataFrame({
+        'transaction_id': np.arange(n),
+        'sender_id':      accounts[rng.integers(0, 25, n)],
+        'receiver_id':    accounts[rng.integers(0, 25, n)],
+        'amount':         100.0,
+        # whole hours over 20 days, so equal timestamps are common
+        'timestamp':      pd.Timestamp('2026-02-01') + pd.to_timedelta(rng.integers(0, 480, n), 'h'),
+    }).sort_values('timestamp', kind='stable').reset_index(drop=True)
+    G = TransactionGraph.from_dataframe(df).to_networkx()
+    found = FanDetector(G, df).detect_temporal_smurfing(threshold=5)
+    expected = _reference_smurfing(df, 5, 72)
+    assert found and [
+        (f['account'], f['max_counterparties'], pd.Timestamp(f['window_start']).value)
+        for f in found
+    ] == [(a, b, int(s)) for a, b, s in expected]
@@ -0,0 +1,59 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import networkx as nx
+import numpy as np
+import pytest
+from utils.graph_builder import TransactionGraph
+from utils.graph_stats import NetworkStats, hoeffding_samples
+
+
+def _random_graph(n=400, m=3_000, seed=7):
+    G = nx.gnm_random_graph(n, m, seed=seed, directed=True)
+    # a few reciprocal edges, self-loops and a hub, as in transaction data
+    G.add_edges_from([(v, u) for u, v in list(G.edges())[:200]])
+    G.add_edges_from([(5, 5), (9, 9)])
+    G.add_edges_from((0, v) for v in range(1, n, 3))
+    G = nx.relabel_nodes(G, {v: f"ACC{v:04d}" for v in G})
+    nx.set_edge_attributes(G, 1.0, 'amount')
+    return G
+
+
+def test_exact_stats_match_networkx():
+    G = _random_graph()
+    stats = NetworkStats(TransactionGraph.from_networkx(G)).as_dict(clustering="exact")
+    assert stats['avg_clustering_method'] == 'exact'
+    assert stats['avg_clustering'] == pytest.approx(nx.average_clustering(G.to_undirected()))
+    assert stats['density'] == pytest.approx(nx.density(G))
+    assert stats['num_components'] == nx.number_weakly_connected_components(G)
+    assert stats['avg_in_degree'] == pytest.approx(G.number_of_edges() / G.number_of_nodes())
+
+
+def test_sampled_clustering_within_error_bound():
+    G = _random_graph()
+    exact = nx.average_clustering(G.to_undirected())
+    stats = NetworkStats(TransactionGraph.from_networkx(G))
+    for seed in range(5):
+        assert abs(stats.sampled_clustering(0.02, 0.99, seed=seed) - exact) <= 0.02
+    assert hoeffding_samples(0.01, 0.95) == 18_445
+
+
+def test_auto_mode_and_off():
+    tg = TransactionGraph.from_networkx(_random_graph())
+    stats = NetworkStats(tg)
+    assert stats.as_dict(exact_max_wedges=stats.wedges)['avg_clustering_method'] == 'exact'
+    sampled = stats.as_dict(exact_max_wedges=stats.wedges - 1, epsilon=0.05)
+    assert sampled['avg_clustering_method'] == 'sampled' and sampled['avg_clustering_error'] == 0.05
+    assert 'avg_clustering' not in stats.as_dict(clustering="off")
+    assert NetworkStats(TransactionGraph.from_networkx(nx.DiGraph())).as_dict()['avg_clustering'] == 0.0
+
+
+def test_stats_from_graph_data_match_the_graph():
+    G = _random_graph()
+    graph_data = {
+        'nodes': [{'id': n} for n in G.nodes()],
+        'links': [{'source': u, 'target': v, 'amount': 1.0, 'txn_count': 1} for u, v in G.edges()],
+    }
+    stats = NetworkStats.from_graph_data(graph_data).as_dict(clustering="exact")
+    assert stats == NetworkStats(TransactionGraph.from_networkx(G)).as_dict(clustering="exact")
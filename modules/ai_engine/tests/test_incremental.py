@@ -0,0 +1,185 @@
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import incremental
+from incremental import IncrementalEngine
+from detectors.chain_detector import ChainDetector
+from detectors.cycle_detector import CycleDetector
+from detectors.fan_detector import FanDetector
+from detectors.scoring_engine import ScoringEngine
+from utils.account_profiles import build_account_profiles
+from utils.graph_builder import TransactionGraph
+from benchmarks.synthetic import generate_transactions
+
+
+def _transactions(seed=0):
+    rng = random.Random(seed)
+    start = pd.Timestamp('2026-03-01')
+    at = lambda hours: start + pd.Timedelta(hours=hours)
+    rows = [(f"N_{rng.randrange(40)}", f"N_{rng.randrange(40)}",
+             float(rng.choice([150, 600, 1500])), at(rng.randrange(24 * 12)))
+            for _ in range(300)]
+    rows += [('C_1', 'C_2', 2000.0, at(100)), ('C_2', 'C_3', 2000.0, at(150)),
+             ('C_3', 'C_1', 2000.0, at(200)), ('N_1', 'C_1', 700.0, at(260))]
+    rows += [('N_2', 'SH_1', 5000.0, at(30)), ('SH_1', 'SH_2', 4900.0, at(140)),
+             ('SH_2', 'SH_3', 4800.0, at(210)), ('SH_3', 'N_3', 4700.0, at(250))]
+    rows += [(f"S_{i}", 'HUB', 900.0, at(120 + 2 * i)) for i in range(12)]
+    df = pd.DataFrame(rows, columns=['sender_id', 'receiver_id', 'amount', 'timestamp'])
+    df.insert(0, 'transaction_id', [f"T{i}" for i in range(len(df))])
+    return df.sort_values('timestamp', kind='stable').reset_index(drop=True)
+
+
+def _canonical(cycle):
+    i = cycle.index(min(cycle))
+    return tuple(cycle[i:] + cycle[:i])
+
+
+def test_batches_match_full_recompute(monkeypatch):
+    monkeypatch.setattr(incremental, 'INCREMENTAL_PAGERANK_REFRESH', 0)
+    df = _transactions()
+    engine = IncrementalEngine()
+    for part in (df.iloc[:120], df.iloc[120:250], df.iloc[250:]):
+        engine.append(part.reset_index(drop=True))
+
+    tg = TransactionGraph.from_dataframe(df)
+    G = tg.to_networkx()
+    profiles = build_account_profiles(df)
+    fans = FanDetector(G, df, profiles).detect_all_patterns()
+    detections = {
+        'cycles':            CycleDetector(tg).find_cycles_johnson(),
+        'chains':            ChainDetector(tg, df, profiles).detect_shell_chains(),
+        **fans,
+    }
+    live = engine.detections()
+
+    assert {_canonical(c) for c in live['cycles']} == {_canonical(c) for c in detections['cycles']}
+    assert {tuple(c['chain']) for c in live['chains']} == {tuple(c['chain']) for c in detections['chains']}
+    for kind in ('fan_out', 'fan_in', 'temporal_smurfing'):
+        assert sorted(live[kind], key=lambda d: d['account']) == \
+            sorted(detections[kind], key=lambda d: d['account'])
+    assert live['cycles'] and live['chains'] and live['temporal_smurfing']
+
+    expected = {s['account_id']: s for s in ScoringEngine(G, df, detections, profiles).score_all_accounts()}
+    assert set(engine.scores) == set(expected)
+    for account, s in engine.scores.items():
+        assert s['risk_factors'] == expected[account]['risk_factors']
+        assert abs(s['risk_score'] - expected[account]['risk_score']) < 0.05
+
+
+def test_batch_only_touches_its_neighbourhood():
+    df = _transactions()
+    engine = IncrementalEngine()
+    engine.append(df)
+    untouched = {k: v for k, v in engine.cycles.items.items()}
+    late = pd.DataFrame({
+        'transaction_id': ['X1'], 'sender_id': ['Z_1'], 'receiver_id': ['Z_2'],
+        'amount': [10.0], 'timestamp': [df['timestamp'].max()],
+    })
+    assert engine.append(late) == {'Z_1', 'Z_2'}
+    assert engine.cycles.items == untouched
+    result = engine.results()
+    assert result['summary']['total_transactions'] == len(df) + 1
+    assert 'graph_data' not in result
+
+
+def test_edge_store_matches_batch_graph():
+    df, _ = generate_transactions(6_000, seed=4)
+    engine = IncrementalEngine()
+    for lo in range(0, len(df), 1_000):              # enough edges to compact several times
+        engine.append(df.iloc[lo:lo + 1_000].reset_index(drop=True))
+    expected = TransactionGraph.from_dataframe(df)
+    live = engine.transaction_graph()
+    for attr in ('account_ids', 'src', 'dst', 'txn_count', 'first_ts', 'last_ts'):
+        assert (getattr(live, attr) == getattr(expected, attr)).all()
+    assert abs(live.amount - expected.amount).max() < 1e-6
+    assert engine.n_edges == expected.number_of_edges()
+    for a in expected.account_ids[::50]:
+        c, i = engine._code[a], expected.index[a]
+        assert sorted(engine.edges.dst[engine.edges.out_edges(c)].tolist()) == \
+            sorted(engine._code[expected.account_ids[j]] for j in expected.successors(i))
+        assert len(engine.edges.in_edges(c)) == len(expected.predecessors(i))
+
+
+def _shell_chain(prefix, amount, hours):
+    """prefix0 (busy) → prefix1..3 (shells) → prefix4."""
+    start = pd.Timestamp('2026-03-01')
+    rows = [(f"{prefix}{k}", f"{prefix}{k + 1}", amount - 100 * k,
+             start + pd.Timedelta(hours=hours + 10 * k)) for k in range(4)]
+    rows += [(f"{prefix}0", f"{prefix}_Y{k}", 10.0, start + pd.Timedelta(hours=k)) for k in range(3)]
+    return rows
+
+
+def _frame(rows):
+    df = pd.DataFrame(rows, columns=['sender_id', 'receiver_id', 'amount', 'timestamp'])
+    df.insert(0, 'transaction_id', [f"T{i}" for i in range(len(df))])
+    return df
+
+
+def test_chain_reservoir_limit_against_full_recompute(monkeypatch):
+    """
+    Documented limit: with a reservoir of one chain, B is evicted behind A.
+    When A later dissolves, only the dirty accounts' chains are re-detected,
+    so B is not reported although a full recompute ranks it first. What is
+    reported is still a genuine chain, and a large enough reservoir agrees
+    with the full recompute.
+    """
+    start = pd.Timestamp('2026-03-01')
+    first = _frame(_shell_chain('A', 5000.0, 10) + _shell_chain('B', 3000.0, 12))
+    # A2 stops being a shell, splitting A into two chains smaller than B
+    late = _frame([('A2', f"X{k}", 50.0, start + pd.Timedelta(hours=90 + k)) for k in range(3)])
+    df = pd.concat([first, late], ignore_index=True)
+    full = ChainDetector(TransactionGraph.from_dataframe(df), df,
+                         build_account_profiles(df)).detect_shell_chains(top_k=1)
+
+    monkeypatch.setattr(incremental, 'CHAIN_TOP_K', 1)
+    for reservoir, exact in ((1, False), (10, True)):
+        monkeypatch.setattr(incremental, 'INCREMENTAL_CHAIN_RESERVOIR', reservoir)
+        engine = IncrementalEngine()
+        engine.append(first)
+        assert [c['chain'] for c in engine.detections()['chains']] == [['A0', 'A1', 'A2', 'A3', 'A4']]
+        engine.append(late)
+        live = engine.detections()['chains']
+
+        recomputed = ChainDetector(engine._region_graph(set(engine._ids)), None,
+                                   engine.profiles_for(engine._ids)).detect_shell_chains()
+        assert {tuple(c['chain']) for c in live} <= {tuple(c['chain']) for c in recomputed}
+        assert ([c['chain'] for c in live] == [c['chain'] for c in full]) is exact
+    assert full[0]['chain'][0] == 'B0'
+
+
+def test_chains_reranked_into_top_k_are_rescored(monkeypatch):
+    """
+    A dissolves, so B enters the reported top-1 without B's accounts being
+    dirty: they must still be rescored. The late batch stays inside the
+    existing time span and PageRank is not refreshed, so nothing else forces
+    a full rescore; the comparison covers what chains decide, i.e. which
+    accounts carry shell_chain_participant.
+    """
+    monkeypatch.setattr(incremental, 'INCREMENTAL_PAGERANK_REFRESH', 1e9)
+    monkeypatch.setattr(incremental, 'CHAIN_TOP_K', 1)
+    monkeypatch.setattr(incremental, 'INCREMENTAL_CHAIN_RESERVOIR', 10)
+    start = pd.Timestamp('2026-03-01')
+    first = _frame(_shell_chain('A', 5000.0, 10) + _shell_chain('B', 3000.0, 12))
+    late = _frame([('A2', f"X{k}", 50.0, start + pd.Timedelta(hours=20 + k)) for k in range(3)])
+    engine = IncrementalEngine()
+    engine.append(first)
+    engine.append(late)
+
+    df = pd.concat([first, late], ignore_index=True)
+    tg = TransactionGraph.from_dataframe(df)
+    G = tg.to_networkx()
+    profiles = build_account_profiles(df)
+    detections = {
+        'cycles': CycleDetector(tg).find_cycles_johnson(),
+        'chains': ChainDetector(tg, df, profiles).detect_shell_chains(top_k=1),
+        **FanDetector(G, df, profiles).detect_all_patterns(),
+    }
+    assert detections['chains'][0]['chain'] == ['B0', 'B1', 'B2', 'B3', 'B4']
+
+    expected = ScoringEngine(G, df, detections, profiles).score_all_accounts()
+    in_chain = lambda s: 'shell_chain_participant' in s['risk_factors']
+    assert {a for a, s in engine.scores.items() if in_chain(s)} == \
+        {s['account_id'] for s in expected if in_chain(s)} == {'B0', 'B1', 'B2', 'B3', 'B4'}
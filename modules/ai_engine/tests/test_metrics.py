@@ -0,0 +1,50 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.metrics import MetricsRegistry
+from pipeline_dag import Stage, run_stages
+
+
+def test_render_text_format():
+    reg = MetricsRegistry()
+    reg.counter('nexa_runs_total', 'Runs', ('status',)).inc(status='ok')
+    reg.gauge('nexa_depth', 'Depth', collect=lambda: 3)
+    h = reg.histogram('nexa_seconds', 'Seconds', ('stage',), buckets=(1, 5))
+    for v in (0.5, 1, 2, 10):
+        h.observe(v, stage='cycles')
+
+    lines = reg.render().splitlines()
+    assert '# TYPE nexa_runs_total counter' in lines
+    assert 'nexa_runs_total{status="ok"} 1' in lines
+    assert 'nexa_depth 3' in lines
+    # Buckets are cumulative and le is inclusive
+    assert 'nexa_seconds_bucket{stage="cycles",le="1"} 2' in lines
+    assert 'nexa_seconds_bucket{stage="cycles",le="5"} 3' in lines
+    assert 'nexa_seconds_bucket{stage="cycles",le="+Inf"} 4' in lines
+    assert 'nexa_seconds_sum{stage="cycles"} 13.5' in lines
+    assert 'nexa_seconds_count{stage="cycles"} 4' in lines
+
+
+def test_drain_and_merge_across_registries():
+    worker, parent = MetricsRegistry(), MetricsRegistry()
+    parent.counter('nexa_runs_total', 'Runs').inc(2)
+    worker.counter('nexa_runs_total', 'Runs').inc()
+    worker.histogram('nexa_seconds', 'Seconds', buckets=(1,)).observe(0.2)
+
+    parent.merge(worker.drain())
+    parent.merge(worker.drain())                    # drained samples are gone
+
+    text = parent.render()
+    assert 'nexa_runs_total 3' in text
+    assert 'nexa_seconds_count 1' in text
+    assert 'nexa_runs_total' not in worker.render()
+
+
+def test_run_stages_reports_stage_stats():
+    seen = {}
+    stages = [Stage('a', lambda ctx: 1), Stage('b', lambda ctx: ctx['a'] + 1, deps=('a',))]
+    run_stages(stages, {}, mode='serial', observe=lambda name, stats: seen.update({name: stats}),
+               trace_memory=True)
+    assert set(seen) == {'a', 'b'}
+    assert all(s['seconds'] >= 0 and 'traced_peak_bytes' in s for s in seen.values())
@@ -0,0 +1,42 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import networkx as nx
+import numpy as np
+import pytest
+from ai_engine import AIEngine
+from benchmarks.synthetic import generate_transactions
+from utils.pagerank import pagerank, pagerank_vector
+
+
+def _engine(rows=5_000, seed=3):
+    df, _ = generate_transactions(rows, seed=seed)
+    return AIEngine().load_data(df).build_graph()
+
+
+def test_matches_networkx():
+    e = _engine()
+    expected = nx.pagerank(e.G, alpha=0.85)
+    got = pagerank(e.tg)
+    assert got.keys() == expected.keys()
+    assert np.allclose([got[a] for a in expected], list(expected.values()), atol=1e-9)
+    assert sum(got.values()) == pytest.approx(1.0)
+
+
+def test_warm_start_converges_faster():
+    tg = _engine().tg
+    n, m = tg.number_of_nodes(), tg.number_of_edges()
+    before, _ = pagerank_vector(n, tg.src[:m - m // 50], tg.dst[:m - m // 50], tol=1e-8)
+    cold, cold_iters = pagerank_vector(n, tg.src, tg.dst, tol=1e-8)
+    warm, warm_iters = pagerank_vector(n, tg.src, tg.dst, tol=1e-8, x0=before)
+    assert warm_iters < cold_iters
+    assert np.abs(warm - cold).sum() < n * 1e-6
+
+
+def test_dangling_nodes_and_empty_graph():
+    G = nx.DiGraph([(0, 1), (1, 2)])
+    G.add_node(3)
+    x, _ = pagerank_vector(4, np.array([0, 1]), np.array([1, 2]))
+    assert np.allclose(x, list(nx.pagerank(G).values()), atol=1e-9)
+    assert pagerank_vector(0, np.array([], dtype=np.int64), np.array([], dtype=np.int64))[0].size == 0
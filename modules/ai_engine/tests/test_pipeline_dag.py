@@ -0,0 +1,51 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from pipeline_dag import Stage, resolve_mode, run_stages
+from utils.cpu import cpu_budget
+
+
+def _stages():
+    return [
+        Stage('a', lambda ctx: ctx['x'] + 1),
+        Stage('b', lambda ctx: ctx['x'] * 10),
+        Stage('pid', lambda ctx: os.getpid()),
+        Stage('sum', lambda ctx: ctx['a'] + ctx['b'], deps=('a', 'b'), inline=True),
+        Stage('final', lambda ctx: (ctx['sum'], os.getpid()), deps=('sum',)),
+    ]
+
+
+@pytest.mark.parametrize('mode', ['serial', 'thread', 'process'])
+def test_stages_see_inputs_and_dependencies(mode):
+    results = run_stages(_stages(), {'x': 4}, mode=mode, workers=2)
+    assert results['a'] == 5 and results['b'] == 40 and results['sum'] == 45
+    assert results['final'][0] == 45
+    if mode == 'process':
+        assert results['pid'] != os.getpid()        # ran in a forked worker
+
+
+def test_stage_errors_propagate():
+    def boom(ctx):
+        raise RuntimeError("detector failed")
+    with pytest.raises(RuntimeError, match="detector failed"):
+        run_stages([Stage('ok', lambda ctx: 1), Stage('bad', boom)], {}, mode='thread', workers=2)
+
+
+def test_rejects_cycles_and_unknown_dependencies():
+    with pytest.raises(ValueError, match="cycle"):
+        run_stages([Stage('a', len, deps=('b',)), Stage('b', len, deps=('a',))], {}, mode='serial')
+    with pytest.raises(ValueError, match="unknown"):
+        run_stages([Stage('a', len, deps=('nope',))], {}, mode='serial')
+
+
+def test_cpu_budget_is_split_across_nested_pools(monkeypatch):
+    monkeypatch.setenv('NEXA_CPU_BUDGET', '1')           # e.g. one of N job workers on N cores
+    assert resolve_mode('auto') == ('serial', 1)
+
+    monkeypatch.setenv('NEXA_CPU_BUDGET', '4')
+    stages = [Stage(name, lambda ctx: cpu_budget()) for name in ('a', 'b')]
+    results = run_stages(stages, {}, mode='process', workers=2)
+    assert results == {'a': 2, 'b': 2}                   # each stage process gets half
+    assert cpu_budget() == 4
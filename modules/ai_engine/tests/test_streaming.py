@@ -0,0 +1,70 @@
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from detectors.fan_detector import FanDetector
+from utils.account_profiles import build_account_profiles
+from utils.csv_loader import load_transactions
+from utils.graph_builder import TransactionGraph
+from utils.streaming import stream_transactions
+
+
+def _write_shuffled_csv(path, seed=0):
+    rng = random.Random(seed)
+    start = pd.Timestamp('2026-02-01')
+    rows = []
+    for i in range(12):                                   # smurfing burst into HUB
+        rows.append((f"S_{i}", 'HUB', 900.0, start + pd.Timedelta(hours=2 * i)))
+    for i in range(200):                                  # background noise
+        rows.append((f"A_{rng.randrange(30)}", f"A_{rng.randrange(30)}",
+                     float(rng.choice([100, 250, 1200])),
+                     start + pd.Timedelta(minutes=rng.randrange(60 * 24 * 20))))
+    rng.shuffle(rows)
+    lines = ['Transaction_ID,Sender,Receiver,Amount,Timestamp']
+    lines += [f"T{i},{s},{r},{a},{t}" for i, (s, r, a, t) in enumerate(rows)]
+    lines.append("T_bad,A_1,A_2,oops,2026-02-03 10:00:00")
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_streamed_graph_matches_in_memory(tmp_path):
+    csv = tmp_path / 'tx.csv'
+    _write_shuffled_csv(csv)
+    df = load_transactions(str(csv))
+    tg = TransactionGraph.from_dataframe(df)
+
+    with stream_transactions(str(csv), chunk_rows=17, n_buckets=4,
+                             spill_dir=str(tmp_path)) as streamed:
+        assert len(streamed) == len(df)
+        for attr in ('account_ids', 'src', 'dst', 'txn_count', 'first_ts', 'last_ts'):
+            assert np.array_equal(getattr(streamed.tg, attr), getattr(tg, attr))
+        assert np.allclose(streamed.tg.amount, tg.amount)
+        pd.testing.assert_frame_equal(
+            streamed.profiles, build_account_profiles(df), check_dtype=False
+        )
+
+        G = tg.to_networkx()
+        expected = FanDetector(G, df).detect_temporal_smurfing()
+        assert expected and FanDetector(G, streamed, streamed.profiles).detect_temporal_smurfing() == expected
+        spill = streamed._spill_dir
+    assert not os.path.exists(spill)
+
+
+def test_spill_keeps_only_sorted_smurf_candidates(tmp_path):
+    csv = tmp_path / 'tx.csv'
+    _write_shuffled_csv(csv)
+    df = load_transactions(str(csv))
+    tg = TransactionGraph.from_dataframe(df)
+    expected = FanDetector(tg, df).detect_temporal_smurfing()
+
+    with stream_transactions(str(csv), chunk_rows=17, n_buckets=4, spill_dir=str(tmp_path),
+                             min_occurrences=10, max_span_days=30) as streamed:
+        batches = list(streamed.occurrence_batches())
+        kept = np.concatenate([acct for acct, _, _ in batches])
+        assert 0 < len(kept) < 2 * len(df)
+        assert (streamed.profiles['txn_count'].to_numpy()[np.unique(kept)] >= 10).all()
+        for acct, cp, t in batches:
+            assert (np.lexsort((t, cp, acct)) == np.arange(len(acct))).all()
+        assert FanDetector(streamed.tg, streamed, streamed.profiles).detect_temporal_smurfing() == expected
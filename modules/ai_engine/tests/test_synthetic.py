@@ -0,0 +1,34 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_engine import AIEngine, PIPELINE_STAGES
+from benchmarks.bench_pipeline import compare
+from benchmarks.synthetic import PATTERN_KINDS, generate_transactions, recall
+from pipeline_dag import run_stages
+
+
+def test_generator_is_seeded():
+    a, truth_a = generate_transactions(3_000, seed=3)
+    b, truth_b = generate_transactions(3_000, seed=3)
+    assert a.equals(b) and truth_a == truth_b
+    assert not a.equals(generate_transactions(3_000, seed=4)[0])
+    assert len(a) == 3_000 and set(truth_a) == set(PATTERN_KINDS)
+
+
+def test_planted_patterns_are_detected():
+    df, planted = generate_transactions(5_000, seed=11)
+    engine = AIEngine().load_data(df).build_graph()
+    results = run_stages(PIPELINE_STAGES, {'tg': engine.tg, 'df': engine.df,
+                                           'profiles': engine.profiles}, mode='serial')
+    assert recall(planted, results['detections']) == {kind: 1.0 for kind in PATTERN_KINDS}
+
+
+def test_compare_flags_regressions():
+    def report(seconds, cycles_recall):
+        return {'runs': {'10000': {'stages': {'cycles': {'seconds': seconds}},
+                                   'recall': {'cycles': cycles_recall}}}}
+
+    assert compare(report(1.1, 1.0), report(1.0, 1.0), tolerance=0.25, min_seconds=0.05) == []
+    flagged = compare(report(2.0, 0.5), report(1.0, 1.0), tolerance=0.25, min_seconds=0.05)
+    assert len(flagged) == 2
@@ -3,12 +3,18 @@ Utility functions for AI Engine
 Data loading, processing, and visualization tools
 """
 
-from .csv_loader import load_transactions
-from .graph_builder import build_transaction_graph
+from .csv_loader import InvalidCSVError, load_transactions
+from .graph_builder import TransactionGraph, build_transaction_graph
+from .account_profiles import build_account_profiles
+from .cache import TransactionCache
 from .visualizer import visualize_graph
 
 __all__ = [
+    'InvalidCSVError',
     'load_transactions',
+    'TransactionGraph',
     'build_transaction_graph',
+    'build_account_profiles',
+    'TransactionCache',
     'visualize_graph'
 ]
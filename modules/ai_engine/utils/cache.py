@@ -0,0 +1,147 @@
+"""
+Transaction Cache - Content-addressed store for parsed transactions and edges.
+
+Each input file is keyed by the SHA-256 of its bytes. An entry is a directory
+of plain .npy columns (no pickling): the cleaned transaction table as codes
+into a shared account dictionary, plus the aggregated TransactionGraph edge
+arrays. Entries are written to a temp directory and renamed into place, so
+concurrent writers never expose a half-written entry. Reads touch the entry's
+mtime; once the store exceeds its byte budget the least recently used entries
+are removed.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import CategoricalDtype
+
+from .graph_builder import TransactionGraph
+
+# Bump when the loader's output or the on-disk layout changes
+CACHE_FORMAT_VERSION = 1
+
+_TABLE_COLUMNS = ('transaction_id', 'sender_code', 'receiver_code', 'amount', 'timestamp')
+_EDGE_COLUMNS = ('src', 'dst', 'amount', 'txn_count', 'first_ts', 'last_ts')
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def source_sha256(source) -> Optional[str]:
+    """Digest of a CSV path or in-memory buffer; None if it cannot be hashed cheaply."""
+    if isinstance(source, str):
+        return file_sha256(source)
+    if hasattr(source, 'getbuffer'):
+        return hashlib.sha256(source.getbuffer()).hexdigest()
+    return None
+
+
+def _dir_size(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files in os.walk(path) for name in files
+    )
+
+
+class TransactionCache:
+    """
+    On-disk LRU cache: sha256 → (cleaned DataFrame, TransactionGraph).
+
+    Layout: <root>/v<CACHE_FORMAT_VERSION>/<sha256>/{table_*,edge_*,accounts}.npy
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = os.path.join(root, f"v{CACHE_FORMAT_VERSION}")
+        self.max_bytes = max_bytes
+        os.makedirs(self.root, exist_ok=True)
+
+    def _entry(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    # ── Read ──────────────────────────────────────────────────────────────────
+    def get(self, key: str) -> Optional[Tuple[pd.DataFrame, TransactionGraph]]:
+        path = self._entry(key)
+        if not os.path.isdir(path):
+            return None
+        try:
+            load = lambda name: np.load(os.path.join(path, f"{name}.npy"), allow_pickle=False)
+            accounts = load('accounts').astype(object)
+            table = {c: load(f"table_{c}") for c in _TABLE_COLUMNS}
+            edges = {c: load(f"edge_{c}") for c in _EDGE_COLUMNS}
+            os.utime(path)
+        except (OSError, ValueError):
+            # Evicted by another process meanwhile, or corrupt: treat as a miss
+            shutil.rmtree(path, ignore_errors=True)
+            return None
+
+        shared = CategoricalDtype(pd.Index(accounts))
+        df = pd.DataFrame({
+            'transaction_id': pd.Series(table['transaction_id'].astype(object)).astype(str),
+            'sender_id':      pd.Categorical.from_codes(table['sender_code'], dtype=shared),
+            'receiver_id':    pd.Categorical.from_codes(table['receiver_code'], dtype=shared),
+            'amount':         table['amount'],
+            'timestamp':      table['timestamp'],
+        })
+        tg = TransactionGraph(accounts, **edges)
+        return df, tg
+
+    # ── Write ─────────────────────────────────────────────────────────────────
+    def put(self, key: str, df: pd.DataFrame, tg: TransactionGraph) -> None:
+        path = self._entry(key)
+        if os.path.isdir(path):
+            try:
+                os.utime(path)
+                return
+            except OSError:
+                pass            # evicted meanwhile: write it again
+        snd, rcv = df['sender_id'], df['receiver_id']
+        if not (isinstance(snd.dtype, CategoricalDtype) and snd.dtype == rcv.dtype
+                and len(snd.cat.categories) == tg.number_of_nodes()):
+            return  # only loader output (shared, fully used dictionary) is cacheable
+
+        tmp = tempfile.mkdtemp(prefix=f".{key[:12]}-", dir=self.root)
+        try:
+            save = lambda name, arr: np.save(os.path.join(tmp, f"{name}.npy"), arr, allow_pickle=False)
+            save('accounts', snd.cat.categories.to_numpy().astype(str))
+            save('table_transaction_id', df['transaction_id'].to_numpy().astype(str))
+            save('table_sender_code', snd.cat.codes.to_numpy())
+            save('table_receiver_code', rcv.cat.codes.to_numpy())
+            save('table_amount', df['amount'].to_numpy())
+            save('table_timestamp', df['timestamp'].to_numpy())
+            for c in _EDGE_COLUMNS:
+                save(f"edge_{c}", getattr(tg, c))
+            os.replace(tmp, path)
+        except OSError:
+            # Lost a race with another writer, or the disk is full
+            shutil.rmtree(tmp, ignore_errors=True)
+            return
+        self.evict()
+
+    # ── Eviction ──────────────────────────────────────────────────────────────
+    def evict(self) -> None:
+        """Remove least-recently-used entries until the store fits max_bytes."""
+        entries = []
+        for name in os.listdir(self.root):
+            path = self._entry(name)
+            if name.startswith('.') or not os.path.isdir(path):
+                continue
+            try:
+                entries.append((os.path.getmtime(path), _dir_size(path), path))
+            except OSError:
+                continue
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
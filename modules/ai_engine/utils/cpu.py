@@ -0,0 +1,36 @@
+"""
+CPU budget - How many cores this process may keep busy.
+
+An API analysis can nest three pools: job workers (ANALYSIS_WORKERS), the
+stages of one pipeline (PIPELINE_WORKERS) and the cycle search inside the
+cycle stage (CYCLE_DETECTION_WORKERS). Every pool left at its default sizes
+itself from this budget and hands each of its processes an equal share of
+it, so the levels split one set of cores instead of multiplying to ~cores².
+A job worker on a fully used machine therefore gets a budget of 1 and runs
+its stages and cycle search serially.
+
+The budget travels in the NEXA_CPU_BUDGET environment variable, which forked
+and spawned children both inherit; unset, it is the machine's core count.
+"""
+
+import os
+
+CPU_BUDGET_ENV = "NEXA_CPU_BUDGET"
+
+
+def cpu_budget() -> int:
+    """Cores this process may use (at least 1)."""
+    try:
+        return max(1, int(os.environ[CPU_BUDGET_ENV]))
+    except (KeyError, ValueError):
+        return os.cpu_count() or 1
+
+
+def set_cpu_budget(cores: int) -> None:
+    """Budget for this process and the pools it starts from now on."""
+    os.environ[CPU_BUDGET_ENV] = str(max(1, cores))
+
+
+def share(workers: int) -> int:
+    """Budget each of `workers` pool processes gets out of this process's."""
+    return max(1, cpu_budget() // max(1, workers))
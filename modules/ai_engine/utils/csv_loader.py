@@ -1,4 +1,148 @@
+import io
+
+import numpy as np
 import pandas as pd
+from pandas.api.types import CategoricalDtype, is_string_dtype
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+
+class InvalidCSVError(ValueError):
+    """The input is not a usable transaction CSV (the API answers 400)."""
+
+
+# RIFT spec timestamp layout; parsed with a fixed format, inference only for stragglers
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Candidate name mapping for required fields (case-insensitive)
+COLUMN_CANDIDATES = {
+    'transaction_id': ['transaction_id', 'transactionid', 'tx_id', 'txid', 'tx', 'id', 'transaction'],
+    'sender_id': ['sender_id', 'sender', 'from', 'source', 'payer', 'from_account', 'sender_account'],
+    'receiver_id': ['receiver_id', 'receiver', 'to', 'target', 'recipient', 'to_account', 'receiver_account'],
+    'amount': ['amount', 'amt', 'value', 'transaction_amount', 'volume', 'sum'],
+    'timestamp': ['timestamp', 'time', 'datetime', 'date', 'transaction_date', 'transaction_time']
+}
+
+
+def account_codes(df):
+    """Integer codes for sender_id / receiver_id plus the account-ID array.
+
+    Uses the shared categorical dictionary written by load_transactions when
+    present (no hashing at all); otherwise factorises the two columns together.
+    IDs come back sorted and every returned ID occurs in the frame.
+    """
+    snd, rcv = df['sender_id'], df['receiver_id']
+    if (isinstance(snd.dtype, CategoricalDtype) and snd.dtype == rcv.dtype):
+        raw = np.concatenate([snd.cat.codes.to_numpy(), rcv.cat.codes.to_numpy()])
+        codes, used = pd.factorize(raw, sort=True)
+        ids = snd.cat.categories.to_numpy(object)[used]
+    else:
+        codes, ids = pd.factorize(
+            np.concatenate([snd.to_numpy(object), rcv.to_numpy(object)]), sort=True
+        )
+        ids = np.asarray(ids, dtype=object)
+    n = len(df)
+    return codes[:n], codes[n:], ids
+
+
+def _parse_timestamps(raw):
+    ts = pd.to_datetime(raw, format=TIMESTAMP_FORMAT, errors='coerce')
+    retry = ts.isna() & raw.notna()
+    if retry.any():
+        ts[retry] = pd.to_datetime(raw[retry], errors='coerce', format='mixed')
+    return ts
+
+
+def resolve_columns(columns):
+    """Map canonical field → actual CSV column name; InvalidCSVError if any is missing."""
+    found = {}
+    cols_lower = {c.strip().lower(): c for c in columns}
+
+    for req, opts in COLUMN_CANDIDATES.items():
+        for opt in opts:
+            if opt in cols_lower:
+                found[req] = cols_lower[opt]
+                break
+
+    missing = [r for r in COLUMN_CANDIDATES.keys() if r not in found]
+    if missing:
+        raise InvalidCSVError(
+            f"Invalid CSV structure: Missing required columns {missing}.\n"
+            f"Required: transaction_id, sender_id, receiver_id, amount, timestamp\n"
+            f"Found columns: {[c.strip() for c in columns]}\n"
+            f"Accepted variants: {COLUMN_CANDIDATES}"
+        )
+    return found
+
+
+def read_options(found):
+    """read_csv keyword arguments: only the mapped columns, explicit dtypes."""
+    return {
+        'usecols': list(found.values()),
+        'dtype': {
+            found['transaction_id']: str,
+            found['sender_id']:      str,
+            found['receiver_id']:    str,
+            found['timestamp']:      str,
+        },
+    }
+
+
+def clean_frame(df, found):
+    """Rename to canonical columns, coerce types and drop invalid rows.
+
+    Returns (df, invalid_amounts, invalid_times, dropped_count).
+    """
+    # Canonical names, in place (no frame copy)
+    rename_map = {v: k for k, v in found.items()}
+    df.columns = [rename_map[c] for c in df.columns]
+
+    # Convert types with validation
+    try:
+        df['amount'] = pd.to_numeric(df['amount'], errors='coerce')
+        df['timestamp'] = _parse_timestamps(df['timestamp'])
+    except Exception as e:
+        raise InvalidCSVError(f"Failed to convert data types: {e}")
+
+    invalid_amounts = int(df['amount'].isna().sum())
+    invalid_times = int(df['timestamp'].isna().sum())
+
+    # Drop rows that lack critical fields after coercion (only copy if needed)
+    valid = df.notna().all(axis=1)
+    dropped_count = len(df) - int(valid.sum())
+    if dropped_count > 0:
+        df = df[valid].reset_index(drop=True)
+    return df, invalid_amounts, invalid_times, dropped_count
+
+
+def _read_source(source):
+    """Parse a path or file-like CSV (header first, then only mapped columns)."""
+    if not isinstance(source, str) and not (hasattr(source, 'seek') and source.seekable()):
+        source = io.BytesIO(source.read())
+    try:
+        header = pd.read_csv(source, nrows=0)
+    except Exception as e:
+        raise InvalidCSVError(f"Failed to read CSV file: {e}")
+    found = resolve_columns(header.columns)
+
+    if not isinstance(source, str):
+        source.seek(0)
+    try:
+        return pd.read_csv(source, **read_options(found)), found
+    except Exception as e:
+        raise InvalidCSVError(f"Failed to read CSV file: {e}")
+
+
+def _from_frame(frame):
+    """Select/normalise the mapped columns of an already-parsed DataFrame."""
+    found = resolve_columns(frame.columns)
+    df = frame[list(found.values())].copy()
+    for key in ('transaction_id', 'sender_id', 'receiver_id'):
+        col = df[found[key]]
+        if not is_string_dtype(col):
+            df[found[key]] = col.astype(object).where(col.isna(), col.astype(str))
+    return df, found
 
 
 def load_transactions(csv_path):
@@ -14,97 +158,70 @@ def load_transactions(csv_path):
     
     This function is tolerant of common column-name variants and will
     automatically normalize them to the required canonical schema.
+
+    Only the five required columns are parsed, with explicit dtypes. sender_id
+    and receiver_id are then encoded against one sorted categorical dictionary
+    (factorise each column, merge the two small uniques; much faster than the
+    parser's own per-column 'category' dtype), so downstream
+    stages get integer account codes via account_codes(). Timestamps use the
+    fixed TIMESTAMP_FORMAT, with inference only for rows that do not match.
     
     Args:
-        csv_path (str): Path to CSV file
+        csv_path: Path to a CSV file, a file-like object with CSV bytes/text
+            (e.g. an in-memory upload; parsed once, never written to disk),
+            or an already-parsed DataFrame with the same columns
         
     Returns:
         pd.DataFrame: Validated and normalized transaction data
         
     Raises:
-        ValueError: If required columns are missing or data is invalid
+        InvalidCSVError: If required columns are missing or data is invalid
     """
-    try:
-        df = pd.read_csv(csv_path)
-    except Exception as e:
-        raise ValueError(f"Failed to read CSV file: {e}")
+    if isinstance(csv_path, pd.DataFrame):
+        df, found = _from_frame(csv_path)
+    else:
+        df, found = _read_source(csv_path)
 
     if df.empty:
-        raise ValueError("CSV file is empty")
-
-    # Normalize column names (strip whitespace, lower-case)
-    df.columns = [c.strip() for c in df.columns]
-
-    # Candidate name mapping for required fields (case-insensitive)
-    candidates = {
-        'transaction_id': ['transaction_id', 'transactionid', 'tx_id', 'txid', 'tx', 'id', 'transaction'],
-        'sender_id': ['sender_id', 'sender', 'from', 'source', 'payer', 'from_account', 'sender_account'],
-        'receiver_id': ['receiver_id', 'receiver', 'to', 'target', 'recipient', 'to_account', 'receiver_account'],
-        'amount': ['amount', 'amt', 'value', 'transaction_amount', 'volume', 'sum'],
-        'timestamp': ['timestamp', 'time', 'datetime', 'date', 'transaction_date', 'transaction_time']
-    }
+        raise InvalidCSVError("CSV file is empty")
 
-    found = {}
-    cols_lower = {c.lower(): c for c in df.columns}
-
-    for req, opts in candidates.items():
-        for opt in opts:
-            if opt in cols_lower:
-                found[req] = cols_lower[opt]
-                break
-
-    missing = [r for r in candidates.keys() if r not in found]
-    if missing:
-        raise ValueError(
-            f"Invalid CSV structure: Missing required columns {missing}.\n"
-            f"Required: transaction_id, sender_id, receiver_id, amount, timestamp\n"
-            f"Found columns: {list(df.columns)}\n"
-            f"Accepted variants: {candidates}"
-        )
-
-    # Rename to canonical names
-    rename_map = {found[k]: k for k in found}
-    df = df.rename(columns=rename_map)
-
-    # Convert types with validation
-    try:
-        df['amount'] = pd.to_numeric(df['amount'], errors='coerce')
-        df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
-    except Exception as e:
-        raise ValueError(f"Failed to convert data types: {e}")
+    original_count = len(df)
+    df, invalid_amounts, invalid_times, dropped_count = clean_frame(df, found)
 
     # Validate data integrity
-    invalid_amounts = df['amount'].isna().sum()
-    invalid_times = df['timestamp'].isna().sum()
-    
     if invalid_amounts > 0:
-        print(f"⚠️  Warning: {invalid_amounts} rows with invalid amounts (will be excluded)")
+        logger.warning(f"⚠️  Warning: {invalid_amounts} rows with invalid amounts (will be excluded)")
     if invalid_times > 0:
-        print(f"⚠️  Warning: {invalid_times} rows with invalid timestamps (will be excluded)")
-
-    # Drop rows that lack critical fields after coercion
-    original_count = len(df)
-    df = df.dropna(subset=['transaction_id', 'sender_id', 'receiver_id', 'amount', 'timestamp'])
-    dropped_count = original_count - len(df)
-    
+        logger.warning(f"⚠️  Warning: {invalid_times} rows with invalid timestamps (will be excluded)")
     if dropped_count > 0:
-        print(f"⚠️  Dropped {dropped_count} invalid rows from {original_count} total")
+        logger.warning(f"⚠️  Dropped {dropped_count} invalid rows from {original_count} total")
 
     if df.empty:
-        raise ValueError("No valid transactions after data cleansing")
+        raise InvalidCSVError("No valid transactions after data cleansing")
+
+    # One shared, sorted account dictionary for sender and receiver
+    snd_codes, snd_ids = pd.factorize(df['sender_id'])
+    rcv_codes, rcv_ids = pd.factorize(df['receiver_id'])
+    accounts = pd.Index(snd_ids).union(pd.Index(rcv_ids))
+    shared = CategoricalDtype(accounts)
+    df['sender_id'] = pd.Categorical.from_codes(
+        accounts.get_indexer(snd_ids)[snd_codes], dtype=shared)
+    df['receiver_id'] = pd.Categorical.from_codes(
+        accounts.get_indexer(rcv_ids)[rcv_codes], dtype=shared)
 
     # Validation checks
     if (df['amount'] <= 0).any():
-        print(f"⚠️  Warning: {(df['amount'] <= 0).sum()} transactions with zero or negative amount")
+        logger.warning(f"⚠️  Warning: {(df['amount'] <= 0).sum()} transactions with zero or negative amount")
 
     # Sort by timestamp for temporal analysis
-    df = df.sort_values('timestamp').reset_index(drop=True)
+    if not df['timestamp'].is_monotonic_increasing:
+        df = df.sort_values('timestamp', kind='stable').reset_index(drop=True)
 
     # Print summary
-    print(f"✅ CSV Validation Successful")
-    print(f"   Loaded: {len(df)} valid transactions")
-    print(f"   Period: {df['timestamp'].min()} to {df['timestamp'].max()}")
-    print(f"   Unique accounts: {len(set(df['sender_id']).union(set(df['receiver_id'])))}")
-    print(f"   Total volume: ${df['amount'].sum():,.2f}")
+    logger.info(f"✅ CSV Validation Successful")
+    logger.info(f"   Loaded: {len(df)} valid transactions")
+    logger.info(f"   Period: {df['timestamp'].min()} to {df['timestamp'].max()}")
+    logger.info(f"   Unique accounts: {len(accounts)}")
+    logger.info(f"   Total volume: ${df['amount'].sum():,.2f}")
     
-    return df
\ No newline at end of file
+    return df
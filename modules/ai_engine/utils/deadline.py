@@ -0,0 +1,53 @@
+"""
+Deadline - Cooperative time budget for one analysis.
+
+run_detection_pipeline starts a Deadline of ANALYSIS_TIMEOUT_SECONDS and hands
+it to every detector. Detectors poll it from their inner loops (every few
+thousand steps via ticker(), so the clock read stays off the hot path) and
+stop early, keeping what they found so far and clearing their `complete`
+flag. The expiry is an absolute CLOCK_MONOTONIC time, so forked stage and
+search workers share the same budget.
+"""
+
+import math
+import time
+from typing import Callable, Optional
+
+
+class DeadlineExceeded(Exception):
+    """Raised inside a search to unwind it once the deadline has passed."""
+
+
+class Deadline:
+    def __init__(self, seconds: Optional[float] = None):
+        """seconds: budget from now; None never expires."""
+        self.seconds = seconds
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        if self.expires_at is None:
+            return math.inf
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def check(self) -> None:
+        """Raise DeadlineExceeded once the budget is spent."""
+        if self.expired():
+            raise DeadlineExceeded(f"analysis deadline of {self.seconds}s exceeded")
+
+    def ticker(self, every: int = 4096) -> Callable[[], bool]:
+        """Cheap per-iteration probe: reads the clock once every `every` calls."""
+        if self.expires_at is None:
+            return lambda: False
+        count = 0
+
+        def tick() -> bool:
+            nonlocal count
+            count += 1
+            return count % every == 0 and self.expired()
+        return tick
+
+
+NO_DEADLINE = Deadline(None)
@@ -1,44 +1,196 @@
 """
 Graph Builder - Aggregates multiple transactions into weighted edges.
 One sender→receiver pair = ONE edge. Duplicate edges break cycle detection.
+
+TransactionGraph is the compact form used on the hot path: account IDs are
+interned to contiguous ints, adjacency is CSR in both directions, and edge
+attributes are stored column-wise. to_networkx() exists only for stages that
+have not moved onto the arrays yet.
 """
 
+from typing import Dict, Optional
+
 import networkx as nx
+import numpy as np
 import pandas as pd
 
+from .csv_loader import account_codes
+from .log import get_logger
 
-def build_transaction_graph(df: pd.DataFrame) -> nx.DiGraph:
-    G = nx.DiGraph()
-
-    grouped = (
-        df.groupby(['sender_id', 'receiver_id'])
-        .agg(
-            amount    =('amount', 'sum'),
-            txn_count =('amount', 'count'),
-            avg_amount=('amount', 'mean'),
-            first_txn =('timestamp', 'min'),
-            last_txn  =('timestamp', 'max'),
+logger = get_logger(__name__)
+
+_NS_PER_DAY = 86_400 * 10**9
+
+
+def _to_int64_ns(ts: pd.Series) -> np.ndarray:
+    return ts.to_numpy().astype('datetime64[ns]').astype(np.int64)
+
+
+class TransactionGraph:
+    """
+    Integer-indexed aggregated transaction graph in CSR form.
+
+    Edges are stored sorted by (src, dst), so edge id `e` is also its position
+    in the forward CSR: successors of node `i` are `indices[indptr[i]:indptr[i+1]]`
+    and their edge ids are `range(indptr[i], indptr[i+1])`. The reverse CSR
+    (`rindptr`, `rindices`, `redge`) maps each node to its predecessors and
+    the ids of the corresponding edges.
+
+    Edge columns: src, dst, amount (float64), txn_count (int64), first_ts and
+    last_ts (int64 ns since epoch).
+    """
+
+    def __init__(
+        self,
+        account_ids: np.ndarray,
+        src: np.ndarray,
+        dst: np.ndarray,
+        amount: np.ndarray,
+        txn_count: np.ndarray,
+        first_ts: np.ndarray,
+        last_ts: np.ndarray,
+    ):
+        n = len(account_ids)
+        src, dst = np.asarray(src, dtype=np.int64), np.asarray(dst, dtype=np.int64)
+        key = src * n + dst
+        # Already (src, dst)-sorted edges (from_dataframe, cache reads) skip the sort
+        order = slice(None) if np.all(key[1:] > key[:-1]) else np.lexsort((dst, src))
+        self.account_ids = np.asarray(account_ids, dtype=object)
+        self.src = src[order]
+        self.dst = dst[order]
+        self.amount = np.asarray(amount, dtype=np.float64)[order]
+        self.txn_count = np.asarray(txn_count, dtype=np.int64)[order]
+        self.first_ts = np.asarray(first_ts, dtype=np.int64)[order]
+        self.last_ts = np.asarray(last_ts, dtype=np.int64)[order]
+
+        self.out_degree = np.bincount(self.src, minlength=n)
+        self.in_degree = np.bincount(self.dst, minlength=n)
+
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(self.out_degree, out=self.indptr[1:])
+        self.indices = self.dst
+
+        self.redge = np.argsort(self.dst, kind='stable')
+        self.rindptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(self.in_degree, out=self.rindptr[1:])
+        self.rindices = self.src[self.redge]
+
+        self._index: Optional[Dict[str, int]] = None
+        self._nx: Optional[nx.DiGraph] = None
+
+    # ── Construction ──────────────────────────────────────────────────────────
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "TransactionGraph":
+        """
+        Aggregate raw transactions into edges without a pandas groupby.
+
+        Account codes come from the loader's shared dictionary (sorted, so node
+        ints follow account-ID order), each (sender, receiver) pair becomes one
+        int64 key, and a single argsort plus ufunc.reduceat produces every
+        edge column.
+        """
+        n_rows = len(df)
+        snd, rcv, account_ids = account_codes(df)
+        n = len(account_ids)
+        key = snd.astype(np.int64) * n + rcv
+        order = np.argsort(key, kind='stable')
+        key = key[order]
+        if n_rows == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return cls(np.asarray(account_ids, dtype=object), empty, empty, empty, empty, empty, empty)
+
+        starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+        amount = df['amount'].to_numpy(np.float64)[order]
+        ts = _to_int64_ns(df['timestamp'])[order]
+        return cls(
+            np.asarray(account_ids, dtype=object),
+            key[starts] // n,
+            key[starts] % n,
+            np.add.reduceat(amount, starts),
+            np.diff(np.r_[starts, n_rows]),
+            np.minimum.reduceat(ts, starts),
+            np.maximum.reduceat(ts, starts),
         )
-        .reset_index()
-    )
-
-    grouped['duration_days'] = (
-        (grouped['last_txn'] - grouped['first_txn'])
-        .dt.total_seconds() / 86_400
-    ).clip(lower=0)
-
-    for _, row in grouped.iterrows():
-        G.add_edge(
-            row['sender_id'],
-            row['receiver_id'],
-            amount       = float(row['amount']),
-            txn_count    = int(row['txn_count']),
-            avg_amount   = float(row['avg_amount']),
-            first_txn    = row['first_txn'],
-            last_txn     = row['last_txn'],
-            duration_days= float(row['duration_days']),
+
+    @classmethod
+    def from_networkx(cls, G: nx.DiGraph) -> "TransactionGraph":
+        account_ids = np.array(list(G.nodes()), dtype=object)
+        index = {n: i for i, n in enumerate(account_ids)}
+        rows = [
+            (index[u], index[v], d.get('amount', 0), d.get('txn_count', 1),
+             pd.Timestamp(d.get('first_txn', 0)).value, pd.Timestamp(d.get('last_txn', 0)).value)
+            for u, v, d in G.edges(data=True)
+        ]
+        cols = list(zip(*rows)) if rows else [[]] * 6
+        tg = cls(account_ids, *(np.array(c) for c in cols))
+        tg._nx = G
+        return tg
+
+    # ── Lookups ───────────────────────────────────────────────────────────────
+    @property
+    def index(self) -> Dict[str, int]:
+        """Account ID → node int (built on first use)."""
+        if self._index is None:
+            self._index = {a: i for i, a in enumerate(self.account_ids)}
+        return self._index
+
+    def number_of_nodes(self) -> int:
+        return len(self.account_ids)
+
+    def number_of_edges(self) -> int:
+        return len(self.src)
+
+    def successors(self, i: int) -> np.ndarray:
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def predecessors(self, i: int) -> np.ndarray:
+        return self.rindices[self.rindptr[i]:self.rindptr[i + 1]]
+
+    def edge_id(self, u: int, v: int) -> int:
+        """Edge id of u→v, or -1 if absent."""
+        lo, hi = self.indptr[u], self.indptr[u + 1]
+        pos = lo + np.searchsorted(self.indices[lo:hi], v)
+        return int(pos) if pos < hi and self.indices[pos] == v else -1
+
+    @property
+    def avg_amount(self) -> np.ndarray:
+        return self.amount / np.maximum(self.txn_count, 1)
+
+    @property
+    def duration_days(self) -> np.ndarray:
+        return np.clip((self.last_ts - self.first_ts) / _NS_PER_DAY, 0, None)
+
+    # ── Compatibility ─────────────────────────────────────────────────────────
+    def to_networkx(self) -> nx.DiGraph:
+        """networkx view with the legacy edge attributes; cached after first call."""
+        if self._nx is not None:
+            return self._nx
+        G = nx.DiGraph()
+        G.add_nodes_from(self.account_ids.tolist())
+        ids = self.account_ids
+        first = pd.to_datetime(self.first_ts).tolist()
+        last = pd.to_datetime(self.last_ts).tolist()
+        G.add_edges_from(
+            (ids[u], ids[v], {
+                'amount':        amt,
+                'txn_count':     cnt,
+                'avg_amount':    avg,
+                'first_txn':     f,
+                'last_txn':      l,
+                'duration_days': dur,
+            })
+            for u, v, amt, cnt, avg, f, l, dur in zip(
+                self.src.tolist(), self.dst.tolist(), self.amount.tolist(),
+                self.txn_count.tolist(), self.avg_amount.tolist(), first, last,
+                self.duration_days.tolist(),
+            )
         )
+        self._nx = G
+        return G
+
 
-    print(f"✅ Graph: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges "
-          f"(from {len(df)} raw transactions)")
-    return G
\ No newline at end of file
+def build_transaction_graph(df: pd.DataFrame) -> nx.DiGraph:
+    G = TransactionGraph.from_dataframe(df).to_networkx()
+    logger.info(f"✅ Graph: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges "
+                f"(from {len(df)} raw transactions)")
+    return G
@@ -0,0 +1,179 @@
+"""
+Graph Stats - network_stats straight from TransactionGraph arrays.
+
+Every statistic is computed on first access and cached, so callers only pay
+for the numbers they read. The pipeline reports the O(E) counts only; average
+clustering is computed on request from a stored result's graph_data (the
+API's /network-stats endpoint). Clustering uses an undirected simple CSR built from
+the edge arrays (no networkx copy) and is either exact, via one sparse
+product, or sampled: each sample picks a node uniformly and one random pair of
+its neighbours and checks whether they are linked. The hit rate is an
+unbiased estimate of nx.average_clustering (zero-degree nodes included), and
+by Hoeffding's inequality ln(2/δ) / (2ε²) samples keep it within ε of the
+exact value with confidence 1 - δ, whatever the hub degrees.
+"""
+
+import math
+from functools import cached_property
+from typing import Any, Dict, Optional
+
+import networkx as nx
+import numpy as np
+
+from .graph_builder import TransactionGraph
+
+try:
+    import scipy.sparse as sp
+    from scipy.sparse import csgraph
+except ImportError:  # exact clustering degrades to sampling
+    sp = None
+
+
+def weak_component_labels(tg: TransactionGraph) -> np.ndarray:
+    """Weakly connected component label of every node."""
+    n = tg.number_of_nodes()
+    if sp is not None:
+        A = sp.csr_matrix((np.ones(len(tg.src), dtype=np.int8), (tg.src, tg.dst)), shape=(n, n))
+        return csgraph.connected_components(A, directed=True, connection='weak')[1]
+    H = nx.Graph()
+    H.add_nodes_from(range(n))
+    H.add_edges_from(zip(tg.src.tolist(), tg.dst.tolist()))
+    labels = np.empty(n, dtype=np.int64)
+    for label, comp in enumerate(nx.connected_components(H)):
+        labels[list(comp)] = label
+    return labels
+
+
+def hoeffding_samples(epsilon: float, confidence: float) -> int:
+    """Samples for a mean of [0, 1] draws to be within epsilon with this confidence."""
+    return math.ceil(math.log(2 / (1 - confidence)) / (2 * epsilon ** 2))
+
+
+class NetworkStats:
+    def __init__(self, tg: TransactionGraph):
+        self.tg = tg
+        self.n = tg.number_of_nodes()
+
+    @classmethod
+    def from_graph_data(cls, graph_data: Dict[str, Any]) -> "NetworkStats":
+        """Stats for a stored result's graph_data (nodes and aggregated links)."""
+        ids = [node['id'] for node in graph_data.get('nodes', [])]
+        index = {a: i for i, a in enumerate(ids)}
+        links = [l for l in graph_data.get('links', [])
+                 if l['source'] in index and l['target'] in index]
+        src = np.fromiter((index[l['source']] for l in links), np.int64, len(links))
+        dst = np.fromiter((index[l['target']] for l in links), np.int64, len(links))
+        amount = np.fromiter((l.get('amount', 0) for l in links), np.float64, len(links))
+        count = np.fromiter((l.get('txn_count', 1) for l in links), np.int64, len(links))
+        no_ts = np.zeros(len(links), dtype=np.int64)
+        return cls(TransactionGraph(np.array(ids, dtype=object), src, dst, amount, count, no_ts, no_ts))
+
+    # ── Cheap counts ──────────────────────────────────────────────────────────
+    @cached_property
+    def density(self) -> float:
+        n = self.n
+        return self.tg.number_of_edges() / (n * (n - 1)) if n > 1 else 0.0
+
+    @cached_property
+    def num_components(self) -> int:
+        return int(weak_component_labels(self.tg).max() + 1) if self.n else 0
+
+    @cached_property
+    def avg_degree(self) -> float:
+        """Mean in-degree, which equals the mean out-degree."""
+        return self.tg.number_of_edges() / max(self.n, 1)
+
+    # ── Undirected simple graph (for clustering) ──────────────────────────────
+    @cached_property
+    def _undirected(self):
+        """(indptr, indices, sorted u<v edge keys) without self-loops or duplicates."""
+        tg, n = self.tg, self.n
+        lo, hi = np.minimum(tg.src, tg.dst), np.maximum(tg.src, tg.dst)
+        keys = np.unique((lo * n + hi)[lo != hi])
+        u, v = keys // n, keys % n
+        src, dst = np.r_[u, v], np.r_[v, u]
+        order = np.lexsort((dst, src))
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+        return indptr, dst[order], keys
+
+    @cached_property
+    def wedges(self) -> int:
+        """Neighbour pairs summed over nodes: the work an exact clustering pass does."""
+        d = np.diff(self._undirected[0])
+        return int((d * (d - 1) // 2).sum())
+
+    def _linked(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        keys = self._undirected[2]
+        if len(keys) == 0:
+            return np.zeros(len(a), dtype=bool)
+        q = np.minimum(a, b) * self.n + np.maximum(a, b)
+        pos = np.minimum(np.searchsorted(keys, q), len(keys) - 1)
+        return keys[pos] == q
+
+    # ── Clustering ────────────────────────────────────────────────────────────
+    def exact_clustering(self) -> float:
+        """nx.average_clustering of the undirected graph, via (U @ U) ∘ U (needs scipy)."""
+        if self.n == 0:
+            return 0.0
+        indptr, indices, _ = self._undirected
+        U = sp.csr_matrix((np.ones(len(indices), dtype=np.int64), indices, indptr),
+                          shape=(self.n, self.n))
+        triangles = np.asarray((U @ U).multiply(U).sum(axis=1)).ravel() / 2
+        d = np.diff(indptr)
+        local = np.divide(2 * triangles, d * (d - 1), out=np.zeros(self.n), where=d > 1)
+        return float(local.mean())
+
+    def sampled_clustering(self, epsilon: float, confidence: float, seed: int = 0) -> float:
+        """Average clustering within ±epsilon of exact with probability `confidence`."""
+        if self.n == 0:
+            return 0.0
+        indptr, indices, _ = self._undirected
+        rng = np.random.default_rng(seed)
+        k = hoeffding_samples(epsilon, confidence)
+        nodes = rng.integers(0, self.n, k)
+        d = np.diff(indptr)[nodes]
+        ok = d > 1
+        nodes, d = nodes[ok], d[ok]
+        i = (rng.random(len(d)) * d).astype(np.int64)
+        j = (rng.random(len(d)) * (d - 1)).astype(np.int64)
+        j += j >= i
+        a, b = indices[indptr[nodes] + i], indices[indptr[nodes] + j]
+        return float(self._linked(a, b).sum() / k)
+
+    def as_dict(
+        self,
+        clustering: Optional[str] = "auto",
+        exact_max_wedges: int = 5_000_000,
+        epsilon: float = 0.01,
+        confidence: float = 0.95,
+    ) -> Dict[str, Any]:
+        """
+        The network_stats payload.
+
+        clustering: "exact", "sampled", "auto" (exact up to exact_max_wedges
+        neighbour pairs, sampled beyond) or None to leave avg_clustering out.
+        """
+        stats: Dict[str, Any] = {
+            'density':        self.density,
+            'num_components': self.num_components,
+            'avg_in_degree':  self.avg_degree,
+            'avg_out_degree': self.avg_degree,
+        }
+        if clustering is None or clustering == "off":
+            return stats
+        if clustering not in ("auto", "exact", "sampled"):
+            raise ValueError(f"Unknown clustering mode '{clustering}'")
+        if clustering == "auto":
+            clustering = "exact" if self.wedges <= exact_max_wedges else "sampled"
+        if sp is None:
+            clustering = "sampled"
+        if clustering == "exact":
+            stats['avg_clustering'] = self.exact_clustering()
+            stats['avg_clustering_method'] = 'exact'
+        else:
+            stats['avg_clustering'] = self.sampled_clustering(epsilon, confidence)
+            stats['avg_clustering_method'] = 'sampled'
+            stats['avg_clustering_error'] = epsilon
+            stats['avg_clustering_confidence'] = confidence
+        return stats
@@ -0,0 +1,54 @@
+"""
+Logging - One configured logger tree for the engine and the API.
+
+Progress lines keep their console look (message only, stdout) but go through
+`logging`, so LOG_LEVEL filters them and LOG_FILE receives a timestamped
+copy. Configuration happens once, on the first get_logger() call.
+"""
+
+import logging
+import os
+import sys
+import threading
+
+from config import LOG_FILE, LOG_LEVEL
+
+_ROOT = "nexa"
+_configured = False
+_lock = threading.Lock()
+
+
+def _configure() -> None:
+    global _configured
+    with _lock:
+        if _configured:
+            return
+        _configured = True
+        root = logging.getLogger(_ROOT)
+        root.setLevel(getattr(logging, str(LOG_LEVEL).upper(), logging.INFO))
+        root.propagate = False
+
+        console = logging.StreamHandler(sys.stdout)
+        console.setFormatter(logging.Formatter("%(message)s"))
+        root.addHandler(console)
+
+        if LOG_FILE:
+            path = LOG_FILE if os.path.isabs(LOG_FILE) else os.path.join(
+                os.path.dirname(os.path.dirname(os.path.abspath(__file__))), LOG_FILE
+            )
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                handler = logging.FileHandler(path, encoding="utf-8")
+            except OSError as e:
+                root.warning(f"⚠️  Log file disabled ({path}): {e}")
+            else:
+                handler.setFormatter(logging.Formatter(
+                    "%(asctime)s %(levelname)s [%(process)d] %(name)s: %(message)s"
+                ))
+                root.addHandler(handler)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger under the configured 'nexa' tree (e.g. get_logger(__name__))."""
+    _configure()
+    return logging.getLogger(f"{_ROOT}.{name}")
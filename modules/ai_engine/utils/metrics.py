@@ -0,0 +1,201 @@
+"""
+Metrics - Minimal Prometheus-style registry (counters, gauges, histograms).
+
+The engine records into the process-wide REGISTRY. Analyses usually run in
+worker processes, so a worker hands its samples back with drain() and the
+API process merge()s them; render() produces the text exposition format
+served at /api/metrics.
+"""
+
+import bisect
+import math
+import sys
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows: no RSS high-water mark
+    resource = None
+
+LabelValues = Tuple[str, ...]
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+SIZE_BUCKETS = tuple(10.0 ** k for k in range(2, 9))                 # 100 … 100M
+BYTES_BUCKETS = tuple(float(2 ** k) for k in range(20, 36, 2))       # 1 MiB … 16 GiB
+
+
+def max_rss_bytes() -> float:
+    """This process's peak resident set size so far (0 where unavailable)."""
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return float(peak if sys.platform == "darwin" else peak * 1024)
+
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values: Dict[LabelValues, object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(n, "")) for n in self.label_names)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def merge(self, values: Dict[LabelValues, float]) -> None:
+        with self._lock:
+            for key, v in values.items():
+                self._values[key] = self._values.get(key, 0.0) + v
+
+    def lines(self) -> List[str]:
+        return [f"{self.name}{_labels(self.label_names, k)} {_fmt(v)}"
+                for k, v in sorted(self._values.items())]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (),
+                 collect: Optional[Callable[[], float]] = None):
+        super().__init__(name, help, labels)
+        self.collect = collect          # read at render time (unlabelled gauges)
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def merge(self, values: Dict[LabelValues, float]) -> None:
+        with self._lock:
+            self._values.update(values)
+
+    def lines(self) -> List[str]:
+        if self.collect is not None:
+            self._values[()] = float(self.collect())
+        return [f"{self.name}{_labels(self.label_names, k)} {_fmt(v)}"
+                for k, v in sorted(self._values.items())]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DURATION_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    def merge(self, values: Dict[LabelValues, Tuple[List[int], float]]) -> None:
+        with self._lock:
+            for key, (counts, total) in values.items():
+                cur, cur_total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+                self._values[key] = ([a + b for a, b in zip(cur, counts)], cur_total + total)
+
+    def lines(self) -> List[str]:
+        out = []
+        for key, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, c in zip(self.buckets + (math.inf,), counts):
+                cumulative += c
+                le = f'le="{_fmt(bound)}"'
+                out.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}")
+            out.append(f"{self.name}_sum{_labels(self.label_names, key)} {_fmt(total)}")
+            out.append(f"{self.name}_count{_labels(self.label_names, key)} {cumulative}")
+        return out
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, help, labels)
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = (),
+              collect: Optional[Callable[[], float]] = None) -> Gauge:
+        return self._register(Gauge, name, help, labels, collect=collect)
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DURATION_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, help, labels, buckets=buckets)
+
+    def drain(self) -> Dict[str, Tuple[str, str, tuple, tuple, dict]]:
+        """Take (and reset) every recorded sample, for merge() in another process."""
+        out = {}
+        with self._lock:
+            for name, m in self._metrics.items():
+                with m._lock:
+                    values, m._values = m._values, {}
+                if values:
+                    buckets = getattr(m, "buckets", ())
+                    out[name] = (m.kind, m.help, m.label_names, buckets, values)
+        return out
+
+    def merge(self, drained: Dict[str, Tuple[str, str, tuple, tuple, dict]]) -> None:
+        for name, (kind, help, labels, buckets, values) in drained.items():
+            if kind == "counter":
+                metric = self.counter(name, help, labels)
+            elif kind == "gauge":
+                metric = self.gauge(name, help, labels)
+            else:
+                metric = self.histogram(name, help, labels, buckets)
+            metric.merge(values)
+
+    def render(self) -> str:
+        """Text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines: List[str] = []
+        for m in metrics:
+            with m._lock:
+                body = m.lines()
+            if body or isinstance(m, Gauge):
+                lines += m.header() + body
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
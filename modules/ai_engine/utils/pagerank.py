@@ -0,0 +1,73 @@
+"""
+PageRank - Sparse power iteration over TransactionGraph edge arrays.
+
+Same iteration as nx.pagerank (unweighted edges, dangling mass spread
+uniformly, stop once the L1 change drops below N·tol), but each step is one
+np.bincount over the edge list instead of building a networkx/scipy matrix.
+A warm-start vector (the previous ranking of a slightly grown graph) usually
+converges in a fraction of the cold-start iterations.
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from config import PAGERANK_ALPHA, PAGERANK_TOL, PAGERANK_MAX_ITER
+from .graph_builder import TransactionGraph
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+
+def pagerank_vector(
+    n: int,
+    src: np.ndarray,
+    dst: np.ndarray,
+    alpha: float = PAGERANK_ALPHA,
+    tol: float = PAGERANK_TOL,
+    max_iter: int = PAGERANK_MAX_ITER,
+    x0: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, int]:
+    """
+    PageRank of nodes 0..n-1 over edges src→dst, and the iterations it took.
+
+    x0: starting vector (any non-negative scale; nodes it does not cover
+    start at 0). Without it iteration starts from the uniform vector.
+    """
+    if n == 0:
+        return np.empty(0), 0
+    out_deg = np.bincount(src, minlength=n).astype(np.float64)
+    dangling = out_deg == 0
+    share = np.divide(1.0, out_deg, out=np.zeros(n), where=~dangling)[src]
+
+    if x0 is None or not np.any(x0):
+        x = np.full(n, 1.0 / n)
+    else:
+        x = np.zeros(n)
+        x[:len(x0)] = x0[:n]
+        x /= x.sum()
+
+    teleport = (1 - alpha) / n
+    for it in range(1, max_iter + 1):
+        last = x
+        spread = np.bincount(dst, weights=last[src] * share, minlength=n)
+        x = alpha * (spread + last[dangling].sum() / n) + teleport
+        if np.abs(x - last).sum() < n * tol:
+            return x, it
+    logger.warning(f"⚠️  PageRank did not converge to tol={tol} in {max_iter} iterations")
+    return x, max_iter
+
+
+def pagerank(
+    tg: TransactionGraph,
+    alpha: float = PAGERANK_ALPHA,
+    tol: float = PAGERANK_TOL,
+    max_iter: int = PAGERANK_MAX_ITER,
+    nstart: Optional[Dict[str, float]] = None,
+) -> Dict[str, float]:
+    """Account ID → PageRank; nstart: previous scores to warm-start from."""
+    x0 = None
+    if nstart:
+        x0 = np.array([nstart.get(a, 0.0) for a in tg.account_ids.tolist()])
+    x, _ = pagerank_vector(tg.number_of_nodes(), tg.src, tg.dst, alpha, tol, max_iter, x0)
+    return dict(zip(tg.account_ids.tolist(), x.tolist()))
@@ -0,0 +1,323 @@
+"""
+Streaming Ingestion - Out-of-core CSV → TransactionGraph for files beyond RAM.
+
+The CSV is read in fixed-size chunks. Each chunk is cleaned exactly like
+load_transactions, its account IDs are interned into a growing dictionary,
+and its rows are reduced to per-edge partial aggregates (sum, count, min/max
+timestamp) that are merged into the running, key-sorted edge table without
+re-sorting it. Per-account activity
+follows from the edge table (see profiles_from_graph), so raw rows are never
+held beyond one chunk.
+
+The only row-level data temporal smurfing needs, (account, counterparty,
+timestamp) occurrences, is appended to on-disk hash buckets by account, so
+detection later loads one account-disjoint bucket at a time. Once the edge
+table is complete, each bucket is rewritten once: rows of accounts that can
+never be smurfs (fewer than `min_occurrences` occurrences, or active longer
+than `max_span_days`) are dropped and the rest are sorted by (account,
+counterparty, time). Peak memory is proportional to distinct edges and
+accounts plus one chunk or one bucket; no networkx graph is built.
+"""
+
+import os
+import shutil
+import tempfile
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .account_profiles import profiles_from_graph
+from .csv_loader import InvalidCSVError, clean_frame, read_options, resolve_columns
+from .graph_builder import TransactionGraph
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+_INT64_MAX = np.iinfo(np.int64).max
+
+
+def _reduce_edges(key, amount, count, first, last):
+    """Merge rows sharing a (src, dst) key; stable, so sums keep input order."""
+    order = np.argsort(key, kind='stable')
+    key = key[order]
+    starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+    return (
+        key[starts],
+        np.add.reduceat(amount[order], starts),
+        np.add.reduceat(count[order], starts),
+        np.minimum.reduceat(first[order], starts),
+        np.maximum.reduceat(last[order], starts),
+    )
+
+
+def _merge_edges(table, part):
+    """
+    Fold one chunk's reduced edges into the running table. Both are sorted by
+    key with unique keys, so known edges are updated in place and new ones
+    inserted at their searchsorted positions: O(E + chunk), no re-sort.
+    """
+    key, amount, count, first, last = table
+    p_key, p_amount, p_count, p_first, p_last = part
+    pos = np.searchsorted(key, p_key)
+    hit = pos < len(key)
+    hit[hit] = key[pos[hit]] == p_key[hit]
+    at = pos[hit]
+    amount[at] += p_amount[hit]
+    count[at] += p_count[hit]
+    first[at] = np.minimum(first[at], p_first[hit])
+    last[at] = np.maximum(last[at], p_last[hit])
+    miss = ~hit
+    return tuple(np.insert(cur, pos[miss], new_[miss])
+                 for cur, new_ in zip((key, amount, count, first, last), part))
+
+
+def _earliest(ts, row, codes, n):
+    """Per code: (ts, row) of its earliest occurrence, INT64_MAX where absent."""
+    best_ts = np.full(n, _INT64_MAX, dtype=np.int64)
+    best_row = np.full(n, _INT64_MAX, dtype=np.int64)
+    order = np.lexsort((row, ts))
+    uniq, first = np.unique(codes[order], return_index=True)
+    best_ts[uniq] = ts[order][first]
+    best_row[uniq] = row[order][first]
+    return best_ts, best_row
+
+
+def _take_earlier(cur_ts, cur_row, new_ts, new_row):
+    better = (new_ts < cur_ts) | ((new_ts == cur_ts) & (new_row < cur_row))
+    return np.where(better, new_ts, cur_ts), np.where(better, new_row, cur_row)
+
+
+class StreamedTransactions:
+    """
+    Result of stream_transactions(): the aggregated graph and account profiles,
+    plus the spilled occurrence buckets for temporal analysis.
+
+    Also acts as an occurrence source for FanDetector.detect_temporal_smurfing
+    (accounts, appearance, ts_unit, occurrence_batches()). Call close() (or use
+    it as a context manager) to delete the spill directory.
+    """
+
+    def __init__(self, tg, profiles, n_rows, total_amount, rank, appearance, ts_unit,
+                 spill_dir, n_buckets):
+        self.tg = tg
+        self.profiles = profiles
+        self.n_rows = n_rows
+        self.total_amount = total_amount
+        self.accounts = tg.account_ids
+        self.appearance = appearance
+        self.ts_unit = ts_unit
+        self._rank = rank                 # interned code → node int (sorted ID order)
+        self._spill_dir = spill_dir
+        self._n_buckets = n_buckets
+
+    def __len__(self) -> int:
+        return self.n_rows
+
+    def occurrence_batches(self) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """(account, counterparty, ts_ns) arrays sorted in that order, one spill bucket at a time."""
+        for b in range(self._n_buckets):
+            path = os.path.join(self._spill_dir, f"bucket_{b:04d}.bin")
+            if not os.path.exists(path):
+                continue
+            rows = np.fromfile(path, dtype=np.int64).reshape(-1, 3)
+            yield self._rank[rows[:, 0]], self._rank[rows[:, 1]], rows[:, 2]
+
+    def close(self) -> None:
+        if self._spill_dir:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _compact_buckets(spill: str, n_buckets: int, keep: np.ndarray,
+                     rank: np.ndarray) -> Tuple[int, int]:
+    """
+    Rewrite each bucket with only the rows of `keep` accounts (by interned
+    code), sorted by (account, counterparty) node int, then time. Returns the
+    row counts before and after.
+    """
+    before = after = 0
+    for b in range(n_buckets):
+        path = os.path.join(spill, f"bucket_{b:04d}.bin")
+        if not os.path.exists(path):
+            continue
+        rows = np.fromfile(path, dtype=np.int64).reshape(-1, 3)
+        before += len(rows)
+        rows = rows[keep[rows[:, 0]]]
+        after += len(rows)
+        if len(rows) == 0:
+            os.remove(path)
+            continue
+        rows = rows[np.lexsort((rows[:, 2], rank[rows[:, 1]], rank[rows[:, 0]]))]
+        rows.tofile(path + ".tmp")
+        os.replace(path + ".tmp", path)
+    return before, after
+
+
+def stream_transactions(
+    csv_path: str,
+    chunk_rows: int = 1_000_000,
+    n_buckets: int = 64,
+    spill_dir: Optional[str] = None,
+    min_occurrences: int = 0,
+    max_span_days: Optional[float] = None,
+) -> StreamedTransactions:
+    """
+    Build the aggregated TransactionGraph from a CSV without loading it whole.
+
+    Produces the same edges, node order and account profiles as
+    TransactionGraph.from_dataframe(load_transactions(csv_path)); edge amount
+    sums may differ in the last floating-point bits because they are added
+    chunk by chunk.
+
+    min_occurrences / max_span_days: temporal smurfing's eligibility rules
+    (FAN_PATTERN_THRESHOLD, LEGIT_LONG_WINDOW_DAYS); occurrences of other
+    accounts are not kept. The defaults keep every occurrence.
+
+    Raises:
+        InvalidCSVError: If required columns are missing or no row is valid
+    """
+    try:
+        header = pd.read_csv(csv_path, nrows=0)
+    except Exception as e:
+        raise InvalidCSVError(f"Failed to read CSV file: {e}")
+    found = resolve_columns(header.columns)
+
+    spill = tempfile.mkdtemp(prefix="nexa-spill-", dir=spill_dir)
+    accounts = pd.Index([], dtype=object)
+    # Running edge table keyed by (src_code << 32) | dst_code
+    e_key = np.empty(0, np.int64)
+    e_amount = np.empty(0, np.float64)
+    e_count = np.empty(0, np.int64)
+    e_first = np.empty(0, np.int64)
+    e_last = np.empty(0, np.int64)
+    # Earliest (ts, row) per account as sender / receiver, for legacy ordering
+    s_ts = s_row = r_ts = r_row = np.empty(0, np.int64)
+    n_rows = n_read = n_dropped = n_chunks = 0
+    total_amount = 0.0
+    ts_unit = None
+
+    try:
+        reader = pd.read_csv(csv_path, chunksize=chunk_rows, **read_options(found))
+        for chunk in reader:
+            n_chunks += 1
+            n_read += len(chunk)
+            chunk, _, _, dropped = clean_frame(chunk, found)
+            n_dropped += dropped
+            if chunk.empty:
+                continue
+            if ts_unit is None:
+                ts_unit = chunk['timestamp'].to_numpy().dtype
+
+            # ── Intern account IDs ────────────────────────────────────────────
+            ids = pd.concat([chunk['sender_id'], chunk['receiver_id']], ignore_index=True)
+            codes = accounts.get_indexer(ids)
+            new = codes < 0
+            if new.any():
+                fresh = pd.unique(ids[new].to_numpy(object))
+                accounts = accounts.append(pd.Index(fresh, dtype=object))
+                codes[new] = accounts.get_indexer(ids[new])
+            n = len(chunk)
+            snd, rcv = codes[:n].astype(np.int64), codes[n:].astype(np.int64)
+            ts = chunk['timestamp'].to_numpy().astype('datetime64[ns]').astype(np.int64)
+            amount = chunk['amount'].to_numpy(np.float64)
+            row = np.arange(n_rows, n_rows + n, dtype=np.int64)
+
+            # ── Edge aggregates ───────────────────────────────────────────────
+            part = _reduce_edges(
+                (snd << 32) | rcv, amount, np.ones(n, np.int64), ts, ts
+            )
+            e_key, e_amount, e_count, e_first, e_last = _merge_edges(
+                (e_key, e_amount, e_count, e_first, e_last), part
+            )
+
+            # ── First appearance (as sender, as receiver) ─────────────────────
+            grow = len(accounts) - len(s_ts)
+            if grow:
+                pad = np.full(grow, _INT64_MAX, dtype=np.int64)
+                s_ts, s_row, r_ts, r_row = (np.concatenate([a, pad]) for a in (s_ts, s_row, r_ts, r_row))
+            s_ts, s_row = _take_earlier(s_ts, s_row, *_earliest(ts, row, snd, len(accounts)))
+            r_ts, r_row = _take_earlier(r_ts, r_row, *_earliest(ts, row, rcv, len(accounts)))
+
+            # ── Spill occurrences by account bucket ───────────────────────────
+            inbound = snd != rcv                  # a self-transfer counts once
+            occ = np.column_stack([
+                np.concatenate([snd, rcv[inbound]]),
+                np.concatenate([rcv, snd[inbound]]),
+                np.concatenate([ts, ts[inbound]]),
+            ])
+            bucket = occ[:, 0] % n_buckets
+            order = np.argsort(bucket, kind='stable')
+            occ, bucket = occ[order], bucket[order]
+            bounds = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1], True])
+            for lo, hi in zip(bounds[:-1], bounds[1:]):
+                with open(os.path.join(spill, f"bucket_{bucket[lo]:04d}.bin"), 'ab') as f:
+                    occ[lo:hi].tofile(f)
+
+            n_rows += n
+            total_amount += float(amount.sum())
+    except InvalidCSVError:
+        shutil.rmtree(spill, ignore_errors=True)
+        raise
+    except Exception as e:
+        shutil.rmtree(spill, ignore_errors=True)
+        raise InvalidCSVError(f"Failed to read CSV file: {e}")
+
+    if n_read == 0:
+        shutil.rmtree(spill, ignore_errors=True)
+        raise InvalidCSVError("CSV file is empty")
+    if n_rows == 0:
+        shutil.rmtree(spill, ignore_errors=True)
+        raise InvalidCSVError("No valid transactions after data cleansing")
+    if n_dropped > 0:
+        logger.warning(f"⚠️  Dropped {n_dropped} invalid rows from {n_read} total")
+
+    # Node ints follow sorted account-ID order, as in the in-memory path
+    ids = accounts.to_numpy(object)
+    sorted_codes = np.argsort(ids, kind='stable')
+    rank = np.empty(len(ids), dtype=np.int64)
+    rank[sorted_codes] = np.arange(len(ids))
+
+    tg = TransactionGraph(
+        ids[sorted_codes],
+        rank[e_key >> 32],
+        rank[e_key & 0xFFFFFFFF],
+        e_amount, e_count, e_first, e_last,
+    )
+    profiles = profiles_from_graph(tg)
+
+    # Occurrences per account: every send, plus every receipt that is not a self-transfer
+    inbound = tg.src != tg.dst
+    occurrences = (np.bincount(tg.src, weights=tg.txn_count, minlength=len(ids))
+                   + np.bincount(tg.dst[inbound], weights=tg.txn_count[inbound], minlength=len(ids)))
+    eligible = occurrences >= min_occurrences
+    if max_span_days is not None:
+        eligible &= profiles['span_days'].to_numpy() <= max_span_days
+    try:
+        before, after = _compact_buckets(spill, n_buckets, eligible[rank], rank)
+    except Exception:
+        shutil.rmtree(spill, ignore_errors=True)
+        raise
+
+    # Legacy appearance order: senders by first send, then receivers-only by first receipt
+    is_sender = s_row != _INT64_MAX
+    senders = np.flatnonzero(is_sender)
+    senders = senders[np.lexsort((s_row[senders], s_ts[senders]))]
+    receivers = np.flatnonzero(~is_sender)
+    receivers = receivers[np.lexsort((r_row[receivers], r_ts[receivers]))]
+    appearance = np.empty(len(ids), dtype=np.int64)
+    appearance[rank[np.concatenate([senders, receivers])]] = np.arange(len(ids))
+
+    logger.info(f"✅ Streamed {n_rows} valid transactions in {n_chunks} chunks")
+    logger.info(f"   Unique accounts: {len(ids)} | edges: {tg.number_of_edges()}")
+    logger.info(f"   Spilled occurrences kept: {after:,} of {before:,}")
+    logger.info(f"   Total volume: ${total_amount:,.2f}")
+    return StreamedTransactions(
+        tg, profiles, n_rows, total_amount, rank, appearance, ts_unit, spill, n_buckets
+    )
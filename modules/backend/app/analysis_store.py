@@ -0,0 +1,257 @@
+"""
+NEXA AI - Analysis store
+Finished analyses are kept in two tiers instead of a process-local dict:
+
+  - a hot tier in memory: least-recently-used, bounded by entry count, with
+    entries expiring after a TTL;
+  - a durable tier in SQLite: the compressed result document plus indexed
+    `accounts` and `rings` tables, shared by every uvicorn worker on the host.
+
+get() reads through the hot tier and promotes disk hits, so any worker can
+serve any analysis ID while memory stays bounded. The disk tier keeps the
+newest `max_analyses` results and deletes older ones.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def _scalar(obj: Any) -> Any:
+    # Results reach the store as the pipeline built them (numpy scalars included)
+    return obj.item() if hasattr(obj, 'item') else str(obj)
+
+
+class AnalysisStore(ABC):
+    """Interface shared by the store tiers."""
+
+    @abstractmethod
+    def get(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def put(self, analysis_id: str, result: Dict[str, Any], body: Optional[bytes] = None) -> None:
+        """Store a result; `body` is its JSON encoding when already known."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    def __contains__(self, analysis_id: str) -> bool:
+        return self.get(analysis_id) is not None
+
+
+class MemoryStore(AnalysisStore):
+    """LRU + TTL cache of result documents (the hot tier)."""
+
+    def __init__(self, max_entries: int = 32, ttl_seconds: Optional[float] = 900):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._items: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._items.get(analysis_id)
+            if item is None:
+                return None
+            stored_at, result = item
+            if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+                del self._items[analysis_id]
+                return None
+            self._items.move_to_end(analysis_id)
+            return result
+
+    def put(self, analysis_id: str, result: Dict[str, Any], body: Optional[bytes] = None) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._items[analysis_id] = (time.monotonic(), result)
+            self._items.move_to_end(analysis_id)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    analysis_id TEXT PRIMARY KEY,
+    created_at  REAL NOT NULL,
+    summary     TEXT NOT NULL,
+    document    BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS analyses_created ON analyses (created_at);
+
+CREATE TABLE IF NOT EXISTS accounts (
+    analysis_id       TEXT NOT NULL REFERENCES analyses ON DELETE CASCADE,
+    account_id        TEXT NOT NULL,
+    suspicion_score   REAL NOT NULL,
+    risk_level        TEXT,
+    ring_id           TEXT,
+    detected_patterns TEXT NOT NULL,
+    PRIMARY KEY (analysis_id, account_id)
+);
+CREATE INDEX IF NOT EXISTS accounts_account ON accounts (account_id);
+
+CREATE TABLE IF NOT EXISTS rings (
+    analysis_id     TEXT NOT NULL REFERENCES analyses ON DELETE CASCADE,
+    ring_id         TEXT NOT NULL,
+    pattern_type    TEXT,
+    risk_score      REAL NOT NULL,
+    member_accounts TEXT NOT NULL,
+    PRIMARY KEY (analysis_id, ring_id)
+);
+"""
+
+
+class SQLiteStore(AnalysisStore):
+    """
+    Durable tier. Result documents are stored zlib-compressed; suspicious
+    accounts and fraud rings are also written to their own tables so lookups
+    by account or ring never decode a whole document.
+    """
+
+    def __init__(self, path: str, max_analyses: int = 500):
+        self.path = path
+        self.max_analyses = max_analyses
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")      # readers in other workers never block
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(_SCHEMA)
+
+    def get(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT document FROM analyses WHERE analysis_id = ?", (analysis_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, analysis_id: str, result: Dict[str, Any], body: Optional[bytes] = None) -> None:
+        document = zlib.compress(body if body is not None else json.dumps(result, default=_scalar).encode(), 6)
+        accounts = [
+            (analysis_id, acc['account_id'], float(acc.get('suspicion_score', 0)),
+             acc.get('risk_level'), acc.get('ring_id'),
+             json.dumps(acc.get('detected_patterns', [])))
+            for acc in result.get('suspicious_accounts', [])
+        ]
+        rings = [
+            (analysis_id, ring['ring_id'], ring.get('pattern_type'),
+             float(ring.get('risk_score', 0)), json.dumps(ring.get('member_accounts', [])))
+            for ring in result.get('fraud_rings', [])
+        ]
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analyses VALUES (?, ?, ?, ?)",
+                (analysis_id, time.time(), json.dumps(result.get('summary', {}), default=_scalar), document),
+            )
+            self._conn.executemany("INSERT OR REPLACE INTO accounts VALUES (?, ?, ?, ?, ?, ?)", accounts)
+            self._conn.executemany("INSERT OR REPLACE INTO rings VALUES (?, ?, ?, ?, ?)", rings)
+            self._prune()
+
+    def _prune(self) -> None:
+        # Called inside put()'s transaction; cascades to accounts and rings
+        self._conn.execute(
+            "DELETE FROM analyses WHERE analysis_id IN ("
+            " SELECT analysis_id FROM analyses ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_analyses,),
+        )
+
+    def __contains__(self, analysis_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM analyses WHERE analysis_id = ?", (analysis_id,)
+            ).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+
+    def find_account(self, account_id: str) -> List[Dict[str, Any]]:
+        """Every stored analysis that flagged `account_id`, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT a.analysis_id, n.created_at, a.suspicion_score, a.risk_level,"
+                "       a.ring_id, a.detected_patterns"
+                " FROM accounts a JOIN analyses n USING (analysis_id)"
+                " WHERE a.account_id = ? ORDER BY n.created_at DESC",
+                (account_id,),
+            ).fetchall()
+        return [
+            {
+                'analysis_id':       analysis_id,
+                'created_at':        created_at,
+                'suspicion_score':   score,
+                'risk_level':        risk_level,
+                'ring_id':           ring_id,
+                'detected_patterns': json.loads(patterns),
+            }
+            for analysis_id, created_at, score, risk_level, ring_id, patterns in rows
+        ]
+
+    def get_ring(self, analysis_id: str, ring_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT pattern_type, risk_score, member_accounts FROM rings"
+                " WHERE analysis_id = ? AND ring_id = ?",
+                (analysis_id, ring_id),
+            ).fetchone()
+        if row is None:
+            return None
+        pattern_type, risk_score, members = row
+        return {
+            'ring_id':         ring_id,
+            'member_accounts': json.loads(members),
+            'pattern_type':    pattern_type,
+            'risk_score':      risk_score,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class TieredAnalysisStore(AnalysisStore):
+    """Hot MemoryStore in front of a durable SQLiteStore."""
+
+    def __init__(self, memory: MemoryStore, disk: SQLiteStore):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        result = self.memory.get(analysis_id)
+        if result is None:
+            result = self.disk.get(analysis_id)
+            if result is not None:
+                self.memory.put(analysis_id, result)
+        return result
+
+    def put(self, analysis_id: str, result: Dict[str, Any], body: Optional[bytes] = None) -> None:
+        self.disk.put(analysis_id, result, body)
+        self.memory.put(analysis_id, result)
+
+    def __contains__(self, analysis_id: str) -> bool:
+        return self.memory.get(analysis_id) is not None or analysis_id in self.disk
+
+    def __len__(self) -> int:
+        return len(self.disk)
+
+    def find_account(self, account_id: str) -> List[Dict[str, Any]]:
+        return self.disk.find_account(account_id)
+
+    def get_ring(self, analysis_id: str, ring_id: str) -> Optional[Dict[str, Any]]:
+        return self.disk.get_ring(analysis_id, ring_id)
+
+    def close(self) -> None:
+        self.disk.close()
@@ -0,0 +1,204 @@
+"""
+NEXA AI - Analysis job runner
+Detection is CPU-bound, so it runs in a bounded process pool instead of on
+the uvicorn event loop; /api/health and status polling keep answering while
+analyses execute, and concurrent uploads use every core. Each worker gets an
+equal share of the CPU budget (utils.cpu) for the stage and cycle-search pools
+of its analysis, so a full pool does not oversubscribe the machine.
+
+Admission control: at most `queue_depth` analyses may be queued or running.
+Beyond that, submit() raises QueueFull and the API answers 429. A worker that
+dies outright (an OOM kill) breaks the whole pool: its jobs fail, and the next
+submit() replaces the pool instead of refusing work until restart.
+
+Workers return their engine metrics alongside each result; the parent merges
+them into its registry so /api/metrics covers every process. Finished jobs are
+finalized (encoded and stored) on a dedicated thread, so neither the event
+loop nor the pool's result-handling thread waits on a large result.
+"""
+
+import asyncio
+import io
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.cpu import cpu_budget, set_cpu_budget, share
+from utils.csv_loader import InvalidCSVError
+from utils.log import get_logger
+from utils.metrics import REGISTRY
+
+logger = get_logger('jobs')
+
+_JOBS = REGISTRY.counter('nexa_jobs_total', 'Finished analysis jobs by status', ('status',))
+_REJECTED = REGISTRY.counter('nexa_jobs_rejected_total', 'Submissions refused with QueueFull')
+_JOB_SECONDS = REGISTRY.histogram('nexa_job_duration_seconds', 'Job time from submit to finish')
+
+
+# ── Worker-side entry points (must be importable top-level functions) ─────────
+
+def _init_worker(paths: List[str], cores: int) -> None:
+    for p in reversed(paths):
+        if p not in sys.path:
+            sys.path.insert(0, p)
+    set_cpu_budget(cores)
+
+
+def analyze_csv_path(csv_path: str) -> Tuple[Dict[str, Any], Dict]:
+    from ai_engine import run_detection_pipeline
+    return run_detection_pipeline(csv_path), REGISTRY.drain()
+
+
+def analyze_csv_bytes(contents: bytes) -> Tuple[Dict[str, Any], Dict]:
+    """Uploads are parsed once, straight from memory (no temp file)."""
+    from ai_engine import run_detection_pipeline
+    return run_detection_pipeline(io.BytesIO(contents)), REGISTRY.drain()
+
+
+# ── Parent side ───────────────────────────────────────────────────────────────
+
+class QueueFull(Exception):
+    """Raised when the analysis queue is at capacity."""
+
+
+class Job:
+    __slots__ = ('job_id', 'future', 'status', 'submitted_at', 'finished_at',
+                 'analysis_id', 'error', 'invalid_input', 'started')
+
+    def __init__(self, job_id: str, future: Future):
+        self.job_id = job_id
+        self.future = future
+        self.status = 'queued'
+        self.submitted_at = datetime.now().isoformat()
+        self.started = time.monotonic()
+        self.finished_at: Optional[str] = None
+        self.analysis_id: Optional[str] = None
+        self.error: Optional[str] = None
+        self.invalid_input = False          # loader rejected the CSV (InvalidCSVError)
+
+    def to_dict(self) -> Dict[str, Any]:
+        status = self.status
+        if status == 'queued' and self.future.running():
+            status = 'running'
+        return {
+            'job_id':       self.job_id,
+            'status':       status,
+            'submitted_at': self.submitted_at,
+            'finished_at':  self.finished_at,
+            'analysis_id':  self.analysis_id,
+            'error':        self.error,
+        }
+
+
+class JobManager:
+    """
+    Bounded process pool plus a registry of recent jobs.
+
+    Worker functions return (result, REGISTRY.drain()). finalize(result)
+    runs in the parent, on the single finalizer thread, once a job succeeds
+    (stores the result, returns its analysis_id). Finished job records beyond
+    `history` are forgotten oldest-first.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        queue_depth: int = 16,
+        history: int = 1_000,
+        worker_paths: Optional[List[str]] = None,
+    ):
+        self.workers = workers or cpu_budget()
+        self.queue_depth = queue_depth
+        self.history = history
+        self._worker_paths = list(worker_paths or [])
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._finalizer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='nexa-finalize')
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _pool(self) -> ProcessPoolExecutor:
+        # Created on first use so importing the app never forks
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self._worker_paths, share(self.workers)),
+            )
+        return self._executor
+
+    def _drop_pool(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def submit(self, fn: Callable, *args, finalize: Optional[Callable[[Dict], str]] = None,
+               track: bool = True) -> Job:
+        """Queue fn(*args); untracked jobs are left out of the job registry (get())."""
+        with self._lock:
+            if self._in_flight >= self.queue_depth:
+                _REJECTED.inc()
+                raise QueueFull(
+                    f"{self._in_flight} analyses in progress (limit {self.queue_depth})"
+                )
+            try:
+                future = self._pool().submit(fn, *args)
+            except BrokenProcessPool:
+                logger.warning("⚠️  Analysis pool broken by a dead worker; starting a new one")
+                self._drop_pool()
+                future = self._pool().submit(fn, *args)
+            # Counted only once the pool has accepted the job
+            self._in_flight += 1
+            job = Job(str(uuid.uuid4()), future)
+            if track:
+                self._jobs[job.job_id] = job
+        # Done callbacks run on the pool's result thread: hand off straight away
+        job.future.add_done_callback(
+            lambda fut: self._finalizer.submit(self._finish, job, fut, finalize))
+        return job
+
+    async def run(self, fn: Callable, *args) -> Dict[str, Any]:
+        """Submit and await the raw result without blocking the event loop."""
+        # The caller holds the result; nothing will look the job up later
+        job = self.submit(fn, *args, track=False)
+        result, _ = await asyncio.wrap_future(job.future)
+        return result
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def _finish(self, job: Job, fut: Future, finalize: Optional[Callable[[Dict], str]]) -> None:
+        try:
+            result, samples = fut.result()
+            REGISTRY.merge(samples)
+            if finalize is not None:
+                job.analysis_id = finalize(result)
+            job.status = 'done'
+        except Exception as exc:
+            job.status = 'failed'
+            job.error = str(exc)
+            job.invalid_input = isinstance(exc, InvalidCSVError)
+            logger.error(f"❌ Job {job.job_id} failed: {exc}")
+        job.finished_at = datetime.now().isoformat()
+        _JOBS.inc(status=job.status)
+        _JOB_SECONDS.observe(time.monotonic() - job.started)
+
+        with self._lock:
+            self._in_flight -= 1
+            finished = [j for j in self._jobs.values() if j.status in ('done', 'failed')]
+            for old in finished[:max(len(finished) - self.history, 0)]:
+                del self._jobs[old.job_id]
+
+    def shutdown(self) -> None:
+        self._drop_pool()
+        self._finalizer.shutdown(wait=True)
@@ -2,16 +2,15 @@
 NEXA AI - Backend API Server
 """
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import Depends, FastAPI, UploadFile, File, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-import pandas as pd
-import io
-import json
+from fastapi.responses import JSONResponse, PlainTextResponse
+import asyncio
 import os
 import sys
 import uuid
 from datetime import datetime
+from typing import Optional
 
 # ── Path setup ────────────────────────────────────────────────────────────────
 _backend_dir  = os.path.dirname(os.path.abspath(__file__))
@@ -27,18 +26,28 @@ for _p in [_ai_engine_dir, os.path.join(_project_root, '..', 'ai_engine')]:
 # Also add project root so 'modules.ai_engine' import works if needed
 if _project_root not in sys.path:
     sys.path.insert(0, _project_root)
+if _backend_dir not in sys.path:
+    sys.path.insert(0, _backend_dir)
 
-try:
-    from ai_engine import run_detection_pipeline
-    print("✅ Imported from ai_engine directly")
-except ImportError:
-    try:
-        from modules.ai_engine.ai_engine import run_detection_pipeline
-        print("✅ Imported from modules.ai_engine")
-    except ImportError as e:
-        print(f"❌ Import failed: {e}")
-        print(f"   sys.path: {sys.path}")
-        raise
+from utils.log import get_logger
+
+logger = get_logger('api')
+
+from config import (
+    ANALYSIS_WORKERS, ANALYSIS_QUEUE_DEPTH, JOB_HISTORY_LIMIT,
+    ANALYSIS_STORE_PATH, ANALYSIS_STORE_MAX_ANALYSES,
+    ANALYSIS_MEMORY_ENTRIES, ANALYSIS_MEMORY_TTL_SECONDS, RESPONSE_CACHE_MAX_BYTES,
+    NETWORK_STATS_CLUSTERING, NETWORK_STATS_EXACT_MAX_WEDGES,
+    NETWORK_STATS_CLUSTERING_EPSILON, NETWORK_STATS_CLUSTERING_CONFIDENCE,
+)
+from analysis_store import MemoryStore, SQLiteStore, TieredAnalysisStore
+from pagination import DEFAULT_PAGE_SIZE, IndexCache
+from network_view import GraphIndex
+from responses import ResponseCache, encode
+from jobs import JobManager, QueueFull, analyze_csv_bytes, analyze_csv_path
+from utils.csv_loader import InvalidCSVError
+from utils.graph_stats import NetworkStats
+from utils.metrics import REGISTRY
 
 # ── App ───────────────────────────────────────────────────────────────────────
 app = FastAPI(
@@ -54,7 +63,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-_analyses = {}
+_analyses = TieredAnalysisStore(
+    MemoryStore(ANALYSIS_MEMORY_ENTRIES, ANALYSIS_MEMORY_TTL_SECONDS),
+    SQLiteStore(ANALYSIS_STORE_PATH, ANALYSIS_STORE_MAX_ANALYSES),
+)
+_indexes = IndexCache(ANALYSIS_MEMORY_ENTRIES)
+_graphs = IndexCache(ANALYSIS_MEMORY_ENTRIES, factory=GraphIndex)
+_responses = ResponseCache(RESPONSE_CACHE_MAX_BYTES)
+_jobs = JobManager(ANALYSIS_WORKERS, ANALYSIS_QUEUE_DEPTH, JOB_HISTORY_LIMIT,
+                   worker_paths=list(sys.path))
+
+REGISTRY.gauge('nexa_jobs_in_flight', 'Analyses queued or running', collect=lambda: _jobs.in_flight)
+REGISTRY.gauge('nexa_job_queue_depth', 'Admission limit for queued or running analyses',
+               collect=lambda: _jobs.queue_depth)
+REGISTRY.gauge('nexa_job_workers', 'Analysis worker processes', collect=lambda: _jobs.workers)
+REGISTRY.gauge('nexa_stored_analyses', 'Analyses in the persistent store',
+               collect=lambda: len(_analyses))
+REGISTRY.gauge('nexa_response_cache_bytes', 'Bytes held by the encoded response cache',
+               collect=lambda: _responses.size)
 
 # ── Routes ────────────────────────────────────────────────────────────────────
 
@@ -69,96 +95,311 @@ async def health_check():
 
 
 @app.post("/api/analyze/upload")
-async def analyze_upload(file: UploadFile = File(...)):
+async def analyze_upload(request: Request, file: UploadFile = File(...)):
     try:
         contents = await file.read()
 
-        # Validate CSV
         try:
-            pd.read_csv(io.BytesIO(contents))
-        except Exception as exc:
+            result = await _jobs.run(analyze_csv_bytes, contents)
+        except QueueFull as exc:
+            raise _too_busy(exc)
+        except InvalidCSVError as exc:
             raise HTTPException(status_code=400, detail=f"Invalid CSV: {exc}")
 
-        # Write temp file
-        tmp_dir = os.path.join(_backend_dir, '_tmp')
-        os.makedirs(tmp_dir, exist_ok=True)
-        tmp_path = os.path.join(tmp_dir, f"{uuid.uuid4()}.csv")
-        with open(tmp_path, 'wb') as f:
-            f.write(contents)
+        # Encoding and storing a large result must not stall the event loop
+        analysis_id = await asyncio.to_thread(_finalize, result, adapt_scores=True)
+        return await _analysis_response(request, analysis_id)
 
-        try:
-            result = run_detection_pipeline(tmp_path)
-        finally:
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
+    except HTTPException:
+        raise
+    except Exception as exc:
+        import traceback
+        logger.error(f"❌ Analysis failed:\n{traceback.format_exc()}")
+        raise HTTPException(status_code=500, detail=f"Analysis failed: {exc}")
 
-        # Add metadata
-        analysis_id = str(uuid.uuid4())
-        result['analysis_id'] = analysis_id
-        result['timestamp']   = datetime.now().isoformat()
 
-        # Adapter: frontend risk_scores expects 'account' and 'total_score'
-        for s in result.get('risk_scores', []):
-            s.setdefault('account',      s.get('account_id'))
-            s.setdefault('total_score',  s.get('risk_score'))
-            s.setdefault('transactions', 0)
-            s.setdefault('volume',       0)
+@app.post("/api/analyze/sample")
+async def analyze_sample(request: Request):
+    sample_path = _sample_path()
+    try:
+        try:
+            result = await _jobs.run(analyze_csv_path, sample_path)
+        except QueueFull as exc:
+            raise _too_busy(exc)
+        except InvalidCSVError as exc:
+            raise HTTPException(status_code=400, detail=f"Invalid CSV: {exc}")
 
-        _analyses[analysis_id] = result
-        return JSONResponse(content=_safe_json(result))
+        analysis_id = await asyncio.to_thread(_finalize, result)
+        return await _analysis_response(request, analysis_id)
 
     except HTTPException:
         raise
     except Exception as exc:
         import traceback
-        print(f"❌ Analysis failed:\n{traceback.format_exc()}")
+        logger.error(f"❌ Analysis failed:\n{traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=f"Analysis failed: {exc}")
 
 
-@app.post("/api/analyze/sample")
-async def analyze_sample():
+# ── Jobs ──────────────────────────────────────────────────────────────────────
+
+@app.post("/api/jobs", status_code=202)
+async def submit_job(file: UploadFile = File(...)):
+    contents = await file.read()
+    try:
+        job = _jobs.submit(analyze_csv_bytes, contents,
+                           finalize=lambda r: _finalize(r, adapt_scores=True))
+    except QueueFull as exc:
+        raise _too_busy(exc)
+    return _job_payload(job)
+
+
+@app.post("/api/jobs/sample", status_code=202)
+async def submit_sample_job():
+    try:
+        job = _jobs.submit(analyze_csv_path, _sample_path(), finalize=_finalize)
+    except QueueFull as exc:
+        raise _too_busy(exc)
+    return _job_payload(job)
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = _jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_payload(job)
+
+
+@app.get("/api/jobs/{job_id}/result")
+async def get_job_result(request: Request, job_id: str):
+    job = _jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status == 'failed':
+        if job.invalid_input:
+            raise HTTPException(status_code=400, detail=f"Invalid CSV: {job.error}")
+        raise HTTPException(status_code=500, detail=f"Analysis failed: {job.error}")
+    if job.status != 'done':
+        return JSONResponse(status_code=202, content=_job_payload(job))
+    return await _analysis_response(request, job.analysis_id)
+
+
+# ── Analyses ──────────────────────────────────────────────────────────────────
+
+
+@app.get("/api/analysis/{analysis_id}")
+async def get_analysis(request: Request, analysis_id: str):
+    return await _analysis_response(request, analysis_id)
+
+
+@app.get("/api/analysis/{analysis_id}/network-data")
+async def get_network_data(
+    request: Request,
+    analysis_id: str,
+    view: str = 'full',
+    rings: Optional[str] = None,
+    hops: int = 1,
+    max_nodes: Optional[int] = None,
+    max_edges: Optional[int] = None,
+    seed: int = 0,
+):
+    """Whole graph by default; see network_view for subgraph and cap options."""
+    def build():
+        graph = _graphs.get(analysis_id, lambda: _get_analysis(analysis_id))
+        try:
+            return graph.view(
+                view, rings.split(',') if rings else None, hops, max_nodes, max_edges, seed,
+            )
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+
+    return await _cached(request, analysis_id, build)
+
+
+@app.get("/api/analysis/{analysis_id}/network-stats")
+async def get_network_stats(request: Request, analysis_id: str):
+    """network_stats plus avg_clustering, computed on first request and cached."""
+    def build():
+        result = _get_analysis(analysis_id)
+        # Exact up to NETWORK_STATS_EXACT_MAX_WEDGES, sampled beyond
+        stats = NetworkStats.from_graph_data(result.get('graph_data', {})).as_dict(
+            NETWORK_STATS_CLUSTERING, NETWORK_STATS_EXACT_MAX_WEDGES,
+            NETWORK_STATS_CLUSTERING_EPSILON, NETWORK_STATS_CLUSTERING_CONFIDENCE,
+        )
+        return {**result.get('network_stats', {}), **stats}
+
+    return await _cached(request, analysis_id, build)
+
+
+@app.get("/api/analysis/{analysis_id}/download")
+async def download_json(request: Request, analysis_id: str):
+    return await _cached(
+        request, analysis_id, lambda: _download_payload(_get_analysis(analysis_id)),
+        headers={
+            "Content-Disposition": f'attachment; filename="nexa_{analysis_id[:8]}.json"'
+        },
+    )
+
+
+def _page_query(
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    risk_level: Optional[str] = None,
+    pattern: Optional[str] = None,
+    ring: Optional[str] = None,
+    account: Optional[str] = None,
+):
+    return {
+        'limit': limit, 'cursor': cursor, 'sort': sort,
+        'filters': {'risk_level': risk_level, 'pattern': pattern, 'ring': ring, 'account': account},
+    }
+
+
+@app.get("/api/analysis/{analysis_id}/suspicious-accounts")
+async def list_suspicious_accounts(request: Request, analysis_id: str, query: dict = Depends(_page_query)):
+    return await _page(request, analysis_id, 'suspicious-accounts', query)
+
+
+@app.get("/api/analysis/{analysis_id}/fraud-rings")
+async def list_fraud_rings(request: Request, analysis_id: str, query: dict = Depends(_page_query)):
+    return await _page(request, analysis_id, 'fraud-rings', query)
+
+
+@app.get("/api/analysis/{analysis_id}/cycles")
+async def list_cycles(request: Request, analysis_id: str, query: dict = Depends(_page_query)):
+    return await _page(request, analysis_id, 'cycles', query)
+
+
+@app.get("/api/analysis/{analysis_id}/chains")
+async def list_chains(request: Request, analysis_id: str, query: dict = Depends(_page_query)):
+    return await _page(request, analysis_id, 'chains', query)
+
+
+@app.get("/api/analysis/{analysis_id}/rings/{ring_id}")
+async def get_ring(analysis_id: str, ring_id: str):
+    ring = _analyses.get_ring(analysis_id, ring_id)
+    if ring is None:
+        raise HTTPException(status_code=404, detail="Ring not found")
+    return ring
+
+
+@app.get("/api/accounts/{account_id}")
+async def get_account_history(account_id: str):
+    """Stored analyses that flagged this account, newest first."""
+    return {"account_id": account_id, "analyses": _analyses.find_account(account_id)}
+
+
+@app.get("/api/stats")
+async def get_stats():
+    return {
+        "total_analyses": len(_analyses),
+        "jobs_in_flight": _jobs.in_flight,
+        "queue_depth":    _jobs.queue_depth,
+        "version":        "1.0.0",
+    }
+
+
+@app.get("/api/metrics")
+async def get_metrics():
+    """Prometheus text exposition of engine, job and cache metrics."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.on_event("shutdown")
+async def _shutdown_pool():
+    _jobs.shutdown()
+    _analyses.close()
+
+
+# ── Helper ────────────────────────────────────────────────────────────────────
+
+def _sample_path():
     # Look for sample data in multiple locations
     candidates = [
         os.path.join(_ai_engine_dir,  'sample_data', 'transactions.csv'),
+        os.path.join(_project_root,   '..', 'ai_engine', 'sample_data', 'transactions.csv'),
         os.path.join(_backend_dir,    'sample_data', 'transactions.csv'),
         os.path.join(_project_root,   'sample_data', 'transactions.csv'),
     ]
     sample_path = next((p for p in candidates if os.path.exists(p)), None)
     if not sample_path:
         raise HTTPException(status_code=404, detail="Sample data not found")
+    return sample_path
+
 
-    result = run_detection_pipeline(sample_path)
+def _finalize(result, adapt_scores=False):
+    """Attach id/timestamp, store the result and return its analysis_id."""
     analysis_id = str(uuid.uuid4())
     result['analysis_id'] = analysis_id
     result['timestamp']   = datetime.now().isoformat()
-    _analyses[analysis_id] = result
-    return JSONResponse(content=_safe_json(result))
 
+    if adapt_scores:
+        # Adapter: frontend risk_scores expects 'account' and 'total_score'
+        for s in result.get('risk_scores', []):
+            s.setdefault('account',      s.get('account_id'))
+            s.setdefault('total_score',  s.get('risk_score'))
+            s.setdefault('transactions', 0)
+            s.setdefault('volume',       0)
+
+    # Encoded once: the /analysis body is the stored document minus graph_data,
+    # so the document is that body with graph_data spliced in, not re-encoded
+    payload = encode(_analysis_payload(result))
+    body = payload
+    if 'graph_data' in result:
+        body = payload[:-1] + b',"graph_data":' + encode(result['graph_data']) + b'}'
+    _analyses.put(analysis_id, result, body)
+    _responses.put(('analysis', analysis_id), payload)
+    return analysis_id
 
-@app.get("/api/analysis/{analysis_id}")
-async def get_analysis(analysis_id: str):
-    if analysis_id not in _analyses:
-        raise HTTPException(status_code=404, detail="Analysis not found")
-    return JSONResponse(content=_safe_json(_analyses[analysis_id]))
 
+def _analysis_payload(result):
+    """An analysis without its full graph_data; /network-data serves capped views."""
+    return {k: v for k, v in result.items() if k != 'graph_data'}
 
-@app.get("/api/analysis/{analysis_id}/network-data")
-async def get_network_data(analysis_id: str):
-    if analysis_id not in _analyses:
-        raise HTTPException(status_code=404, detail="Analysis not found")
-    return JSONResponse(content=_safe_json(
-        _analyses[analysis_id].get('graph_data', {})
-    ))
 
+async def _analysis_response(request, analysis_id):
+    return await _cached(request, analysis_id, lambda: _analysis_payload(_get_analysis(analysis_id)),
+                         key=('analysis', analysis_id))
 
-@app.get("/api/analysis/{analysis_id}/download")
-async def download_json(analysis_id: str):
-    if analysis_id not in _analyses:
+
+async def _cached(request, analysis_id, build, key=None, headers=None):
+    """
+    Serve a read of an (immutable) analysis from the encoded response cache.
+    Store lookups, build(), encoding and compression run on a worker thread.
+    """
+    if key is None:
+        key = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+
+    def serve():
+        if analysis_id not in _analyses:
+            raise HTTPException(status_code=404, detail="Analysis not found")
+        return _responses.respond(request, _responses.get_or_encode(key, build), headers)
+
+    return await asyncio.to_thread(serve)
+
+
+def _get_analysis(analysis_id):
+    result = _analyses.get(analysis_id)
+    if result is None:
         raise HTTPException(status_code=404, detail="Analysis not found")
+    return result
 
-    data = _analyses[analysis_id]
 
-    ps_output = {
+async def _page(request, analysis_id, resource, query):
+    def build():
+        index = _indexes.get(analysis_id, lambda: _get_analysis(analysis_id))
+        try:
+            return index.page(resource, **query)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+
+    return await _cached(request, analysis_id, build)
+
+
+def _download_payload(data):
+    """Submission-format subset of an analysis."""
+    return {
         'suspicious_accounts': [
             {
                 'account_id':       acc['account_id'],
@@ -185,24 +426,17 @@ async def download_json(analysis_id: str):
         },
     }
 
-    return JSONResponse(
-        content=_safe_json(ps_output),
-        headers={
-            "Content-Disposition": f'attachment; filename="nexa_{analysis_id[:8]}.json"'
-        },
-    )
-
-
-@app.get("/api/stats")
-async def get_stats():
-    return {"total_analyses": len(_analyses), "version": "1.0.0"}
 
+def _job_payload(job):
+    return {
+        **job.to_dict(),
+        'status_url': f"/api/jobs/{job.job_id}",
+        'result_url': f"/api/jobs/{job.job_id}/result",
+    }
 
-# ── Helper ────────────────────────────────────────────────────────────────────
 
-def _safe_json(obj):
-    """Serialize Timestamps, numpy types etc. to plain Python."""
-    return json.loads(json.dumps(obj, default=str))
+def _too_busy(exc):
+    return HTTPException(status_code=429, detail=str(exc), headers={"Retry-After": "5"})
 
 
 # ── Entry point ───────────────────────────────────────────────────────────────
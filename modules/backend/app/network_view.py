@@ -0,0 +1,154 @@
+"""
+NEXA AI - Network level-of-detail views
+Extracts the part of an analysis graph a client will actually draw, instead
+of shipping every node and aggregated edge:
+
+  - view=suspicious: flagged accounts and the links between them
+  - rings=RING_001,...&hops=k: ring members plus their k-hop neighbourhood
+    (edges followed in either direction)
+  - max_nodes / max_edges: caps applied by importance-weighted sampling
+    without replacement, so high-risk, well-connected accounts and large
+    suspicious flows are the ones kept
+
+Adjacency is built once per analysis (GraphIndex, cached like ResultIndex),
+so a request costs time proportional to the neighbourhood it returns.
+"""
+
+import heapq
+import math
+import random
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+MAX_HOPS = 3
+
+
+def _weighted_sample(candidates: Iterable[int], weight, k: int, rng: random.Random) -> List[int]:
+    """k items without replacement, P ∝ weight (Efraimidis-Spirakis keys)."""
+    return heapq.nlargest(
+        k, candidates, key=lambda i: rng.random() ** (1.0 / weight(i))
+    )
+
+
+class GraphIndex:
+    """Node positions, adjacency and importance weights for one analysis."""
+
+    def __init__(self, result: Dict[str, Any]):
+        graph = result.get('graph_data', {})
+        self.graph = graph
+        self.nodes: List[Dict[str, Any]] = graph.get('nodes', [])
+        self.links: List[Dict[str, Any]] = graph.get('links', [])
+        self.pos = {n['id']: i for i, n in enumerate(self.nodes)}
+
+        flagged = {a['account_id']: a for a in result.get('suspicious_accounts', [])}
+        self.score = [flagged[n['id']]['suspicion_score'] if n['id'] in flagged else 0.0
+                      for n in self.nodes]
+        self.patterns = [flagged[n['id']].get('detected_patterns', []) if n['id'] in flagged else []
+                         for n in self.nodes]
+        self.suspicious = [i for i, n in enumerate(self.nodes) if n.get('suspicious')]
+        self.ring_members = {
+            ring['ring_id']: [self.pos[a] for a in ring.get('member_accounts', []) if a in self.pos]
+            for ring in result.get('fraud_rings', [])
+        }
+
+        self.out_links: List[List[int]] = [[] for _ in self.nodes]
+        self.neighbours: List[Set[int]] = [set() for _ in self.nodes]
+        for j, link in enumerate(self.links):
+            s, t = self.pos.get(link['source']), self.pos.get(link['target'])
+            if s is None or t is None:
+                continue
+            self.out_links[s].append(j)
+            self.neighbours[s].add(t)
+            self.neighbours[t].add(s)
+
+    def node_weight(self, i: int) -> float:
+        n = self.nodes[i]
+        degree = n.get('in_degree', 0) + n.get('out_degree', 0)
+        return 1.0 + self.score[i] + (10.0 if n.get('ring_id') else 0.0) + 5.0 * math.log1p(degree)
+
+    def link_weight(self, j: int) -> float:
+        link = self.links[j]
+        return (1.0 + math.log1p(max(link.get('amount', 0), 0))) * (3.0 if link.get('suspicious') else 1.0)
+
+    def _khop(self, seeds: List[int], hops: int) -> List[int]:
+        seen = dict.fromkeys(seeds)
+        frontier = list(seen)
+        for _ in range(hops):
+            nxt = []
+            for i in frontier:
+                for k in self.neighbours[i]:
+                    if k not in seen:
+                        seen[k] = None
+                        nxt.append(k)
+            frontier = nxt
+        return list(seen)
+
+    def view(
+        self,
+        view: str = 'full',
+        rings: Optional[List[str]] = None,
+        hops: int = 1,
+        max_nodes: Optional[int] = None,
+        max_edges: Optional[int] = None,
+        seed: int = 0,
+    ) -> Dict[str, Any]:
+        """
+        Nodes and links for one level of detail.
+
+        Raises:
+            ValueError: On an unknown view or ring, or out-of-range hops/caps
+        """
+        if view not in ('full', 'suspicious'):
+            raise ValueError("view must be 'full' or 'suspicious'")
+        if not 0 <= hops <= MAX_HOPS:
+            raise ValueError(f"hops must be between 0 and {MAX_HOPS}")
+        if (max_nodes is not None and max_nodes < 1) or (max_edges is not None and max_edges < 0):
+            raise ValueError("max_nodes must be ≥ 1 and max_edges ≥ 0")
+        if view == 'full' and not rings and max_nodes is None and max_edges is None:
+            return self.graph
+
+        rng = random.Random(seed)
+        seeds: List[int] = []
+        if rings:
+            unknown = [r for r in rings if r not in self.ring_members]
+            if unknown:
+                raise ValueError(f"Unknown ring(s): {unknown}")
+            seeds = list(dict.fromkeys(i for r in rings for i in self.ring_members[r]))
+            candidates = self._khop(seeds, hops)
+        elif view == 'suspicious':
+            candidates = self.suspicious
+        else:
+            candidates = range(len(self.nodes))
+        if view == 'suspicious':
+            candidates = [i for i in candidates if self.nodes[i].get('suspicious')]
+        n_candidates = len(candidates)
+
+        if max_nodes is not None and n_candidates > max_nodes:
+            # Ring members are kept before their neighbourhood
+            first = [i for i in seeds if view == 'full' or self.nodes[i].get('suspicious')]
+            kept = _weighted_sample(first, self.node_weight, max_nodes, rng)
+            if len(kept) < max_nodes:
+                rest = set(candidates).difference(first)
+                kept += _weighted_sample(rest, self.node_weight, max_nodes - len(kept), rng)
+        else:
+            kept = list(candidates)
+        kept_set = set(kept)
+
+        links = [j for i in kept for j in self.out_links[i]
+                 if self.pos[self.links[j]['target']] in kept_set]
+        n_links = len(links)
+        if max_edges is not None and n_links > max_edges:
+            links = _weighted_sample(links, self.link_weight, max_edges, rng)
+            links.sort()
+
+        kept.sort()
+        return {
+            'nodes': [
+                {**self.nodes[i], 'suspicion_score': self.score[i],
+                 'detected_patterns': self.patterns[i]}
+                for i in kept
+            ],
+            'links': [self.links[j] for j in links],
+            'total_nodes': n_candidates,
+            'total_links': n_links,
+            'truncated':   len(kept) < n_candidates or len(links) < n_links,
+        }
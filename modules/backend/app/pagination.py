@@ -0,0 +1,252 @@
+"""
+NEXA AI - Paginated result views
+Large analyses are served page by page instead of as one document. For each
+(sort key, direction) an analysis gets one sorted order of its items, and
+per filter value a posting list of positions in that order. Filtered views
+combining several filters are intersected once and memoized (the most
+recent MAX_CACHED_VIEWS per analysis). A page is then
+a slice of a precomputed list, so serving it costs O(limit) whatever the
+analysis size.
+
+Cursors are opaque: base64 of the next offset plus a fingerprint of the view
+they belong to, so a cursor cannot be replayed against a different sort or
+filter.
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1_000
+MAX_CACHED_VIEWS = 64       # memoized multi-filter views per analysis (LRU)
+
+
+class Collection:
+    """How one list in a result document can be sorted and filtered."""
+
+    def __init__(
+        self,
+        field: str,
+        sorts: Dict[str, Callable[[Any], Any]],
+        default_sort: str,
+        filters: Dict[str, Callable[[Any, Dict[str, str]], List[str]]],
+    ):
+        self.field = field
+        self.sorts = sorts                  # name → sort key
+        self.default_sort = default_sort    # '-name' = descending
+        self.filters = filters              # name → values an item matches
+
+
+def _ring_of(item_accounts, ring_map):
+    return sorted({ring_map[a] for a in item_accounts if a in ring_map})
+
+
+COLLECTIONS: Dict[str, Collection] = {
+    'suspicious-accounts': Collection(
+        'suspicious_accounts',
+        sorts={
+            'suspicion_score': lambda a: a['suspicion_score'],
+            'account_id':      lambda a: a['account_id'],
+        },
+        default_sort='-suspicion_score',
+        filters={
+            'risk_level': lambda a, _: [a.get('risk_level')],
+            'pattern':    lambda a, _: a.get('detected_patterns', []),
+            'ring':       lambda a, _: [a.get('ring_id')],
+            'account':    lambda a, _: [a['account_id']],
+        },
+    ),
+    'fraud-rings': Collection(
+        'fraud_rings',
+        sorts={
+            'risk_score': lambda r: r.get('risk_score', 0),
+            'size':       lambda r: len(r.get('member_accounts', [])),
+            'ring_id':    lambda r: r['ring_id'],
+        },
+        default_sort='-risk_score',
+        filters={
+            'pattern': lambda r, _: [r.get('pattern_type')],
+            'ring':    lambda r, _: [r['ring_id']],
+            'account': lambda r, _: r.get('member_accounts', []),
+        },
+    ),
+    'cycles': Collection(
+        'cycles',
+        sorts={'length': len},
+        default_sort='length',
+        filters={
+            'ring':    lambda c, rings: _ring_of(c, rings),
+            'account': lambda c, _: c,
+        },
+    ),
+    'chains': Collection(
+        'chains',
+        sorts={
+            'total_amount': lambda c: c.get('total_amount', 0),
+            'length':       lambda c: c.get('length', len(c['chain'])),
+        },
+        default_sort='-total_amount',
+        filters={
+            'pattern': lambda c, _: [c.get('pattern')],
+            'ring':    lambda c, rings: _ring_of(c['chain'], rings),
+            'account': lambda c, _: c['chain'],
+        },
+    ),
+}
+
+
+def encode_cursor(offset: int, view: str) -> str:
+    raw = json.dumps({'o': offset, 'v': view}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, view: str) -> int:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        data = json.loads(raw)
+        offset, cursor_view = int(data['o']), data['v']
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError("Malformed cursor")
+    if cursor_view != view or offset < 0:
+        raise ValueError("Cursor does not belong to this sort/filter combination")
+    return offset
+
+
+class ResultIndex:
+    """Sorted orders and filter posting lists for one analysis document."""
+
+    def __init__(self, result: Dict[str, Any]):
+        self._result = result
+        self._ring_map = {
+            acct: ring['ring_id']
+            for ring in result.get('fraud_rings', [])
+            for acct in ring.get('member_accounts', [])
+        }
+        self._orders: Dict[Tuple[str, str], List[int]] = {}
+        self._postings: Dict[Tuple[str, str, str], Dict[str, List[int]]] = {}
+        self._views: "OrderedDict[Tuple, List[int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _order(self, name: str, sort: str) -> List[int]:
+        key = (name, sort)
+        if key not in self._orders:
+            coll = COLLECTIONS[name]
+            items = self._result.get(coll.field, [])
+            sort_key = coll.sorts[sort.lstrip('-')]
+            # Stable in both directions: ties keep document order
+            self._orders[key] = sorted(
+                range(len(items)), key=lambda i: sort_key(items[i]), reverse=sort.startswith('-')
+            )
+        return self._orders[key]
+
+    def _posting(self, name: str, sort: str, field: str) -> Dict[str, List[int]]:
+        key = (name, sort, field)
+        if key not in self._postings:
+            coll = COLLECTIONS[name]
+            items = self._result.get(coll.field, [])
+            values_of = coll.filters[field]
+            posting: Dict[str, List[int]] = {}
+            for i in self._order(name, sort):
+                for value in dict.fromkeys(values_of(items[i], self._ring_map)):
+                    if value is not None:
+                        posting.setdefault(str(value), []).append(i)
+            self._postings[key] = posting
+        return self._postings[key]
+
+    def view(self, name: str, sort: str, filters: Dict[str, str]) -> List[int]:
+        """Item positions matching every filter, in sort order."""
+        key = (name, sort, tuple(sorted(filters.items())))
+        with self._lock:
+            if key in self._views:
+                self._views.move_to_end(key)
+                return self._views[key]
+            if not filters:
+                return self._order(name, sort)
+            lists = [self._posting(name, sort, f).get(v, []) for f, v in sorted(filters.items())]
+            if len(lists) == 1:
+                return lists[0]
+            lists.sort(key=len)
+            keep = set(lists[0]).intersection(*lists[1:])
+            # Filter values come from the query string: keep only the recent views
+            positions = self._views[key] = [i for i in lists[0] if i in keep]
+            while len(self._views) > MAX_CACHED_VIEWS:
+                self._views.popitem(last=False)
+            return positions
+
+    def page(
+        self,
+        name: str,
+        sort: Optional[str] = None,
+        filters: Optional[Dict[str, Optional[str]]] = None,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> Dict[str, Any]:
+        """
+        One page of a collection.
+
+        Raises:
+            ValueError: On an unknown sort key or filter, a bad limit, or a
+                cursor from another view
+        """
+        coll = COLLECTIONS[name]
+        sort = sort or coll.default_sort
+        if sort.lstrip('-') not in coll.sorts:
+            raise ValueError(f"Unknown sort '{sort}' for {name}; use one of {sorted(coll.sorts)}")
+        filters = {k: v for k, v in (filters or {}).items() if v is not None}
+        unknown = set(filters) - set(coll.filters)
+        if unknown:
+            raise ValueError(f"Unsupported filter(s) {sorted(unknown)} for {name}")
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+        fingerprint = hashlib.sha1(
+            json.dumps([name, sort, sorted(filters.items())]).encode()
+        ).hexdigest()[:12]
+        offset = decode_cursor(cursor, fingerprint) if cursor else 0
+
+        positions = self.view(name, sort, filters)
+        items = self._result.get(coll.field, [])
+        end = offset + limit
+        return {
+            'items':       [items[i] for i in positions[offset:end]],
+            'total':       len(positions),
+            'sort':        sort,
+            'next_cursor': encode_cursor(end, fingerprint) if end < len(positions) else None,
+        }
+
+
+class IndexCache:
+    """
+    Index per analysis ID (a ResultIndex unless another factory is given),
+    least-recently-used beyond max_entries.
+    """
+
+    def __init__(self, max_entries: int = 32, factory: Callable[[Dict[str, Any]], Any] = ResultIndex):
+        self.max_entries = max_entries
+        self.factory = factory
+        self._items: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, analysis_id: str, load: Callable[[], Dict[str, Any]]) -> Any:
+        """
+        Cached index, or build one from load() (called only on a miss, and
+        outside the lock so other lookups are not held up by the build).
+        """
+        with self._lock:
+            index = self._items.get(analysis_id)
+            if index is not None:
+                self._items.move_to_end(analysis_id)
+                return index
+        index = self.factory(load())
+        with self._lock:
+            # A concurrent miss may have built it first; keep that one
+            index = self._items.setdefault(analysis_id, index)
+            self._items.move_to_end(analysis_id)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+            return index
@@ -0,0 +1,161 @@
+"""
+NEXA AI - Encoded response cache
+Analyses never change once stored, so every read of the same resource can
+reuse the same bytes. Each response body is JSON-encoded once, kept in a
+byte-bounded LRU together with lazily built gzip/brotli variants, and served
+with a content-hash ETag: a repeat read costs a memory copy, or a 304 when
+the client already has it.
+
+The encoder understands numpy scalars/arrays and pandas Timestamps natively
+(orjson when installed, the json module otherwise); anything else falls back
+to str(), as the previous `json.dumps(..., default=str)` did.
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import numpy as np
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # json module fallback
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+MIN_COMPRESS_BYTES = 1024
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, np.floating):
+        return float(obj)
+    if isinstance(obj, np.bool_):
+        return bool(obj)
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    return str(obj)                 # Timestamps keep their str() form
+
+
+def encode(obj: Any) -> bytes:
+    """Compact JSON bytes for a result document (or any part of one)."""
+    if orjson is not None:
+        return orjson.dumps(
+            obj, default=_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+        )
+    return json.dumps(obj, default=_default, separators=(',', ':')).encode()
+
+
+class Encoded:
+    """One encoded body, its cache key, ETag and compressed variants."""
+
+    __slots__ = ('key', 'body', 'etag', 'variants')
+
+    def __init__(self, key: Hashable, body: bytes):
+        self.key = key
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        self.variants: Dict[str, bytes] = {}
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(v) for v in self.variants.values())
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Preferred supported Content-Encoding ('br', 'gzip') or None."""
+    offered = set()
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        if params.strip().replace(' ', '') in ('q=0', 'q=0.0'):
+            continue
+        offered.add(coding.strip().lower())
+    if brotli is not None and 'br' in offered:
+        return 'br'
+    if 'gzip' in offered or '*' in offered:
+        return 'gzip'
+    return None
+
+
+class ResponseCache:
+    """Encoded bodies by key, least-recently-used beyond max_bytes."""
+
+    def __init__(self, max_bytes: int = 256 * 1024**2):
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[Hashable, Encoded]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        """Bytes held, compressed variants included."""
+        return self._size
+
+    def put(self, key: Hashable, body: bytes) -> Encoded:
+        encoded = Encoded(key, body)
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._size -= old.size
+            self._items[key] = encoded
+            self._size += encoded.size
+            self._evict()
+        return encoded
+
+    def get(self, key: Hashable) -> Optional[Encoded]:
+        with self._lock:
+            encoded = self._items.get(key)
+            if encoded is not None:
+                self._items.move_to_end(key)
+            return encoded
+
+    def get_or_encode(self, key: Hashable, build: Callable[[], Any]) -> Encoded:
+        """Cached entry, or encode build()'s result once and cache it."""
+        return self.get(key) or self.put(key, encode(build()))
+
+    def variant(self, encoded: Encoded, coding: Optional[str]) -> bytes:
+        if coding is None or len(encoded.body) < MIN_COMPRESS_BYTES:
+            return encoded.body
+        body = encoded.variants.get(coding)
+        if body is None:
+            body = brotli.compress(encoded.body, quality=5) if coding == 'br' \
+                else gzip.compress(encoded.body, compresslevel=6)
+            with self._lock:
+                if coding not in encoded.variants:
+                    encoded.variants[coding] = body
+                    # still cached (not evicted or replaced under its key)?
+                    if self._items.get(encoded.key) is encoded:
+                        self._size += len(body)
+                        self._evict()
+        return body
+
+    def _evict(self) -> None:
+        while self._size > self.max_bytes and len(self._items) > 1:
+            _, old = self._items.popitem(last=False)
+            self._size -= old.size
+
+    def respond(self, request: Request, encoded: Encoded,
+                headers: Optional[Dict[str, str]] = None) -> Response:
+        """200 with the best accepted encoding, or 304 on a matching If-None-Match."""
+        base = {'ETag': encoded.etag, 'Vary': 'Accept-Encoding', 'Cache-Control': 'private, no-cache'}
+        match = request.headers.get('if-none-match', '')
+        tags = {t.strip().removeprefix('W/') for t in match.split(',')}
+        if encoded.etag in tags or '*' in tags:
+            return Response(status_code=304, headers=base)
+
+        coding = negotiate(request.headers.get('accept-encoding', ''))
+        body = self.variant(encoded, coding)
+        if body is not encoded.body:
+            base['Content-Encoding'] = coding
+        return Response(content=body, media_type='application/json', headers={**base, **(headers or {})})
@@ -0,0 +1,8 @@
+import os
+import sys
+
+_here = os.path.dirname(os.path.abspath(__file__))
+for _p in (os.path.join(_here, '..', '..', 'ai_engine'), os.path.join(_here, '..', 'app')):
+    _p = os.path.abspath(_p)
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
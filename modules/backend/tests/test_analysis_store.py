@@ -0,0 +1,100 @@
+"""
+Tests for the two-tier analysis store
+"""
+
+import pytest
+
+import analysis_store
+from analysis_store import AnalysisStore, MemoryStore, SQLiteStore, TieredAnalysisStore
+
+
+def _result(n):
+    return {
+        'summary': {'total_accounts_analyzed': n},
+        'suspicious_accounts': [
+            {'account_id': 'ACC_1', 'suspicion_score': 10.0 * n, 'risk_level': 'high',
+             'detected_patterns': ['cycle_length_3'], 'ring_id': 'RING_001'},
+        ],
+        'fraud_rings': [
+            {'ring_id': 'RING_001', 'member_accounts': ['ACC_1', 'ACC_2'],
+             'pattern_type': 'cycle', 'risk_score': 50.0},
+        ],
+    }
+
+
+@pytest.fixture
+def disk(tmp_path):
+    store = SQLiteStore(str(tmp_path / 'analyses.db'), max_analyses=2)
+    yield store
+    store.close()
+
+
+def test_incomplete_tier_cannot_be_created():
+    class GetOnly(AnalysisStore):
+        def get(self, analysis_id):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnly()
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = MemoryStore(max_entries=2, ttl_seconds=None)
+    store.put('a', _result(1))
+    store.put('b', _result(2))
+    assert store.get('a') is not None            # 'a' becomes most recent
+    store.put('c', _result(3))
+    assert store.get('b') is None
+    assert store.get('a') is not None and store.get('c') is not None
+    assert len(store) == 2
+
+
+def test_memory_store_entries_expire(monkeypatch):
+    now = [1_000.0]
+    monkeypatch.setattr(analysis_store.time, 'monotonic', lambda: now[0])
+    store = MemoryStore(max_entries=4, ttl_seconds=60)
+    store.put('a', _result(1))
+    now[0] += 59
+    assert store.get('a') is not None
+    now[0] += 2
+    assert store.get('a') is None and 'a' not in store
+
+
+def test_sqlite_store_round_trip_and_lookups(disk):
+    disk.put('a', _result(1))
+    assert disk.get('a') == _result(1)
+    assert 'a' in disk and 'missing' not in disk
+
+    [hit] = disk.find_account('ACC_1')
+    assert hit['analysis_id'] == 'a' and hit['detected_patterns'] == ['cycle_length_3']
+    assert disk.find_account('ACC_2') == []             # ring member, not flagged
+    assert disk.get_ring('a', 'RING_001') == {
+        'ring_id': 'RING_001', 'member_accounts': ['ACC_1', 'ACC_2'],
+        'pattern_type': 'cycle', 'risk_score': 50.0,
+    }
+    assert disk.get_ring('a', 'RING_999') is None
+
+
+def test_sqlite_store_prunes_oldest_and_cascades(disk, monkeypatch):
+    clock = iter(range(100))
+    monkeypatch.setattr(analysis_store.time, 'time', lambda: float(next(clock)))
+    for key in ('a', 'b', 'c'):
+        disk.put(key, _result(1))
+    assert len(disk) == 2 and disk.get('a') is None
+    assert [h['analysis_id'] for h in disk.find_account('ACC_1')] == ['c', 'b']
+    assert disk.get_ring('a', 'RING_001') is None
+    count = lambda table: disk._conn.execute(
+        f"SELECT COUNT(*) FROM {table} WHERE analysis_id = 'a'").fetchone()[0]
+    assert count('accounts') == 0 and count('rings') == 0
+
+
+def test_tiered_store_promotes_disk_hits(disk):
+    memory = MemoryStore(max_entries=4, ttl_seconds=None)
+    store = TieredAnalysisStore(memory, disk)
+    store.put('a', _result(1))
+    memory._items.clear()                       # evicted from the hot tier
+    assert memory.get('a') is None
+    assert 'a' in store
+    assert store.get('a') == _result(1)
+    assert memory.get('a') == _result(1)
+    assert len(store) == 1
@@ -0,0 +1,79 @@
+"""
+Tests for JobManager
+"""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from jobs import JobManager
+from utils.csv_loader import InvalidCSVError
+
+
+def _ok(value):
+    return {'value': value}, {}
+
+
+def _invalid(_):
+    raise InvalidCSVError("CSV file is empty")
+
+
+def _bug(_):
+    raise ValueError("operands could not be broadcast together")
+
+
+def _crash(_):
+    os._exit(1)          # what an OOM kill looks like to the pool
+
+
+def _wait_idle(manager, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while manager.in_flight and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return manager.in_flight
+
+
+@pytest.fixture
+def manager():
+    manager = JobManager(workers=1, queue_depth=2)
+    yield manager
+    manager.shutdown()
+
+
+def test_job_result(manager):
+    job = manager.submit(_ok, 7)
+    assert job.future.result(timeout=30) == ({'value': 7}, {})
+    assert _wait_idle(manager) == 0
+    assert job.status == 'done'
+
+
+def test_crashed_worker_does_not_wedge_the_manager(manager):
+    crashed = manager.submit(_crash, None)
+    with pytest.raises(Exception):
+        crashed.future.result(timeout=30)
+    assert _wait_idle(manager) == 0
+    assert crashed.status == 'failed'
+
+    # More submissions than queue_depth: each must run on a fresh pool
+    for value in range(manager.queue_depth + 1):
+        job = manager.submit(_ok, value)
+        assert job.future.result(timeout=30) == ({'value': value}, {})
+        assert _wait_idle(manager) == 0
+
+
+def test_only_loader_errors_count_as_invalid_input(manager):
+    invalid, bug = manager.submit(_invalid, None), manager.submit(_bug, None)
+    for job in (invalid, bug):
+        with pytest.raises(ValueError):
+            job.future.result(timeout=30)
+    assert _wait_idle(manager) == 0
+    assert invalid.status == bug.status == 'failed'
+    assert invalid.invalid_input and not bug.invalid_input
+
+
+def test_run_leaves_no_job_record(manager):
+    assert asyncio.run(manager.run(_ok, 3)) == {'value': 3}
+    assert _wait_idle(manager) == 0
+    assert manager._jobs == {}
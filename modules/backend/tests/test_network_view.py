@@ -0,0 +1,138 @@
+"""
+Tests for network-data views and the per-analysis GraphIndex cache
+"""
+
+import pytest
+
+from network_view import GraphIndex
+from pagination import IndexCache
+
+
+def _result():
+    return {
+        'graph_data': {
+            'nodes': [
+                {'id': 'A', 'suspicious': True, 'ring_id': 'RING_001'},
+                {'id': 'B', 'suspicious': True, 'ring_id': 'RING_001'},
+                {'id': 'C', 'suspicious': False},
+            ],
+            'links': [
+                {'source': 'A', 'target': 'B', 'amount': 100.0, 'suspicious': True},
+                {'source': 'B', 'target': 'C', 'amount': 50.0},
+            ],
+        },
+        'suspicious_accounts': [
+            {'account_id': 'A', 'suspicion_score': 80.0, 'detected_patterns': ['cycle_length_3']},
+            {'account_id': 'B', 'suspicion_score': 60.0, 'detected_patterns': ['cycle_length_3']},
+        ],
+        'fraud_rings': [{'ring_id': 'RING_001', 'member_accounts': ['A', 'B']}],
+    }
+
+
+def test_loader_runs_only_on_a_miss():
+    cache = IndexCache(2, factory=GraphIndex)
+    loads = []
+
+    def load():
+        loads.append(1)
+        return _result()
+
+    first = cache.get('a1', load)
+    assert cache.get('a1', load) is first
+    assert len(loads) == 1
+
+
+def test_evicted_index_is_reloaded():
+    cache = IndexCache(1, factory=GraphIndex)
+    loads = []
+
+    def load():
+        loads.append(1)
+        return _result()
+
+    cache.get('a1', load)
+    cache.get('a2', load)
+    cache.get('a1', load)
+    assert len(loads) == 3
+
+
+def test_suspicious_view():
+    view = GraphIndex(_result()).view('suspicious')
+    assert [n['id'] for n in view['nodes']] == ['A', 'B']
+    assert [(l['source'], l['target']) for l in view['links']] == [('A', 'B')]
+    assert not view['truncated']
+
+
+def _ring_graph():
+    """
+    Ring R1 = A0 → A1 → A2 → A0 with a tail A2 → T1 → T2 → T3, and a
+    separate star H → L0..L19 of small, unflagged links.
+    """
+    nodes = [{'id': f"A{i}", 'suspicious': True, 'ring_id': 'R1'} for i in range(3)]
+    nodes += [{'id': f"T{i}", 'suspicious': False} for i in range(1, 4)]
+    nodes += [{'id': 'H', 'suspicious': False, 'out_degree': 20}]
+    nodes += [{'id': f"L{i}", 'suspicious': False} for i in range(20)]
+    links = [{'source': f"A{i}", 'target': f"A{(i + 1) % 3}", 'amount': 1000.0, 'suspicious': True}
+             for i in range(3)]
+    links += [{'source': 'A2', 'target': 'T1', 'amount': 300.0},
+              {'source': 'T1', 'target': 'T2', 'amount': 200.0},
+              {'source': 'T2', 'target': 'T3', 'amount': 100.0}]
+    links += [{'source': 'H', 'target': f"L{i}", 'amount': 5.0} for i in range(20)]
+    return GraphIndex({
+        'graph_data': {'nodes': nodes, 'links': links},
+        'suspicious_accounts': [{'account_id': f"A{i}", 'suspicion_score': 70.0} for i in range(3)],
+        'fraud_rings': [{'ring_id': 'R1', 'member_accounts': ['A0', 'A1', 'A2']}],
+    })
+
+
+def test_ring_neighbourhood_grows_with_hops():
+    index = _ring_graph()
+    ids = lambda view: {n['id'] for n in view['nodes']}
+    members = {'A0', 'A1', 'A2'}
+    assert ids(index.view(rings=['R1'], hops=0)) == members
+    assert ids(index.view(rings=['R1'], hops=1)) == members | {'T1'}
+    three = index.view(rings=['R1'], hops=3)
+    assert ids(three) == members | {'T1', 'T2', 'T3'}
+    assert three['total_nodes'] == 6 and three['total_links'] == 6 and not three['truncated']
+    assert ids(index.view('suspicious', rings=['R1'], hops=3)) == members
+
+
+def test_node_cap_keeps_ring_members_first():
+    index = _ring_graph()
+    view = index.view(rings=['R1'], hops=3, max_nodes=4, seed=1)
+    kept = {n['id'] for n in view['nodes']}
+    assert {'A0', 'A1', 'A2'} <= kept and len(kept) == 4
+    assert view['total_nodes'] == 6 and view['truncated']
+    # Links only between kept nodes; total_links counts those before any edge cap
+    assert all(l['source'] in kept and l['target'] in kept for l in view['links'])
+    assert view['total_links'] == len(view['links'])
+
+
+def test_caps_sample_deterministically_per_seed():
+    index = _ring_graph()
+    same = [index.view(max_nodes=8, max_edges=5, seed=7) for _ in range(2)]
+    assert same[0] == same[1]
+    assert len(same[0]['nodes']) == 8 and len(same[0]['links']) <= 5
+    seeds = {tuple(n['id'] for n in index.view(max_nodes=8, seed=s)['nodes']) for s in range(10)}
+    assert len(seeds) > 1
+
+
+def test_edge_cap_reports_totals():
+    index = _ring_graph()
+    view = index.view(max_edges=4, seed=3)
+    assert view['total_nodes'] == 27 and view['total_links'] == 26
+    assert len(view['links']) == 4 and view['truncated']
+    assert len(view['nodes']) == 27
+
+
+def test_uncapped_full_view_is_the_stored_graph():
+    index = _ring_graph()
+    assert index.view() is index.graph
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'view': 'rings'}, {'rings': ['R9']}, {'hops': 4}, {'max_nodes': 0}, {'max_edges': -1},
+])
+def test_bad_view_arguments_are_rejected(kwargs):
+    with pytest.raises(ValueError):
+        _ring_graph().view(**kwargs)
@@ -0,0 +1,110 @@
+"""
+Tests for cursor-paginated result views
+"""
+
+import pytest
+
+import pagination
+from pagination import COLLECTIONS, ResultIndex
+
+
+def _result():
+    accounts = [
+        {'account_id': f"ACC_{i:02d}", 'suspicion_score': float(i % 7 * 10),
+         'risk_level': 'high' if i % 7 >= 5 else 'low',
+         'detected_patterns': ['cycle_length_3'] if i % 2 else ['fan_in'],
+         'ring_id': 'RING_001' if i < 4 else None}
+        for i in range(25)
+    ]
+    rings = [
+        {'ring_id': 'RING_001', 'member_accounts': ['ACC_00', 'ACC_01', 'ACC_02', 'ACC_03'],
+         'pattern_type': 'cycle', 'risk_score': 70.0},
+        {'ring_id': 'RING_002', 'member_accounts': ['ACC_10', 'ACC_11'],
+         'pattern_type': 'fan_in', 'risk_score': 70.0},
+    ]
+    return {
+        'suspicious_accounts': accounts,
+        'fraud_rings': rings,
+        'cycles': [['ACC_00', 'ACC_01', 'ACC_02'], ['ACC_10', 'ACC_11', 'ACC_12', 'ACC_13']],
+        'chains': [{'chain': ['ACC_05', 'ACC_06', 'ACC_07'], 'total_amount': 900.0, 'length': 3}],
+    }
+
+
+def _walk(index, name, sort, limit=4, **filters):
+    items, cursor, seen = [], None, 0
+    while True:
+        page = index.page(name, sort=sort, filters=filters, cursor=cursor, limit=limit)
+        items += page['items']
+        seen += 1
+        cursor = page['next_cursor']
+        if cursor is None:
+            return items, page['total'], seen
+
+
+@pytest.mark.parametrize('name', list(COLLECTIONS))
+def test_cursor_walk_matches_stable_sort_for_every_key(name):
+    result = _result()
+    index = ResultIndex(result)
+    coll = COLLECTIONS[name]
+    items = result[coll.field]
+    for field, key in coll.sorts.items():
+        for sort in (field, '-' + field):
+            walked, total, _ = _walk(index, name, sort, limit=3)
+            expected = sorted(items, key=key, reverse=sort.startswith('-'))
+            assert walked == expected and total == len(items)
+            assert _walk(index, name, sort, limit=3)[0] == walked     # repeatable
+
+
+def test_filters_combine():
+    index = ResultIndex(_result())
+    high, _, _ = _walk(index, 'suspicious-accounts', None, risk_level='high')
+    assert high and all(a['risk_level'] == 'high' for a in high)
+
+    both, total, _ = _walk(index, 'suspicious-accounts', None,
+                           risk_level='high', pattern='cycle_length_3')
+    assert total == len(both)
+    assert both == [a for a in high if 'cycle_length_3' in a['detected_patterns']]
+
+    rings, _, _ = _walk(index, 'fraud-rings', None, account='ACC_11')
+    assert [r['ring_id'] for r in rings] == ['RING_002']
+    cycles, _, _ = _walk(index, 'cycles', None, ring='RING_001')
+    assert cycles == [['ACC_00', 'ACC_01', 'ACC_02']]
+    assert _walk(index, 'suspicious-accounts', None, account='NOPE')[1] == 0
+
+
+def test_last_page_has_no_next_cursor():
+    index = ResultIndex(_result())
+    _, total, pages = _walk(index, 'suspicious-accounts', None, limit=5)
+    assert total == 25 and pages == 5
+    page = index.page('suspicious-accounts', limit=25)
+    assert len(page['items']) == 25 and page['next_cursor'] is None
+
+
+def test_cursor_from_another_view_is_rejected():
+    index = ResultIndex(_result())
+    cursor = index.page('suspicious-accounts', limit=5)['next_cursor']
+    assert index.page('suspicious-accounts', cursor=cursor, limit=5)['items']
+    with pytest.raises(ValueError):
+        index.page('suspicious-accounts', sort='account_id', cursor=cursor, limit=5)
+    with pytest.raises(ValueError):
+        index.page('suspicious-accounts', filters={'risk_level': 'high'}, cursor=cursor, limit=5)
+    with pytest.raises(ValueError):
+        index.page('fraud-rings', cursor=cursor, limit=5)
+    with pytest.raises(ValueError):
+        index.page('suspicious-accounts', cursor='not-a-cursor', limit=5)
+
+
+def test_bad_sort_filter_and_limit_are_rejected():
+    index = ResultIndex(_result())
+    for kwargs in ({'sort': 'nope'}, {'filters': {'nope': 'x'}}, {'limit': 0},
+                   {'limit': pagination.MAX_PAGE_SIZE + 1}):
+        with pytest.raises(ValueError):
+            index.page('suspicious-accounts', **kwargs)
+
+
+def test_memoized_views_are_bounded(monkeypatch):
+    monkeypatch.setattr(pagination, 'MAX_CACHED_VIEWS', 3)
+    index = ResultIndex(_result())
+    for i in range(10):
+        index.page('suspicious-accounts', filters={'risk_level': 'low', 'account': f"ACC_{i:02d}"})
+    assert len(index._views) == 3
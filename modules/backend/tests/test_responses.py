@@ -0,0 +1,93 @@
+"""
+Tests for the encoded response cache
+"""
+
+import gzip
+
+import pytest
+from starlette.requests import Request
+
+import responses
+from responses import ResponseCache, encode, negotiate
+
+
+def _request(**headers):
+    return Request({
+        'type': 'http', 'method': 'GET', 'path': '/', 'query_string': b'',
+        'headers': [(k.replace('_', '-').encode(), v.encode()) for k, v in headers.items()],
+    })
+
+
+def _big():
+    return {'items': [{'account_id': f"ACC_{i}", 'score': i} for i in range(200)]}
+
+
+def test_200_carries_etag_and_vary():
+    cache = ResponseCache()
+    encoded = cache.get_or_encode('k', _big)
+    response = cache.respond(_request(), encoded)
+    assert response.status_code == 200
+    assert response.headers['etag'] == encoded.etag
+    assert response.headers['vary'] == 'Accept-Encoding'
+    assert 'content-encoding' not in response.headers
+    assert response.body == encode(_big())
+
+
+def test_if_none_match_returns_empty_304():
+    cache = ResponseCache()
+    encoded = cache.get_or_encode('k', _big)
+    for match in (encoded.etag, f'W/{encoded.etag}', f'"other", {encoded.etag}', '*'):
+        response = cache.respond(_request(if_none_match=match), encoded)
+        assert response.status_code == 304 and response.body == b''
+        assert response.headers['etag'] == encoded.etag
+    assert cache.respond(_request(if_none_match='"other"'), encoded).status_code == 200
+
+
+def test_accept_encoding_picks_gzip_or_identity():
+    cache = ResponseCache()
+    encoded = cache.get_or_encode('k', _big)
+    response = cache.respond(_request(accept_encoding='gzip, deflate'), encoded)
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.headers['vary'] == 'Accept-Encoding'
+    assert gzip.decompress(response.body) == encoded.body
+
+    identity = cache.respond(_request(accept_encoding='gzip;q=0, identity'), encoded)
+    assert 'content-encoding' not in identity.headers and identity.body == encoded.body
+
+    small = cache.get_or_encode('small', lambda: {'ok': True})
+    assert 'content-encoding' not in cache.respond(_request(accept_encoding='gzip'), small).headers
+
+
+def test_negotiate_prefers_brotli_when_available(monkeypatch):
+    monkeypatch.setattr(responses, 'brotli', object())
+    assert negotiate('gzip, br') == 'br'
+    assert negotiate('br;q=0, gzip') == 'gzip'
+    monkeypatch.setattr(responses, 'brotli', None)
+    assert negotiate('gzip, br') == 'gzip'
+    assert negotiate('br') is None
+    assert negotiate('') is None
+
+
+def test_brotli_variant():
+    brotli = pytest.importorskip('brotli')
+    cache = ResponseCache()
+    encoded = cache.get_or_encode('k', _big)
+    response = cache.respond(_request(accept_encoding='br'), encoded)
+    assert response.headers['content-encoding'] == 'br'
+    assert brotli.decompress(response.body) == encoded.body
+
+
+def test_evicts_least_recently_used_beyond_max_bytes():
+    body = encode(_big())
+    cache = ResponseCache(max_bytes=2 * len(body) + 10)
+    cache.put('a', body)
+    cache.put('b', body)
+    assert cache.get('a') is not None            # 'a' becomes most recent
+    cache.put('c', body)
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+    assert cache.size == 2 * len(body)
+
+    # Compressed variants count towards the bound: 'c' is now least recent
+    cache.variant(cache.get('a'), 'gzip')
+    assert cache.size <= cache.max_bytes and cache.get('c') is None
@@ -157,7 +157,7 @@ interface AnalysisData {
   }>;
   network_stats: {
     density: number;
-    avg_clustering: number;
+    avg_clustering?: number;   // from /network-stats
     num_components: number;
     avg_in_degree: number;
     avg_out_degree: number;
@@ -1,4 +1,5 @@
-import React from 'react';
+import React, { useEffect, useState } from 'react';
+import axios from 'axios';
 import {
   Paper,
   Typography,
@@ -37,7 +38,21 @@ interface AnalyticsViewProps {
   data: any;
 }
 
+const API_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000';
+
 const AnalyticsView: React.FC<AnalyticsViewProps> = ({ data }) => {
+  // Clustering is computed on request; the analysis carries only the cheap stats
+  const [networkStats, setNetworkStats] = useState<any>(data?.network_stats);
+  useEffect(() => {
+    setNetworkStats(data?.network_stats);
+    if (!data?.analysis_id) return;
+    let cancelled = false;
+    axios.get(`${API_URL}/api/analysis/${data.analysis_id}/network-stats`)
+      .then(res => { if (!cancelled) setNetworkStats(res.data); })
+      .catch(() => {});
+    return () => { cancelled = true; };
+  }, [data]);
+
   const summary = data?.summary || {
     total_transactions: 0,
     total_amount: 0,
@@ -342,7 +357,7 @@ const AnalyticsView: React.FC<AnalyticsViewProps> = ({ data }) => {
                       Network Density
                     </Typography>
                     <Typography variant="h4" sx={{ fontWeight: 700, color: '#6366f1' }}>
-                      {((data?.network_stats?.density || 0) * 100).toFixed(1)}%
+                      {((networkStats?.density || 0) * 100).toFixed(1)}%
                     </Typography>
                     <Typography variant="caption" color="textSecondary">Connection Concentration</Typography>
                   </CardContent>
@@ -355,7 +370,7 @@ const AnalyticsView: React.FC<AnalyticsViewProps> = ({ data }) => {
                       Clustering Coefficient
                     </Typography>
                     <Typography variant="h4" sx={{ fontWeight: 700, color: '#f59e0b' }}>
-                      {((data?.network_stats?.avg_clustering || 0) * 100).toFixed(1)}%
+                      {((networkStats?.avg_clustering || 0) * 100).toFixed(1)}%
                     </Typography>
                     <Typography variant="caption" color="textSecondary">Triangle Formation</Typography>
                   </CardContent>
@@ -368,7 +383,7 @@ const AnalyticsView: React.FC<AnalyticsViewProps> = ({ data }) => {
                       Components
                     </Typography>
                     <Typography variant="h4" sx={{ fontWeight: 700, color: '#8b5cf6' }}>
-                      {data?.network_stats?.num_components || 1}
+                      {networkStats?.num_components || 1}
                     </Typography>
                     <Typography variant="caption" color="textSecondary">Isolated Groups</Typography>
                   </CardContent>
@@ -381,7 +396,7 @@ const AnalyticsView: React.FC<AnalyticsViewProps> = ({ data }) => {
                       Avg Degree
                     </Typography>
                     <Typography variant="h4" sx={{ fontWeight: 700, color: '#10b981' }}>
-                      {(data?.network_stats?.avg_in_degree || 0).toFixed(1)}
+                      {(networkStats?.avg_in_degree || 0).toFixed(1)}
                     </Typography>
                     <Typography variant="caption" color="textSecondary">Connections/Node</Typography>
                   </CardContent>
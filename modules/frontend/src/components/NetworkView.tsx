@@ -6,6 +6,7 @@ import {
 } from '@mui/material';
 import { Search, Refresh} from '@mui/icons-material';
 import { InputAdornment } from '@mui/material';
+import axios from 'axios';
 
 interface NetworkViewProps {
   data: any;
@@ -55,6 +56,36 @@ const ringColor = (ringId: string) => {
   return palette[idx % palette.length];
 };
 
+const API_URL   = process.env.REACT_APP_API_URL || 'http://localhost:8000';
+const MAX_NODES = 300;   // physics is O(n²) per frame
+const MAX_EDGES = 1500;
+
+const makeNode = (
+  id: string, score: number, ringId: string | null, patterns: string[] | undefined,
+  inDegree = 0, outDegree = 0,
+): Node => ({
+  id,
+  score,
+  color:      scoreColor(score),
+  size:       10 + (score / 100) * 14,
+  x:          Math.random() * 600 + 150,
+  y:          Math.random() * 400 + 100,
+  vx: 0, vy: 0,
+  in_degree:  inDegree,
+  out_degree: outDegree,
+  ring_id:    ringId ?? '',
+  patterns:   patterns ?? [],
+});
+
+// Fallback when the network-data request fails: the (capped) suspicious
+// accounts without links — analyses no longer ship graph_data
+const accountsOnly = (data: any): [Node[], Link[]] => [
+  (data.suspicious_accounts as any[]).slice(0, MAX_NODES).map(a =>
+    makeNode(a.account_id, a.suspicion_score, a.ring_id, a.detected_patterns)
+  ),
+  [],
+];
+
 // ── Component ─────────────────────────────────────────────────────────────────
 
 const NetworkView: React.FC<NetworkViewProps> = ({ data }) => {
@@ -70,49 +101,36 @@ const NetworkView: React.FC<NetworkViewProps> = ({ data }) => {
   const [filter,   setFilter]   = useState('all');
 
   // ── Build graph — ONLY suspicious accounts ─────────────────────────────────
+  // The API extracts (and caps) the suspicious subgraph server-side; the
+  // analysis itself carries no graph_data.
   useEffect(() => {
     if (!data?.suspicious_accounts?.length) return;
+    let cancelled = false;
 
-    const suspicious: Node[] = (data.suspicious_accounts as any[]).map(a => ({
-      id:         a.account_id,
-      score:      a.suspicion_score,
-      color:      scoreColor(a.suspicion_score),
-      size:       10 + (a.suspicion_score / 100) * 14,
-      x:          Math.random() * 600 + 150,
-      y:          Math.random() * 400 + 100,
-      vx: 0, vy: 0,
-      in_degree:  0,
-      out_degree: 0,
-      ring_id:    a.ring_id ?? '',
-      patterns:   a.detected_patterns ?? [],
-    }));
-
-    // Enrich with degree info from graph_data if available
-    if (data.graph_data?.nodes) {
-      const degMap = new Map(
-        data.graph_data.nodes.map((n: any) => [n.id, { in: n.in_degree ?? 0, out: n.out_degree ?? 0 }])
-      );
-      suspicious.forEach(n => {
-        const deg = degMap.get(n.id) as any;
-        if (deg) { n.in_degree = deg.in; n.out_degree = deg.out; }
+    const apply = (built: Node[], builtLinks: Link[]) => {
+      if (cancelled) return;
+      physRef.current = {};
+      built.forEach(n => {
+        physRef.current[n.id] = { x: n.x, y: n.y, vx: 0, vy: 0 };
       });
+      setNodes(built);
+      setLinks(builtLinks);
+      setSelected(null);
+    };
+
+    if (data.analysis_id) {
+      axios.get(`${API_URL}/api/analysis/${data.analysis_id}/network-data`, {
+        params: { view: 'suspicious', max_nodes: MAX_NODES, max_edges: MAX_EDGES },
+      })
+        .then(res => apply(
+          res.data.nodes.map((n: any) => makeNode(n.id, n.suspicion_score, n.ring_id, n.detected_patterns, n.in_degree, n.out_degree)),
+          res.data.links.map((l: any) => ({ source: l.source, target: l.target, amount: l.amount ?? 0 })),
+        ))
+        .catch(() => apply(...accountsOnly(data)));
+    } else {
+      apply(...accountsOnly(data));
     }
-
-    // Only keep links between suspicious accounts
-    const suspIds = new Set(suspicious.map(n => n.id));
-    const builtLinks: Link[] = (data.graph_data?.links ?? [])
-      .filter((l: any) => suspIds.has(l.source) && suspIds.has(l.target))
-      .map((l: any) => ({ source: l.source, target: l.target, amount: l.amount ?? 0 }));
-
-    // Init physics
-    physRef.current = {};
-    suspicious.forEach(n => {
-      physRef.current[n.id] = { x: n.x, y: n.y, vx: 0, vy: 0 };
-    });
-
-    setNodes(suspicious);
-    setLinks(builtLinks);
-    setSelected(null);
+    return () => { cancelled = true; };
   }, [data]);
 
   // ── Physics ───────────────────────────────────────────────────────────────